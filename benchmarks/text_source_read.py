@@ -0,0 +1,63 @@
+"""
+Compares TextSourceHandler.read against the previous line-by-line aiofiles
+reader on a generated JSONL file.
+
+    python benchmarks/text_source_read.py [lines] [batch_size]
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+import aiofiles
+
+from tilt.source_handler import TextSourceHandler
+
+
+async def line_by_line(filepath: str, batch_size: int) -> int:
+    """The reader TextSourceHandler.read used before bulk block reads."""
+    count = 0
+    async with aiofiles.open(filepath, "r", encoding="utf-8") as f:
+        batch = []
+        async for line in f:
+            batch.append(line.rstrip("\n"))
+            if len(batch) == batch_size:
+                count += len(batch)
+                batch = []
+        count += len(batch)
+    return count
+
+
+async def bulk(filepath: str, batch_size: int) -> int:
+    count = 0
+    async for batch in TextSourceHandler(filepath, batch_size=batch_size).read():
+        count += len(batch)
+    return count
+
+
+def timed(name: str, coro) -> None:
+    started = time.perf_counter()
+    count = asyncio.run(coro)
+    elapsed = time.perf_counter() - started
+    print(f"{name:>14}: {count} lines in {elapsed:.2f}s ({count / elapsed:,.0f} lines/s)")
+
+
+def main() -> None:
+    lines = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    batch_size = int(sys.argv[2]) if len(sys.argv) > 2 else 1
+
+    fd, path = tempfile.mkstemp(suffix=".jsonl")
+    with os.fdopen(fd, "w") as f:
+        for i in range(lines):
+            f.write(f'{{"id": {i}, "origin": {{"lat": -23.55, "lon": -46.63}}}}\n')
+    try:
+        timed("line-by-line", line_by_line(path, batch_size))
+        timed("bulk", bulk(path, batch_size))
+    finally:
+        os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
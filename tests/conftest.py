@@ -0,0 +1,177 @@
+import asyncio
+import threading
+import uuid
+from dataclasses import dataclass, field
+
+import pytest
+from aiohttp import web
+
+from tilt.chunk_format import CONTENT_TYPE, ChunkStreamDecoder, encode_chunks
+
+NOW = "2026-01-01T00:00:00Z"
+
+
+@dataclass
+class FakeApi:
+    """State of the in-process Tilt API served by the fake_api fixture."""
+
+    url: str = ""
+    organization_id: str = field(default_factory=lambda: str(uuid.uuid4()))
+    tasks: dict[str, int] = field(default_factory=dict)
+    results: dict[str, bytes] = field(default_factory=dict)
+    uploads: list[bytes] = field(default_factory=list)
+    # Segments whose first task never produces a result
+    stalled_segments: set[int] = field(default_factory=set)
+    stalled_tasks: set[str] = field(default_factory=set)
+    # Segments whose tasks fail to run
+    failing_segments: set[int] = field(default_factory=set)
+    # Tasks run whose result has not been fetched yet, and the most at once
+    active: int = 0
+    peak_active: int = 0
+    # Offer bulk jobs, and the (index, data) chunks uploaded to each of them
+    bulk: bool = False
+    bulk_inputs: dict[str, list[tuple[int, bytes]]] = field(default_factory=dict)
+    # Content-Length of each bulk upload, None when sent chunked
+    bulk_lengths: list = field(default_factory=list)
+    # Status reported for uploaded bulk jobs; None means no GET /jobs/{id}
+    bulk_status: str | None = "succeeded"
+
+
+class _ChunkList:
+    def __init__(self):
+        self.chunks: list[tuple[int, bytes]] = []
+
+    def begin(self, index: int) -> None:
+        self.chunks.append((index, b""))
+
+    def write(self, data) -> None:
+        index, so_far = self.chunks[-1]
+        self.chunks[-1] = (index, so_far + bytes(data))
+
+    def end(self) -> None:
+        pass
+
+
+def _app(api: FakeApi) -> web.Application:
+    async def sign_in(request):
+        return web.json_response(
+            {
+                "token": "token",
+                "user": {"name": "user", "phone": ""},
+                "organization": {
+                    "id": api.organization_id,
+                    "name": "org",
+                    "scope": "",
+                },
+                "expires_at": NOW,
+            }
+        )
+
+    async def create_job(request):
+        body = await request.json()
+        job = {"id": str(uuid.uuid4())}
+        if api.bulk and body.get("mode") == "bulk":
+            job["input_url"] = f"{api.url}/jobs/{job['id']}/input"
+        return web.json_response(job, status=201)
+
+    async def get_job(request):
+        job_id = request.match_info["job"]
+        if api.bulk_status is None:
+            return web.Response(status=404)
+        if job_id not in api.bulk_inputs:
+            return web.json_response({"id": job_id, "status": "pending"})
+        return web.json_response(
+            {
+                "id": job_id,
+                "status": api.bulk_status,
+                "output_url": f"{api.url}/jobs/{job_id}/output",
+            }
+        )
+
+    async def upload_input(request):
+        api.bulk_lengths.append(request.content_length)
+        sink = _ChunkList()
+        decoder = ChunkStreamDecoder()
+        async for block in request.content.iter_chunked(7):
+            decoder.feed(block, sink)
+        decoder.close(sink)
+        api.bulk_inputs[request.match_info["job"]] = sink.chunks
+        return web.Response(status=204)
+
+    async def download_output(request):
+        chunks = api.bulk_inputs[request.match_info["job"]]
+        body = b"".join(encode_chunks((i, d.upper()) for i, d in reversed(chunks)))
+        return web.Response(body=body, content_type=CONTENT_TYPE)
+
+    async def create_task(request):
+        body = await request.json()
+        task_id = str(uuid.uuid4())
+        segment = body["segment_index"]
+        if segment in api.stalled_segments and segment not in api.tasks.values():
+            api.stalled_tasks.add(task_id)
+        api.tasks[task_id] = segment
+        return web.json_response(
+            {"id": task_id, "segment_index": body["segment_index"]}, status=201
+        )
+
+    async def run_task(request):
+        form = await request.post()
+        if api.tasks.get(form["task_id"]) in api.failing_segments:
+            return web.Response(status=500, text="program crashed")
+        data = form["data"].file.read()
+        api.uploads.append(data)
+        api.active += 1
+        api.peak_active = max(api.peak_active, api.active)
+        # The "program" upper-cases its input
+        api.results[form["task_id"]] = data.upper()
+        # One "token" per uploaded byte
+        return web.json_response(
+            {"id": form["task_id"], "tokens_used": len(data), "size": len(data)}
+        )
+
+    async def processed(request):
+        task_id = request.match_info["task"].removesuffix(".dat")
+        if task_id not in api.results or task_id in api.stalled_tasks:
+            return web.Response(status=404)
+        api.active -= 1
+        return web.Response(body=api.results[task_id])
+
+    app = web.Application()
+    app.router.add_post("/sign_in/api_key", sign_in)
+    app.router.add_post("/jobs", create_job)
+    app.router.add_get("/jobs/{job}", get_job)
+    app.router.add_put("/jobs/{job}/input", upload_input)
+    app.router.add_get("/jobs/{job}/output", download_output)
+    app.router.add_post("/tasks", create_task)
+    app.router.add_post("/tasks/run", run_task)
+    app.router.add_get("/processed_data/{org}/{job}/processed/{task}", processed)
+    return app
+
+
+@pytest.fixture
+def fake_api(monkeypatch):
+    """Serves a minimal Tilt API from a background thread and points API_BASE_URL at it."""
+    api = FakeApi()
+    loop = asyncio.new_event_loop()
+    ready = threading.Event()
+    runner = web.AppRunner(_app(api))
+
+    async def start():
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        api.url = f"http://127.0.0.1:{port}"
+        ready.set()
+
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    asyncio.run_coroutine_threadsafe(start(), loop)
+    ready.wait(5)
+    monkeypatch.setenv("API_BASE_URL", api.url)
+
+    yield api
+
+    asyncio.run_coroutine_threadsafe(runner.cleanup(), loop).result(5)
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join(5)
@@ -0,0 +1,69 @@
+import asyncio
+import concurrent.futures
+import threading
+
+import pytest
+
+from tilt.async_executor import AsyncExecutor
+
+
+@pytest.fixture
+def executor():
+    ex = AsyncExecutor()
+    yield ex
+    ex.close()
+
+
+def test_submit_returns_concurrent_future(executor):
+    release = threading.Event()
+
+    async def wait():
+        await asyncio.get_running_loop().run_in_executor(None, release.wait)
+        return "done"
+
+    future = executor.submit(wait())
+    assert isinstance(future, concurrent.futures.Future)
+    assert not future.done()
+    release.set()
+    assert future.result(timeout=5) == "done"
+
+
+def test_run_many_keeps_order_and_collects_exceptions(executor):
+    async def value(i):
+        await asyncio.sleep(0.01 * (3 - i))
+        if i == 1:
+            raise ValueError("boom")
+        return i
+
+    results = executor.run_many([value(i) for i in range(3)], return_exceptions=True)
+
+    assert results[0] == 0 and results[2] == 2
+    assert isinstance(results[1], ValueError)
+    with pytest.raises(ValueError):
+        executor.run_many([value(1)])
+
+
+def test_map_bounds_concurrency(executor):
+    running = peak = 0
+
+    async def square(i):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return i * i
+
+    assert executor.map(square, range(10), limit=3) == [i * i for i in range(10)]
+    assert peak == 3
+    assert executor.map(square, []) == []
+
+
+def test_uvloop_is_used_when_requested():
+    uvloop = pytest.importorskip("uvloop")
+    ex = AsyncExecutor(use_uvloop=True)
+    try:
+        assert isinstance(ex._loop, uvloop.Loop)
+        assert ex.run(asyncio.sleep(0, "ok")) == "ok"
+    finally:
+        ex.close()
@@ -0,0 +1,57 @@
+import pytest
+
+from tilt.chunk_format import ChunkStreamDecoder, encode_chunks
+from tilt.sectioner import FileRegion
+
+
+class Sink:
+    def __init__(self):
+        self.chunks = {}
+        self.current = None
+
+    def begin(self, index):
+        self.current = index
+        self.chunks[index] = bytearray()
+
+    def write(self, data):
+        self.chunks[self.current] += data
+
+    def end(self):
+        self.current = None
+
+
+def test_container_roundtrip_with_arbitrary_splits(tmp_path):
+    src = tmp_path / "region.bin"
+    src.write_bytes(bytes(range(256)) * 10)
+    chunks = [
+        (3, b"third"),
+        (0, FileRegion(str(src), 100, 1000)),
+        (1, b""),
+        (2, memoryview(b"xsecondx")[1:-1]),
+    ]
+    encoded = b"".join(encode_chunks(chunks))
+
+    sink = Sink()
+    decoder = ChunkStreamDecoder()
+    for i in range(0, len(encoded), 7):
+        decoder.feed(encoded[i : i + 7], sink)
+    decoder.close(sink)
+
+    assert sink.chunks == {
+        3: b"third",
+        0: src.read_bytes()[100:1100],
+        1: b"",
+        2: b"second",
+    }
+
+
+def test_container_detects_corruption_and_truncation():
+    encoded = bytearray(b"".join(encode_chunks([(0, b"payload")])))
+    encoded[-1] ^= 0xFF
+    with pytest.raises(ValueError, match="Checksum"):
+        ChunkStreamDecoder().feed(bytes(encoded), Sink())
+
+    decoder = ChunkStreamDecoder()
+    decoder.feed(b"".join(encode_chunks([(0, b"payload")]))[:-2], Sink())
+    with pytest.raises(ValueError, match="Truncated"):
+        decoder.close(Sink())
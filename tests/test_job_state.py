@@ -0,0 +1,64 @@
+import uuid
+
+import pytest
+
+import tilt.job_state as job_state
+from tilt.job_state import ChunkStatus, JobStateTable, Phase
+
+
+def test_table_tracks_status_attempts_and_task_ids():
+    table = JobStateTable(3)
+    assert table.append() == 3
+    task_id = uuid.uuid4()
+
+    table.set_status(1, ChunkStatus.RUNNING)
+    table.set_status(1, ChunkStatus.RUNNING)
+    table.set_task_id(1, task_id)
+    table.set_status(2, ChunkStatus.FAILED)
+
+    assert len(table) == 4
+    assert table.status(1) == ChunkStatus.RUNNING
+    assert table.attempts(1) == 2 and table.attempts(0) == 0
+    assert table.task_id(1) == task_id and table.task_id(0) is None
+    assert table.counts() == {
+        ChunkStatus.PENDING: 2,
+        ChunkStatus.RUNNING: 1,
+        ChunkStatus.FINISHED: 0,
+        ChunkStatus.FAILED: 1,
+    }
+    assert table.statuses(1, 3) == bytes([ChunkStatus.RUNNING, ChunkStatus.FAILED])
+    assert table.timestamp(1, Phase.QUEUED) is not None
+    assert table.timestamp(1, Phase.DONE) is None
+
+
+def test_sizes_and_tokens_are_none_until_recorded():
+    table = JobStateTable(1)
+    index = table.append()
+    table.set_payload_size(index, 10)
+    table.set_result_size(index, 0)
+    table.set_tokens(index, 7)
+
+    assert table.payload_size(0) is None and table.tokens(0) is None
+    assert table.payload_size(index) == 10
+    assert table.result_size(index) == 0
+    assert table.tokens(index) == 7
+
+
+@pytest.mark.parametrize("vectorized", [True, False])
+def test_durations_skip_unfinished_chunks(monkeypatch, vectorized):
+    if vectorized:
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(job_state, "_np", None)
+    table = JobStateTable(1000)
+    for i in range(0, 1000, 4):
+        table.set_status(i, ChunkStatus.FINISHED)
+    for i in range(0, 1000, 2):
+        table.mark(i, Phase.QUEUED, at=100.0)
+        table.mark(i, Phase.DONE, at=100.0 + i)
+
+    spans = list(table.durations(Phase.QUEUED, Phase.DONE))
+    finished = list(table.durations(Phase.QUEUED, Phase.DONE, ChunkStatus.FINISHED))
+
+    assert spans == [float(i) for i in range(0, 1000, 2)]
+    assert finished == [float(i) for i in range(0, 1000, 4)]
@@ -0,0 +1,94 @@
+import logging
+import threading
+
+import pytest
+
+from tilt.log import RateLimitFilter, TiltFormatter, TiltLog
+
+
+class Capture(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.setFormatter(TiltFormatter())
+        self.lines = []
+        self.threads = set()
+
+    def emit(self, record):
+        self.lines.append(self.format(record))
+        self.threads.add(threading.get_ident())
+
+
+@pytest.fixture
+def capture():
+    handler = Capture()
+    TiltLog.configure(level=logging.INFO, handlers=[handler])
+    yield handler
+    TiltLog.rate_limit = RateLimitFilter()
+    TiltLog.reset()
+
+
+@pytest.fixture
+def unconfigured():
+    TiltLog.reset()
+    yield
+    TiltLog.reset()
+
+
+def test_disabled_levels_are_never_formatted(capture):
+    class Expensive:
+        def __str__(self):
+            raise AssertionError("formatted")
+
+    TiltLog.debug("value %s", Expensive())
+    TiltLog.shutdown()
+
+    assert capture.lines == []
+
+
+def test_fields_are_rendered_off_the_calling_thread(capture):
+    TiltLog.error("Chunk %d failed: %s", 3, "boom", job_id="j", index=3, latency=1.5)
+    TiltLog.shutdown()
+
+    assert capture.lines == ["[x] Chunk 3 failed: boom job_id=j index=3 latency=1.500"]
+    assert threading.get_ident() not in capture.threads
+
+
+def test_repeated_errors_are_rate_limited(capture, monkeypatch):
+    clock = [0.0]
+    monkeypatch.setattr("tilt.log.time.monotonic", lambda: clock[0])
+    TiltLog.rate_limit.burst = 2
+    TiltLog.rate_limit.period = 10.0
+
+    for i in range(5):
+        TiltLog.error("Chunk %d failed", i)
+    clock[0] = 11.0
+    TiltLog.error("Chunk %d failed", 5)
+    TiltLog.info("not limited %d", 1)
+    TiltLog.shutdown()
+
+    assert capture.lines == [
+        "[x] Chunk 0 failed",
+        "[x] Chunk 1 failed",
+        "[x] Chunk 5 failed (3 similar messages suppressed)",
+        "[-] not limited 1",
+    ]
+
+
+def test_records_propagate_to_the_app_logging(unconfigured, caplog):
+    assert TiltLog._listener is None
+
+    TiltLog.warning("Chunk %d retried", 1)
+
+    assert [r.getMessage() for r in caplog.records] == ["Chunk 1 retried"]
+    assert TiltLog.logger.propagate
+    assert TiltLog._listener is None
+
+
+def test_default_handlers_start_on_first_record(unconfigured, monkeypatch):
+    monkeypatch.setattr(logging.getLogger(), "handlers", [])
+    assert TiltLog._listener is None
+
+    TiltLog.error("Chunk %d failed", 1)
+
+    assert TiltLog._listener is not None
+    assert TiltLog.logger.getEffectiveLevel() == logging.ERROR
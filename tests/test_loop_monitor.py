@@ -0,0 +1,61 @@
+import asyncio
+import time
+
+from tilt.async_executor import AsyncExecutor
+from tilt.loop_monitor import LoopMonitor
+
+
+def block_the_loop(seconds):
+    time.sleep(seconds)
+
+
+def test_monitor_captures_stack_of_blocking_call():
+    executor = AsyncExecutor()
+    monitor = LoopMonitor(
+        executor._loop, executor._thread, interval=0.02, slow_threshold=0.1
+    )
+    monitor.start()
+    try:
+        async def blocking():
+            block_the_loop(0.5)
+
+        before = time.time()
+        executor.run(blocking())
+        deadline = time.monotonic() + 2
+        while not monitor.metrics().stalls and time.monotonic() < deadline:
+            time.sleep(0.02)
+        metrics = monitor.metrics()
+    finally:
+        monitor.stop()
+        executor.close()
+
+    assert metrics.slow_callbacks == 1
+    [stall] = metrics.stalls
+    assert "block_the_loop" in stall.stack
+    assert 0.3 < stall.duration < 1.0
+    # Wall clock, comparable with job and report timestamps
+    assert before - 0.1 <= stall.started_at <= before + 0.2
+    assert metrics.lag_max > 0.3
+
+
+def test_executor_metrics_report_task_counts():
+    executor = AsyncExecutor(monitor=True)
+    try:
+        futures = [executor.submit(asyncio.sleep(0.5)) for _ in range(5)]
+        time.sleep(0.3)
+        metrics = executor.metrics()
+        for future in futures:
+            future.result()
+    finally:
+        executor.close()
+
+    assert metrics.samples > 0
+    assert metrics.tasks_peak >= 5
+
+
+def test_executor_metrics_are_empty_without_monitor():
+    executor = AsyncExecutor()
+    try:
+        assert executor.metrics().samples == 0
+    finally:
+        executor.close()
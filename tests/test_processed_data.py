@@ -1,11 +1,17 @@
+import base64
 import json
 import uuid
 
+import aiohttp
 import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
 from werkzeug.wrappers import Response
 
 import tilt.endpoints as endpoints
+from tilt.chunk_format import CONTENT_TYPE, encode_chunks
 from tilt.processed_data import ProcessedData
+from tilt.types import Some
 
 
 def file_response_handler(request):
@@ -48,3 +54,230 @@ async def test_download_processed_data(httpserver, tmp_path):
 
     assert result_path == str(dest)
     assert dest.read_bytes() == bytes([1, 2, 3, 4])
+
+
+@pytest.mark.asyncio
+async def test_download_to_file_streams_out_of_order_chunks(tmp_path):
+    chunks = [
+        {"index": 2, "data": base64.b64encode(b"third").decode(), "filename": "f"},
+        {"index": 0, "data": list(b"first-")},
+        {"index": 1, "data": base64.b64encode(b"second-").decode()},
+    ]
+
+    async def handler(request):
+        return web.Response(body=json.dumps(chunks).encode())
+
+    app = web.Application()
+    app.router.add_get("/processed_data/{org}/{job}/processed/{task}.dat", handler)
+    server = TestServer(app)
+    await server.start_server()
+
+    dest = tmp_path / "out" / "result.bin"
+    ids = uuid.uuid4()
+    downloader = ProcessedData(
+        organization_id=ids,
+        job_id=ids,
+        task_id=ids,
+        dest_path=str(dest),
+        chunk_size=7,
+        base_url=str(server.make_url("")).rstrip("/"),
+    )
+    result = await downloader.download()
+    await server.close()
+
+    assert result == Some(str(dest))
+    assert dest.read_bytes() == b"first-second-third"
+    assert sorted(p.name for p in dest.parent.iterdir()) == ["result.bin"]
+
+
+async def _serve(handler):
+    app = web.Application()
+    app.router.add_route(
+        "*", "/processed_data/{org}/{job}/processed/{task}.dat", handler
+    )
+    server = TestServer(app)
+    await server.start_server()
+    return server
+
+
+@pytest.mark.asyncio
+async def test_parallel_ranges_download_and_resume(tmp_path):
+    payload = [{"index": i, "data": list(bytes([i]) * 50)} for i in range(20)]
+    body = tmp_path / "body.json"
+    body.write_bytes(json.dumps(payload).encode())
+    expected = b"".join(bytes([i]) * 50 for i in range(20))
+    ranges = []
+
+    async def handler(request):
+        if request.http_range.start is not None:
+            ranges.append(request.http_range.start)
+        return web.FileResponse(body)
+
+    server = await _serve(handler)
+    dest = tmp_path / "result.bin"
+    raw = tmp_path / "result.bin.raw"
+    size = body.stat().st_size
+
+    ids = uuid.uuid4()
+    url = server.make_url(f"/processed_data/{ids}/{ids}/processed/{ids}.dat")
+    async with aiohttp.ClientSession() as session:
+        async with session.head(url) as resp:
+            etag = resp.headers["ETag"]
+
+    # A previous run got the first range before being interrupted
+    raw.write_bytes(body.read_bytes()[:100] + bytes(size - 100))
+    (tmp_path / "result.bin.raw.json").write_text(
+        json.dumps({"length": size, "etag": etag, "done": [0]})
+    )
+
+    downloader = ProcessedData(
+        ids,
+        ids,
+        ids,
+        dest_path=str(dest),
+        chunk_size=64,
+        base_url=str(server.make_url("")).rstrip("/"),
+        parallel_ranges=4,
+        range_size=100,
+    )
+    result = await downloader.download()
+    await server.close()
+
+    assert result == Some(str(dest))
+    assert dest.read_bytes() == expected
+    assert not raw.exists()
+    assert 0 not in ranges
+    assert len(ranges) == (size + 99) // 100 - 1
+
+
+@pytest.mark.asyncio
+async def test_parallel_ranges_fall_back_without_range_support(tmp_path):
+    body = json.dumps([{"index": 0, "data": list(b"whole")}]).encode()
+
+    async def handler(request):
+        return web.Response(body=body)
+
+    server = await _serve(handler)
+    ids = uuid.uuid4()
+    downloader = ProcessedData(
+        ids,
+        ids,
+        ids,
+        base_url=str(server.make_url("")).rstrip("/"),
+        parallel_ranges=4,
+    )
+    data = await downloader.download()
+    await server.close()
+
+    assert data == body
+
+
+@pytest.mark.asyncio
+async def test_download_to_file_prefers_binary_container(tmp_path):
+    body = b"".join(encode_chunks([(1, b"-world"), (0, b"hello")]))
+    accepts = []
+
+    async def handler(request):
+        accepts.append(request.headers.get("Accept", ""))
+        return web.Response(body=body, content_type=CONTENT_TYPE)
+
+    server = await _serve(handler)
+    dest = tmp_path / "result.bin"
+    ids = uuid.uuid4()
+    downloader = ProcessedData(
+        ids,
+        ids,
+        ids,
+        dest_path=str(dest),
+        chunk_size=3,
+        base_url=str(server.make_url("")).rstrip("/"),
+    )
+    await downloader.download()
+    await server.close()
+
+    assert dest.read_bytes() == b"hello-world"
+    assert accepts[0].startswith(CONTENT_TYPE)
+
+
+@pytest.mark.asyncio
+async def test_parallel_ranges_retry_server_errors_and_keep_progress(tmp_path):
+    body = tmp_path / "body.json"
+    body.write_bytes(json.dumps([{"index": 0, "data": list(range(100))}]).encode())
+    size = body.stat().st_size
+    failures = {"left": 1}
+    full_gets = []
+
+    async def handler(request):
+        start = request.http_range.start
+        if request.method == "GET" and start is None:
+            full_gets.append(request)
+        if start == 100 and failures["left"]:
+            failures["left"] -= 1
+            return web.Response(status=503)
+        return web.FileResponse(body)
+
+    server = await _serve(handler)
+    ids = uuid.uuid4()
+    dest = tmp_path / "result.bin"
+
+    def downloader():
+        return ProcessedData(
+            ids,
+            ids,
+            ids,
+            dest_path=str(dest),
+            base_url=str(server.make_url("")).rstrip("/"),
+            parallel_ranges=2,
+            range_size=100,
+        )
+
+    assert await downloader().download() == Some(str(dest))
+    assert dest.read_bytes() == bytes(range(100))
+    assert full_gets == []
+
+    # A range that keeps failing fails the download but keeps what was done
+    dest.unlink()
+    failures["left"] = 10
+    with pytest.raises(Exception, match="503"):
+        await downloader().download()
+    await server.close()
+
+    state = json.loads((tmp_path / "result.bin.raw.json").read_text())
+    assert state["length"] == size and 0 in state["done"]
+    assert 1 not in state["done"]
+    assert (tmp_path / "result.bin.raw").exists()
+    assert full_gets == []
+
+
+@pytest.mark.asyncio
+async def test_parallel_ranges_discard_stale_raw_file(tmp_path):
+    body = tmp_path / "body.bin"
+    body.write_bytes(b"".join(encode_chunks([(0, b"fresh")])))
+    ranges = []
+
+    async def handler(request):
+        if request.http_range.start is not None:
+            ranges.append(request.http_range.start)
+        return web.FileResponse(body)
+
+    server = await _serve(handler)
+    dest = tmp_path / "result.bin"
+    # Left behind by an older, larger result, without resume state
+    (tmp_path / "result.bin.raw").write_bytes(b"x" * 500)
+
+    ids = uuid.uuid4()
+    downloader = ProcessedData(
+        ids,
+        ids,
+        ids,
+        dest_path=str(dest),
+        base_url=str(server.make_url("")).rstrip("/"),
+        parallel_ranges=2,
+        range_size=16,
+    )
+    result = await downloader.download()
+    await server.close()
+
+    assert ranges
+    assert result == Some(str(dest))
+    assert dest.read_bytes() == b"fresh"
@@ -0,0 +1,47 @@
+import json
+import threading
+
+from tilt.profiling import Profiler, phase_of
+
+
+def test_phase_of_matches_innermost_known_module():
+    assert phase_of(["threading", "tilt.tilt"]) == "idle"
+    assert phase_of(["json.encoder", "json", "aiohttp.client"]) == "json"
+    assert phase_of(["rich.segment", "rich.live", "tilt.tilt"]) == "render"
+    assert phase_of(["tilt.entities.task", "tilt.connection"]) == "parse"
+    assert phase_of(["yarl._url", "asyncio.events"]) == "network"
+    assert phase_of(["tilt.tilt"]) == "other"
+
+
+def test_profiler_samples_named_threads_by_role(tmp_path):
+    stop = threading.Event()
+
+    def encode():
+        while not stop.is_set():
+            json.dumps({"values": list(range(200))})
+
+    thread = threading.Thread(target=encode, name="tilt-worker-3")
+    profiler = Profiler(interval=0.005)
+    profiler.start()
+    thread.start()
+    try:
+        while profiler.samples < 20:
+            stop.wait(0.01)
+    finally:
+        stop.set()
+        thread.join()
+        profiler.stop()
+
+    stacks = profiler.stacks()
+    assert any(s.startswith("main;") for s in stacks)
+    assert any(
+        s.startswith("tilt-worker;") and "json" in s.rsplit(";", 1)[-1]
+        for s in stacks
+    )
+    assert profiler.phases("tilt-worker").get("json", 0) > 0.5
+
+    path = tmp_path / "profile.folded"
+    profiler.write(str(path))
+    lines = path.read_text().splitlines()
+    assert len(lines) == len(stacks)
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
@@ -0,0 +1,71 @@
+import uuid
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from tilt.connection import Connection
+from tilt.options import Options
+from tilt.program_index import ProgramIndex, file_digest
+from tilt.types import Ok, Some
+
+
+@pytest.fixture
+def options(monkeypatch, tmp_path):
+    monkeypatch.setenv("TILT_CACHE_DIR", str(tmp_path / "cache"))
+    opts = Options()
+    opts.auth_token = Some("token")
+    opts.organization_id = Some(uuid.uuid4())
+    return opts
+
+
+def test_program_index_roundtrip(tmp_path):
+    program = tmp_path / "prog.wasm"
+    program.write_bytes(b"\0asm" + b"x" * 5000)
+    digest = file_digest(str(program), block_size=1024)
+
+    index = ProgramIndex(tmp_path / "index.json")
+    key = ProgramIndex.key("https://x", "org", digest)
+    program_id = uuid.uuid4()
+    assert index.get(key) is None
+
+    index.put(key, program_id)
+
+    assert ProgramIndex(tmp_path / "index.json").get(key) == Some(program_id)
+
+
+@pytest.mark.asyncio
+async def test_upload_program_retries_and_deduplicates(options, monkeypatch, tmp_path):
+    program = tmp_path / "prog.wasm"
+    program.write_bytes(b"\0asm" + bytes(range(256)) * 1000)
+    program_id = uuid.uuid4()
+    calls = []
+
+    async def handler(request):
+        form = await request.post()
+        calls.append(form["program"].file.read())
+        if len(calls) == 1:
+            return web.Response(status=503)
+        return web.json_response({"id": str(program_id)})
+
+    app = web.Application()
+    app.router.add_post("/programs", handler)
+    server = TestServer(app)
+    await server.start_server()
+    monkeypatch.setenv("API_BASE_URL", str(server.make_url("")).rstrip("/"))
+    monkeypatch.setattr("tilt.connection.asyncio.sleep", _no_sleep)
+
+    async with Connection(options) as conn:
+        first = await conn.upload_program(str(program), Some("prog"))
+        second = await conn.upload_program(str(program))
+
+    await server.close()
+
+    assert first == Ok(program_id)
+    assert second == Ok(program_id)
+    assert len(calls) == 2
+    assert calls[-1] == program.read_bytes()
+
+
+async def _no_sleep(_):
+    return None
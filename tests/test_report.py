@@ -0,0 +1,63 @@
+import csv
+import json
+
+import pytest
+
+from tilt.report import ChunkReport, JobReport
+
+
+def _report() -> JobReport:
+    chunks = [
+        ChunkReport(
+            index=i,
+            status="finished",
+            attempts=1,
+            queued_at=100.0,
+            submitted_at=100.0 + i,
+            done_at=100.0 + 2 * i,
+            payload_bytes=10,
+            result_bytes=5,
+            tokens=i,
+        )
+        for i in range(1, 11)
+    ]
+    chunks.append(ChunkReport(index=11, status="failed", attempts=3))
+    return JobReport("job", 100.0, 120.0, chunks, {"max_workers": 4})
+
+
+def test_summary_counts_throughput_and_percentiles():
+    summary = _report().summary()
+
+    assert summary["chunks"] == 11
+    assert summary["finished"] == 10
+    assert summary["failed"] == 1
+    assert summary["retried"] == 1
+    assert summary["bytes_in"] == 100
+    assert summary["bytes_in_per_second"] == pytest.approx(5.0)
+    assert summary["chunks_per_second"] == pytest.approx(0.5)
+    assert summary["tokens"] == 55
+    assert summary["tokens_per_chunk"] == pytest.approx(5.5)
+    assert summary["total_seconds_p50"] == pytest.approx(11.0)
+    assert summary["upload_seconds_p90"] == pytest.approx(9.1)
+    assert summary["wait_seconds_p99"] == pytest.approx(9.91)
+
+
+def test_json_round_trip(tmp_path):
+    report = _report()
+    path = tmp_path / "report.json"
+    report.save(str(path))
+
+    data = json.loads(path.read_text())
+    assert data["summary"]["finished"] == 10
+    assert JobReport.from_json(data) == report
+
+
+def test_csv_has_one_row_per_chunk(tmp_path):
+    path = tmp_path / "report.csv"
+    _report().save(str(path))
+
+    with open(path, newline="") as f:
+        rows = list(csv.DictReader(f))
+    assert len(rows) == 11
+    assert rows[0]["total_seconds"] == "2.0"
+    assert rows[-1]["status"] == "failed" and rows[-1]["done_at"] == ""
@@ -0,0 +1,68 @@
+import heapq
+import threading
+
+from tilt.scheduling import ByteBudget, CostAware, Fifo, LargestFirst
+
+
+def drain(policy, payloads, observe=None):
+    policy.start(payloads)
+    order = []
+    while (index := policy.next()) is not None:
+        order.append(index)
+        if observe:
+            policy.observe(index, observe(payloads[index]))
+    return order
+
+
+def makespan(order, costs, workers):
+    finish = [0.0] * workers
+    for index in order:
+        heapq.heapreplace(finish, finish[0] + costs[index])
+    return max(finish)
+
+
+def test_fifo_and_largest_first_orders():
+    payloads = [b"a", b"ccc", b"bb", b"ddd"]
+
+    assert drain(Fifo(), payloads) == [0, 1, 2, 3]
+    assert drain(LargestFirst(), payloads) == [1, 3, 2, 0]
+
+
+def test_largest_first_shortens_makespan():
+    payloads = [b"x" * n for n in [1] * 12 + [12]]
+    costs = [len(p) for p in payloads]
+
+    fifo = makespan(drain(Fifo(), payloads), costs, workers=4)
+    lpt = makespan(drain(LargestFirst(), payloads), costs, workers=4)
+
+    assert (fifo, lpt) == (15, 12)
+
+
+def test_cost_aware_learns_expensive_kind():
+    # "slow" payloads cost 10x per byte, so small slow chunks outrank big fast ones
+    payloads = [b"fast" * 50] * 3 + [b"slow" * 10] * 3 + [b"fast" * 40, b"slow" * 5]
+    policy = CostAware(kind=lambda p: p[:4])
+
+    def cost(payload):
+        return len(payload) * (10.0 if payload.startswith(b"slow") else 1.0)
+
+    order = drain(policy, payloads, observe=cost)
+
+    # Each kind is tried first, then the slow kind's remaining chunks lead
+    assert order[:2] == [0, 3]
+    assert order[2:4] == [4, 5]
+    assert policy.predict(40, b"slow") == 400.0
+
+
+def test_byte_budget_blocks_until_released_and_admits_oversized_alone():
+    budget = ByteBudget(100)
+
+    assert budget.acquire(60)
+    assert not budget.acquire(60, timeout=0.01)
+    threading.Timer(0.05, budget.release, [60]).start()
+    assert budget.acquire(60, timeout=2)
+    budget.release(60)
+
+    assert budget.acquire(500, timeout=0.01)
+    assert budget.used == 500
+    assert not budget.acquire(1, timeout=0.01)
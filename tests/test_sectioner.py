@@ -0,0 +1,240 @@
+import random
+
+import pytest
+
+from tilt import sectioner
+from tilt.connection import FileRegionPayload
+from tilt.sectioner import (
+    Chunk,
+    ChunkBacking,
+    ChunkManifest,
+    FileRegion,
+    IncrementalReconstructor,
+    content_defined_manifest,
+    deconstruct_file,
+    file_regions,
+    index_lines,
+    read_records,
+    reconstruct_file,
+    record_ranges,
+)
+
+
+@pytest.mark.asyncio
+async def test_deconstruct_file_backed_chunks_read_nothing(tmp_path):
+    src = tmp_path / "input.bin"
+    src.write_bytes(bytes(range(256)) * 10)
+
+    chunks = []
+    async for chunk in deconstruct_file(str(src), 1000, ChunkBacking.FILE):
+        chunks.append(chunk)
+
+    assert [c.index for c in chunks] == [0, 1, 2]
+    assert all(isinstance(c.data, FileRegion) for c in chunks)
+    assert [len(c.data) for c in chunks] == [1000, 1000, 560]
+    assert b"".join(c.data.read() for c in chunks) == src.read_bytes()
+
+
+def test_reconstruct_file_streams_regions(tmp_path):
+    src = tmp_path / "input.bin"
+    src.write_bytes(b"abcdefghij" * 100)
+    out = tmp_path / "out.bin"
+
+    chunks = [
+        Chunk(index=i, data=region, filename="input.bin")
+        for i, region in enumerate(file_regions(str(src), 64))
+    ]
+    reconstruct_file(list(reversed(chunks)), str(out))
+
+    assert out.read_bytes() == src.read_bytes()
+
+
+def test_chunk_keeps_memoryview_without_copy():
+    buf = bytearray(b"shared")
+    chunk = Chunk(index=0, data=memoryview(buf)[1:4], filename="x")
+    buf[1] = ord("H")
+
+    assert isinstance(chunk.data, memoryview)
+    assert bytes(chunk.data) == b"Har"
+
+
+@pytest.mark.asyncio
+async def test_file_region_payload_streams_exact_range(tmp_path):
+    src = tmp_path / "input.bin"
+    src.write_bytes(bytes(range(256)) * 4096)
+
+    class Writer:
+        def __init__(self):
+            self.parts = []
+
+        async def write(self, data):
+            self.parts.append(bytes(data))
+
+    writer = Writer()
+    payload = FileRegionPayload(FileRegion(str(src), 1000, 600_000))
+    await payload.write(writer)
+
+    assert payload.size == 600_000
+    assert max(len(p) for p in writer.parts) < 600_000
+    assert b"".join(writer.parts) == src.read_bytes()[1000:601_000]
+
+
+@pytest.mark.asyncio
+async def test_deconstruct_file_mmap_yields_views_with_totals(tmp_path):
+    src = tmp_path / "input.bin"
+    src.write_bytes(bytes(range(256)) * 50)
+
+    chunks = []
+    async for chunk in deconstruct_file(str(src), 4096, ChunkBacking.MMAP):
+        chunks.append(chunk)
+
+    # Views stay valid after the splitter has finished
+    assert all(isinstance(c.data, memoryview) for c in chunks)
+    assert [c.total_chunks for c in chunks] == [4] * 4
+    assert b"".join(bytes(c.data) for c in chunks) == src.read_bytes()
+
+
+@pytest.mark.asyncio
+async def test_deconstruct_file_fills_total_chunks_up_front(tmp_path):
+    src = tmp_path / "input.bin"
+    src.write_bytes(b"x" * 2500)
+
+    totals = [c.total_chunks async for c in deconstruct_file(str(src), 1000)]
+
+    assert totals == [3, 3, 3]
+
+
+def _cdc_sizes():
+    return {"min_size": 512, "avg_size": 2048, "max_size": 8192}
+
+
+def test_content_defined_manifest_survives_insertions(tmp_path):
+    rng = random.Random(7)
+    data = bytes(rng.getrandbits(8) for _ in range(200_000))
+    original = tmp_path / "day1.bin"
+    original.write_bytes(data)
+    edited = tmp_path / "day2.bin"
+    edited.write_bytes(data[:1000] + b"!" + data[1000:])
+
+    before = content_defined_manifest(str(original), **_cdc_sizes())
+    after = content_defined_manifest(str(edited), **_cdc_sizes())
+
+    assert sum(e.length for e in before.entries) == len(data)
+    assert all(e.length <= 8192 for e in before.entries)
+    assert all(e.length >= 512 for e in before.entries[:-1])
+    assert len(after.changed_since(before)) <= 2
+    chunks = after.chunks(str(edited))
+    assert b"".join(c.data.read() for c in chunks) == edited.read_bytes()
+
+
+def test_content_defined_manifest_vectorized_matches_python(tmp_path, monkeypatch):
+    pytest.importorskip("numpy")
+    rng = random.Random(11)
+    src = tmp_path / "input.bin"
+    src.write_bytes(bytes(rng.getrandbits(8) for _ in range(100_000)))
+    monkeypatch.setattr(sectioner, "_CDC_WINDOW", 30_000)
+
+    vectorized = content_defined_manifest(str(src), **_cdc_sizes())
+    monkeypatch.setattr(sectioner, "_gear_candidates", sectioner._gear_candidates_py)
+    pure = content_defined_manifest(str(src), **_cdc_sizes())
+
+    assert vectorized == pure
+
+
+def test_chunk_manifest_json_roundtrip(tmp_path):
+    src = tmp_path / "input.bin"
+    src.write_bytes(b"abc" * 1000)
+    manifest = content_defined_manifest(str(src), 64, 256, 1024)
+
+    manifest.save(str(tmp_path / "manifest.json"))
+
+    assert ChunkManifest.load(str(tmp_path / "manifest.json")) == manifest
+
+
+@pytest.mark.parametrize("vectorized", [True, False])
+def test_record_ranges_are_aligned_and_cover_file(tmp_path, monkeypatch, vectorized):
+    if vectorized:
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(sectioner, "_np", None)
+    monkeypatch.setattr(sectioner, "_LINE_SCAN_WINDOW", 64)
+    lines = [f'{{"id": {i}, "pad": "{"x" * (i % 13)}"}}' for i in range(200)]
+    src = tmp_path / "input.jsonl"
+    src.write_text("\n".join(lines) + "\n")
+
+    starts = index_lines(str(src))
+    regions = record_ranges(str(src), 500, starts)
+
+    assert len(starts) == 200
+    assert regions[0].offset == 0
+    assert all(a.offset + a.length == b.offset for a, b in zip(regions, regions[1:]))
+    assert sum(r.length for r in regions) == src.stat().st_size
+    records = [r for region in regions for r in read_records(region)]
+    assert records == [line.encode() for line in lines]
+
+
+def test_index_lines_reuses_sidecar_until_file_changes(tmp_path, monkeypatch):
+    src = tmp_path / "input.jsonl"
+    src.write_text("a\nbb\nccc")
+    assert list(index_lines(str(src))) == [0, 2, 5]
+
+    def fail(*_):
+        raise AssertionError("file was rescanned")
+
+    monkeypatch.setattr(sectioner, "_scan_line_starts", fail)
+    assert list(index_lines(str(src))) == [0, 2, 5]
+
+    monkeypatch.undo()
+    src.write_text("a\nb\n")
+    assert list(index_lines(str(src))) == [0, 2]
+
+
+def test_index_lines_rescans_damaged_sidecar(tmp_path):
+    src = tmp_path / "input.jsonl"
+    src.write_text("a\nbb\nccc")
+    index_lines(str(src))
+    idx = tmp_path / ("input.jsonl" + sectioner.LINE_INDEX_SUFFIX)
+    healthy = idx.read_bytes()
+
+    idx.write_bytes(healthy[:-3])  # not a whole number of offsets
+    assert list(index_lines(str(src))) == [0, 2, 5]
+    assert idx.read_bytes() == healthy
+
+    idx.write_bytes(healthy[:-8] + (99).to_bytes(8, "little"))
+    assert list(index_lines(str(src))) == [0, 2, 5]
+
+    idx.write_bytes(healthy[:-8])  # cut on an entry boundary
+    assert list(index_lines(str(src))) == [0, 2, 5]
+    assert idx.read_bytes() == healthy
+    assert [p.name for p in tmp_path.iterdir() if p.name.startswith(".")] == []
+    assert [r.length for r in record_ranges(str(src), 1)] == [2, 3, 3]
+
+
+def test_incremental_reconstructor_writes_out_of_order(tmp_path):
+    src = tmp_path / "input.bin"
+    src.write_bytes(bytes(range(256)) * 40)
+    manifest = content_defined_manifest(str(src), 64, 512, 2048)
+    chunks = manifest.chunks(str(src))
+    out = tmp_path / "out.bin"
+
+    with IncrementalReconstructor(str(out), manifest) as rebuilt:
+        for chunk in reversed(chunks[1:]):
+            assert rebuilt.write(chunk.index, chunk.data.read())
+        assert rebuilt.missing() == [0]
+        assert rebuilt.write(0, memoryview(chunks[0].data.read()))
+        assert not rebuilt.write(0, chunks[0].data)
+        assert rebuilt.complete
+
+    assert out.read_bytes() == src.read_bytes()
+
+
+def test_incremental_reconstructor_rejects_incomplete_output(tmp_path):
+    manifest = ChunkManifest.from_lengths("out.bin", [3, 4])
+    rebuilt = IncrementalReconstructor(str(tmp_path / "out.bin"), manifest)
+    rebuilt.write(1, b"4444")
+
+    with pytest.raises(ValueError, match="expects"):
+        rebuilt.write(0, b"22")
+    with pytest.raises(ValueError, match="missing"):
+        rebuilt.finish()
+    rebuilt.close()
@@ -1,6 +1,17 @@
+import gzip
+import os
+import sys
+import time
+
 import pytest
 import asyncio
-from tilt.source_handler import TextSourceHandler, BinarySourceHandler, TcpHandler
+from tilt.source_handler import (
+    BinarySourceHandler,
+    ShardedTextSourceHandler,
+    TcpHandler,
+    TextSourceHandler,
+    VideoHandler,
+)
 from unittest.mock import patch
 
 
@@ -40,7 +51,7 @@ def test_binary_source_handler_reconstruct_file():
 
 @pytest.mark.asyncio
 async def test_tcp_handler_reads_batches(monkeypatch):
-    async def mock_open_connection(host, port):
+    async def mock_open_connection(host, port, **kwargs):
         class FakeReader:
             def __init__(self):
                 self.lines = [b'line1\n', b'line2\n', b'']
@@ -64,3 +75,250 @@ async def test_tcp_handler_reads_batches(monkeypatch):
         result.append(batch)
 
     assert result == [["line1", "line2"]]
+
+
+@pytest.mark.asyncio
+async def test_tcp_handler_length_framing_and_reconnect():
+    connections = 0
+
+    async def serve(reader, writer):
+        nonlocal connections
+        connections += 1
+        if connections == 2:
+            # The feed goes away for good after this session
+            server.close()
+        for i in range(3):
+            record = b"rec%d-%d\n" % (connections, i)
+            writer.write(len(record).to_bytes(4, "big") + record)
+        await writer.drain()
+        writer.close()
+
+    server = await asyncio.start_server(serve, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+
+    handler = TcpHandler(
+        "127.0.0.1",
+        port,
+        batch_size=2,
+        encoding=None,
+        framing="length",
+        reconnect=True,
+        max_reconnects=1,
+        backoff_initial=0.01,
+    )
+    records = []
+    with pytest.raises(ConnectionRefusedError):
+        async for batch in handler.read():
+            records.extend(batch)
+
+    await server.wait_closed()
+
+    assert connections == 2
+    assert records == [b"rec%d-%d\n" % (c, i) for c in (1, 2) for i in range(3)]
+
+
+@pytest.mark.asyncio
+async def test_tcp_handler_flushes_partial_batch_on_idle_feed():
+    release = asyncio.Event()
+
+    async def serve(reader, writer):
+        writer.write(b"a\nb\n")
+        await writer.drain()
+        await release.wait()
+        writer.write(b"c\n")
+        writer.close()
+
+    server = await asyncio.start_server(serve, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    handler = TcpHandler("127.0.0.1", port, batch_size=10, flush_interval=0.05)
+
+    batches = []
+    async for batch in handler.read():
+        batches.append(batch)
+        release.set()
+
+    server.close()
+    await server.wait_closed()
+
+    assert batches == [["a", "b"], ["c"]]
+
+
+FAKE_FFMPEG = """#!{python}
+import sys, time
+args = sys.argv[1:]
+list_path = args[args.index("-segment_list") + 1]
+pattern = args[-1]
+for i in range(3):
+    with open(pattern % i, "wb") as f:
+        f.write(b"segment%d" % i)
+    with open(list_path, "a") as f:
+        f.write((pattern % i).rsplit("/", 1)[-1] + "\\n")
+    time.sleep(0.3)
+"""
+
+
+@pytest.mark.asyncio
+async def test_video_handler_streams_segments_while_splitting(tmp_path, monkeypatch):
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    ffmpeg = bin_dir / "ffmpeg"
+    ffmpeg.write_text(FAKE_FFMPEG.format(python=sys.executable))
+    ffmpeg.chmod(0o755)
+    monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+
+    handler = VideoHandler("input.mp4", str(tmp_path / "parts"))
+    started = time.monotonic()
+    arrivals = []
+    chunks = []
+    async for chunk in handler.read():
+        arrivals.append(time.monotonic() - started)
+        chunks.append(chunk)
+
+    assert [c.index for c in chunks] == [0, 1, 2]
+    assert [c.data.read() for c in chunks] == [b"segment0", b"segment1", b"segment2"]
+    # The first segment is handed over long before ffmpeg exits
+    assert arrivals[0] < arrivals[-1] - 0.4
+
+
+FAKE_REMUX_FFMPEG = """#!{python}
+import shutil, sys
+args = sys.argv[1:]
+if args[-1] == "pipe:1":
+    with open(args[args.index("-i") + 1], "rb") as f:
+        offset = args[args.index("-output_ts_offset") + 1]
+        sys.stdout.buffer.write(offset.encode() + b":" + f.read() + b";")
+else:
+    with open(args[-1], "wb") as out:
+        shutil.copyfileobj(sys.stdin.buffer, out)
+"""
+
+FAKE_FFPROBE = """#!{python}
+print("1.5")
+"""
+
+
+@pytest.mark.asyncio
+async def test_video_reassembler_appends_contiguous_prefix(tmp_path, monkeypatch):
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    for name, script in [("ffmpeg", FAKE_REMUX_FFMPEG), ("ffprobe", FAKE_FFPROBE)]:
+        (bin_dir / name).write_text(script.format(python=sys.executable))
+        (bin_dir / name).chmod(0o755)
+    monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+
+    segments = []
+    for i in range(3):
+        segment = tmp_path / f"processed_{i}.mp4"
+        segment.write_bytes(b"seg%d" % i)
+        segments.append(segment)
+
+    output = tmp_path / "final.mp4"
+    handler = VideoHandler(target_filename=str(output))
+    async with handler.reassembler() as reassembler:
+        await reassembler.add(1, str(segments[1]))
+        assert segments[1].exists()
+        await reassembler.add(0, str(segments[0]))
+        assert not segments[0].exists() and not segments[1].exists()
+        await reassembler.add(2, str(segments[2]))
+
+    assert output.read_bytes() == b"0.000000:seg0;1.500000:seg1;3.000000:seg2;"
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("batch_size,batch_bytes", [(1, None), (3, None), (4, 20)])
+async def test_text_source_handler_bulk_reader_matches_line_reader(
+    tmp_path, batch_size, batch_bytes
+):
+    file_path = tmp_path / "test.jsonl"
+    lines = [f'{{"n": {i}, "s": "{"é" * (i % 5)}"}}' for i in range(50)]
+    content = "\n".join(lines[:25]) + "\r\n" + "\n".join(lines[25:])
+    file_path.write_bytes(content.encode())
+
+    handler = TextSourceHandler(
+        str(file_path), batch_size=batch_size, batch_bytes=batch_bytes, block_size=7
+    )
+    batches = [batch async for batch in handler.read()]
+
+    assert [line for batch in batches for line in batch] == lines
+    assert all(len(batch) <= batch_size for batch in batches)
+    if batch_bytes is None:
+        assert all(len(batch) == batch_size for batch in batches[:-1])
+
+
+@pytest.mark.asyncio
+async def test_batch_bytes_counts_encoded_bytes(tmp_path):
+    file_path = tmp_path / "test.txt"
+    file_path.write_text("é" * 10 + "\n" + "é" * 10 + "\nab\ncd\n", encoding="utf-8")
+
+    handler = TextSourceHandler(str(file_path), batch_size=100, batch_bytes=20)
+
+    # Each "é" line is 10 characters but 20 bytes
+    assert [b async for b in handler.read()] == [["é" * 10], ["é" * 10], ["ab", "cd"]]
+
+
+@pytest.mark.asyncio
+async def test_sharded_text_source_handler_keeps_global_order(tmp_path):
+    zstandard = pytest.importorskip("zstandard")
+    shard_dir = tmp_path / "shards"
+    shard_dir.mkdir()
+    expected = []
+    for n in range(6):
+        lines = [f'{{"shard": {n}, "i": {i}}}' for i in range(50 + n * 7)]
+        expected += lines
+        body = ("\n".join(lines) + "\n").encode()
+        if n % 3 == 0:
+            (shard_dir / f"part-{n}.jsonl.gz").write_bytes(gzip.compress(body))
+        elif n % 3 == 1:
+            compressed = zstandard.ZstdCompressor().compress(body)
+            (shard_dir / f"part-{n}.jsonl.zst").write_bytes(compressed)
+        else:
+            (shard_dir / f"part-{n}.jsonl").write_bytes(body)
+    (shard_dir / "part-2.jsonl.lines.idx").write_bytes(b"not a shard")
+
+    handler = ShardedTextSourceHandler(
+        str(shard_dir), batch_size=16, block_size=64, readers=3, prefetch_blocks=2
+    )
+    records = [r async for r in handler.read_records()]
+    batches = [b async for b in handler.read()]
+
+    assert len(handler.shards) == 6
+    assert records == list(enumerate(expected))
+    assert [line for batch in batches for line in batch] == expected
+    assert all(len(batch) == 16 for batch in batches[:-1])
+
+    glob_handler = ShardedTextSourceHandler(str(shard_dir / "*.gz"))
+    assert len(glob_handler.jsonl_to_bytes_list()) == 50 + 71
+    assert handler.jsonl_to_bytes_list() == [line.encode() for line in expected]
+
+
+def test_sharded_payloads_read_shards_concurrently(tmp_path, monkeypatch):
+    for n in range(4):
+        (tmp_path / f"part-{n}.jsonl").write_text(f"{n}a\n{n}b\n")
+    read = TextSourceHandler.jsonl_to_bytes_list
+    active, peak = [0], [0]
+
+    def slow_read(self):
+        active[0] += 1
+        peak[0] = max(peak[0], active[0])
+        time.sleep(0.05)
+        active[0] -= 1
+        return read(self)
+
+    monkeypatch.setattr(TextSourceHandler, "jsonl_to_bytes_list", slow_read)
+    handler = ShardedTextSourceHandler(str(tmp_path), readers=4)
+
+    assert handler.payloads() == [
+        f"{n}{c}".encode() for n in range(4) for c in "ab"
+    ]
+    assert peak[0] > 1
+
+
+@pytest.mark.asyncio
+async def test_text_source_handler_reads_gzip(tmp_path):
+    path = tmp_path / "data.jsonl.gz"
+    path.write_bytes(gzip.compress(b"a\nb\nc"))
+
+    handler = TextSourceHandler(str(path), batch_size=2, block_size=2)
+
+    assert [b async for b in handler.read()] == [["a", "b"], ["c"]]
+    assert handler.jsonl_to_bytes_list() == [b"a", b"b", b"c"]
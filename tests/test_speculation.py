@@ -0,0 +1,61 @@
+from tilt.job_state import ChunkStatus, JobStateTable, Phase
+from tilt.speculation import Speculation, Speculator
+
+
+def make_table(finished, running):
+    table = JobStateTable(finished + running)
+    for i in range(finished):
+        table.set_status(i, ChunkStatus.FINISHED)
+        table.mark(i, Phase.QUEUED, at=0.0)
+        table.mark(i, Phase.DONE, at=float(i + 1))
+    for i in range(finished, finished + running):
+        table.set_status(i, ChunkStatus.RUNNING)
+        table.mark(i, Phase.QUEUED, at=100.0 + i)
+    return table
+
+
+def test_picks_oldest_straggler_within_budget():
+    table = make_table(finished=10, running=3)
+    settings = Speculation(quantile=0.9, multiplier=2.0, max_duplicates=2)
+    speculator = Speculator(settings, table)
+
+    assert speculator.threshold() == 20.0
+    assert speculator.pick([10, 11, 12], now=115.0) is None
+    assert speculator.pick([10, 11, 12], now=131.5) == 10
+    assert speculator.pick([11, 12], now=200.0) == 11
+    assert speculator.pick([12], now=200.0) is None
+    assert speculator.launched == 2
+
+
+def test_waits_until_enough_of_the_job_is_done():
+    table = make_table(finished=5, running=5)
+    speculator = Speculator(Speculation(min_done=0.75), table)
+
+    assert speculator.threshold() is None
+    assert speculator.pick(range(5, 10), now=1e9) is None
+
+
+def test_threshold_ignores_failed_chunks_and_is_cached(monkeypatch):
+    table = make_table(finished=10, running=0)
+    failed = table.append()
+    table.set_status(failed, ChunkStatus.FAILED)
+    table.mark(failed, Phase.QUEUED, at=0.0)
+    table.mark(failed, Phase.DONE, at=1000.0)
+    speculator = Speculator(Speculation(quantile=0.9, multiplier=2.0), table)
+
+    assert speculator.threshold() == 20.0
+
+    calls = []
+    durations = table.durations
+    monkeypatch.setattr(
+        table, "durations", lambda *args: calls.append(args) or durations(*args)
+    )
+    assert speculator.threshold() == 20.0
+    assert calls == []
+
+    more = table.append()
+    table.set_status(more, ChunkStatus.FINISHED)
+    table.mark(more, Phase.QUEUED, at=0.0)
+    table.mark(more, Phase.DONE, at=0.5)
+    assert speculator.threshold() == 18.0
+    assert len(calls) == 1
@@ -0,0 +1,240 @@
+import asyncio
+import threading
+import time
+import uuid
+
+import pytest
+
+from tilt.chunk_format import encoded_size
+from tilt.job_state import ChunkStatus
+from tilt.options import Options
+from tilt.scheduling import LargestFirst
+from tilt.source_handler import TcpHandler
+from tilt.speculation import Speculation
+from tilt.tilt import Tilt
+from tilt.types import Some
+
+
+def test_create_and_poll_processes_live_tcp_feed(fake_api):
+    loop = asyncio.new_event_loop()
+    lines = [b"record %d\n" % i for i in range(20)]
+
+    async def serve(reader, writer):
+        writer.writelines(lines)
+        await writer.drain()
+        writer.close()
+
+    server = loop.run_until_complete(asyncio.start_server(serve, "127.0.0.1", 0))
+    port = server.sockets[0].getsockname()[1]
+
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+
+    options = Options(
+        data_src=Some(TcpHandler("127.0.0.1", port, batch_size=5)),
+        program_id=Some(uuid.uuid4()),
+        secret_key=Some("sk"),
+    )
+    tilt = Tilt(options)
+    seen = []
+    try:
+        results = tilt.create_and_poll(
+            max_workers=2, on_result=lambda idx, res: seen.append((idx, res))
+        )
+    finally:
+        tilt.close()
+        loop.call_soon_threadsafe(server.close)
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(5)
+
+    assert results == []
+    assert tilt.job_state.counts()[ChunkStatus.FINISHED] == 4
+    assert all(tilt.job_state.task_id(i) is not None for i in range(4))
+    assert sorted(idx for idx, _ in seen) == [0, 1, 2, 3]
+    expected = b"\n".join(line.rstrip(b"\n") for line in lines).upper()
+    assert b"\n".join(res.value for _, res in sorted(seen)) == expected
+
+
+def test_batch_helpers_share_one_handoff(fake_api):
+    tilt = Tilt(
+        Options(data=Some([b"x"]), program_id=Some(uuid.uuid4()), secret_key=Some("sk"))
+    )
+    try:
+        tasks = tilt.create_tasks(uuid.uuid4(), range(5))
+        ids = [task.unwrap().id.value for task in tasks]
+        runs = tilt.run_tasks((task_id, b"data%d" % i) for i, task_id in enumerate(ids))
+    finally:
+        tilt.close()
+
+    assert [fake_api.tasks[str(task_id)] for task_id in ids] == list(range(5))
+    assert all(run.is_ok() for run in runs)
+    assert sorted(fake_api.uploads) == [b"data%d" % i for i in range(5)]
+
+
+def test_create_and_poll_duplicates_stragglers(fake_api, monkeypatch):
+    monkeypatch.setattr(Tilt, "poll_interval", 0.02)
+    fake_api.stalled_segments = {5}
+    data = [b"chunk %d" % i for i in range(8)]
+    tilt = Tilt(
+        Options(data=Some(data), program_id=Some(uuid.uuid4()), secret_key=Some("sk"))
+    )
+    try:
+        results = tilt.create_and_poll(
+            max_workers=4,
+            speculation=Speculation(min_done=0.5, multiplier=1.0, min_samples=3),
+        )
+    finally:
+        tilt.close()
+
+    assert [res.value for _, res in results] == [d.upper() for d in data]
+    assert tilt.job_state.attempts(5) == 2
+    assert sum(1 for segment in fake_api.tasks.values() if segment == 5) == 2
+
+
+def test_create_and_poll_dispatches_by_policy_keeping_indices(fake_api):
+    data = [b"a", b"ccc", b"bb"]
+    tilt = Tilt(
+        Options(data=Some(data), program_id=Some(uuid.uuid4()), secret_key=Some("sk"))
+    )
+    try:
+        results = tilt.create_and_poll(max_workers=1, policy=LargestFirst())
+    finally:
+        tilt.close()
+
+    assert fake_api.uploads == [b"ccc", b"bb", b"a"]
+    assert results == [(0, Some(b"A")), (1, Some(b"CCC")), (2, Some(b"BB"))]
+
+
+def test_create_and_poll_respects_inflight_byte_budget(fake_api, monkeypatch):
+    monkeypatch.setattr(Tilt, "poll_interval", 0.02)
+    data = [bytes([97 + i]) * 100 for i in range(6)]
+    tilt = Tilt(
+        Options(data=Some(data), program_id=Some(uuid.uuid4()), secret_key=Some("sk"))
+    )
+    try:
+        results = tilt.create_and_poll(max_workers=6, max_inflight_bytes=250)
+    finally:
+        tilt.close()
+
+    assert [res.value for _, res in results] == [d.upper() for d in data]
+    assert fake_api.peak_active <= 2
+
+
+def test_create_and_poll_returns_and_saves_report(fake_api, tmp_path):
+    data = [b"a", b"bb", b"ccc"]
+    tilt = Tilt(
+        Options(data=Some(data), program_id=Some(uuid.uuid4()), secret_key=Some("sk"))
+    )
+    path = tmp_path / "report.json"
+    try:
+        results, report = tilt.create_and_poll(
+            max_workers=2, with_report=True, report_path=str(path)
+        )
+    finally:
+        tilt.close()
+
+    assert [res.value for _, res in results] == [b"A", b"BB", b"CCC"]
+    assert [c.payload_bytes for c in report.chunks] == [1, 2, 3]
+    assert [c.result_bytes for c in report.chunks] == [1, 2, 3]
+    assert [c.tokens for c in report.chunks] == [1, 2, 3]
+    assert all(c.status == "finished" and c.attempts == 1 for c in report.chunks)
+    summary = report.summary()
+    assert summary["finished"] == 3 and summary["tokens"] == 6
+    assert summary["total_seconds_p50"] > 0
+    assert report.settings["max_workers"] == 2
+    assert path.exists()
+
+
+def test_create_and_poll_writes_profile(fake_api, tmp_path, monkeypatch):
+    monkeypatch.setenv("TILT_PROFILE", str(tmp_path / "tilt.folded"))
+    tilt = Tilt(
+        Options(
+            data=Some([b"a", b"b"]),
+            program_id=Some(uuid.uuid4()),
+            secret_key=Some("sk"),
+        )
+    )
+    try:
+        tilt.create_and_poll(max_workers=2)
+    finally:
+        tilt.close()
+
+    assert tilt.profiler is not None and tilt.profiler.samples > 0
+    stacks = (tmp_path / "tilt.folded").read_text()
+    assert "\nmain;" in "\n" + stacks
+    assert "tilt-loop;" in stacks
+
+
+def test_create_and_poll_bulk_uploads_once(fake_api, monkeypatch):
+    monkeypatch.setattr(Tilt, "poll_interval", 0.02)
+    fake_api.bulk = True
+    data = [b"a", b"bb", b"ccc", b""]
+    tilt = Tilt(
+        Options(data=Some(data), program_id=Some(uuid.uuid4()), secret_key=Some("sk"))
+    )
+    try:
+        results, report = tilt.create_and_poll(bulk=True, with_report=True)
+    finally:
+        tilt.close()
+
+    assert results == [(i, Some(d.upper())) for i, d in enumerate(data)]
+    assert fake_api.tasks == {}
+    assert list(fake_api.bulk_inputs.values()) == [list(enumerate(data))]
+    assert fake_api.bulk_lengths == [encoded_size(enumerate(data))]
+    assert report.settings["bulk"] is True
+    assert [c.result_bytes for c in report.chunks] == [1, 2, 3, 0]
+
+
+def test_create_and_poll_bulk_falls_back_to_tasks(fake_api, monkeypatch):
+    monkeypatch.setattr(Tilt, "poll_interval", 0.02)
+    data = [b"a", b"bb"]
+    tilt = Tilt(
+        Options(data=Some(data), program_id=Some(uuid.uuid4()), secret_key=Some("sk"))
+    )
+    try:
+        results = tilt.create_and_poll(bulk=True)
+    finally:
+        tilt.close()
+
+    assert results == [(0, Some(b"A")), (1, Some(b"BB"))]
+    assert sorted(fake_api.tasks.values()) == [0, 1]
+    assert fake_api.bulk_inputs == {}
+
+
+def test_create_and_poll_bulk_stops_polling_a_stuck_job(fake_api, monkeypatch):
+    monkeypatch.setattr(Tilt, "poll_interval", 0.01)
+    monkeypatch.setattr(Tilt, "job_poll_limit", 5)
+    fake_api.bulk = True
+    tilt = Tilt(
+        Options(data=Some([b"a"]), program_id=Some(uuid.uuid4()), secret_key=Some("sk"))
+    )
+    try:
+        fake_api.bulk_status = "in_progress"
+        with pytest.raises(TimeoutError):
+            tilt.create_and_poll(bulk=True)
+        fake_api.bulk_status = None
+        with pytest.raises(RuntimeError, match="404"):
+            tilt.create_and_poll(bulk=True)
+    finally:
+        tilt.close()
+
+
+def test_create_and_poll_fails_chunk_when_run_task_fails(fake_api):
+    fake_api.failing_segments = {1}
+    tilt = Tilt(
+        Options(
+            data=Some([b"a", b"b"]),
+            program_id=Some(uuid.uuid4()),
+            secret_key=Some("sk"),
+        )
+    )
+    started = time.monotonic()
+    try:
+        results = tilt.create_and_poll(max_workers=2)
+    finally:
+        tilt.close()
+
+    # Without polling for a result that can never arrive
+    assert time.monotonic() - started < Tilt.poll_interval
+    assert results == [(0, Some(b"A")), (1, None)]
+    assert tilt.job_state.status(1) == ChunkStatus.FAILED
@@ -0,0 +1,71 @@
+import uuid
+
+import pytest
+
+from tilt.options import Options
+from tilt.sectioner import ChunkManifest
+from tilt.source_handler import BinarySourceHandler
+from tilt.tilt import Tilt
+from tilt.tuning import ChunkSizeTuner
+from tilt.types import Some
+
+OVERHEAD = 2.0
+BYTES_PER_SECOND = 1000.0
+
+
+def simulate(size):
+    return OVERHEAD + size / BYTES_PER_SECOND
+
+
+def test_tuner_converges_to_target_duration():
+    tuner = ChunkSizeTuner(
+        target_seconds=10.0, initial_size=1000, min_size=100, max_size=10**6
+    )
+    sizes = []
+    for _ in range(12):
+        size = tuner.next_size()
+        sizes.append(size)
+        tuner.observe(size, simulate(size))
+
+    assert sizes[:4] == [1000, 500, 1000, 500]
+    overhead, rate = tuner.fit()
+    assert overhead == pytest.approx(OVERHEAD)
+    assert rate == pytest.approx(BYTES_PER_SECOND)
+    assert tuner.size == 8000
+    assert simulate(sizes[-1]) == pytest.approx(10.0)
+
+
+def test_tuner_grows_to_max_when_overhead_dominates():
+    tuner = ChunkSizeTuner(
+        target_seconds=1.0, initial_size=1000, min_size=100, max_size=4000
+    )
+    for _ in range(6):
+        size = tuner.next_size()
+        tuner.observe(size, simulate(size))
+
+    assert tuner.size == 4000
+
+
+def test_tuned_binary_job_records_boundaries(fake_api, tmp_path, monkeypatch):
+    monkeypatch.setattr(Tilt, "poll_interval", 0.02)
+    source = tmp_path / "input.bin"
+    source.write_bytes(bytes(range(97, 123)) * 2000)
+    manifest_path = tmp_path / "input.manifest.json"
+    tuner = ChunkSizeTuner(target_seconds=1.0, initial_size=4096, min_size=1024)
+    handler = BinarySourceHandler(
+        str(source), tuner=tuner, manifest_path=str(manifest_path)
+    )
+    options = Options(
+        data_src=Some(handler), program_id=Some(uuid.uuid4()), secret_key=Some("sk")
+    )
+    tilt = Tilt(options)
+    try:
+        results = tilt.create_and_poll(max_workers=2)
+    finally:
+        tilt.close()
+
+    manifest = ChunkManifest.load(str(manifest_path))
+    assert manifest.total_size == source.stat().st_size
+    assert [e.length for e in manifest.entries] == [len(r.value) for _, r in results]
+    assert b"".join(r.value for _, r in results) == source.read_bytes().upper()
+    assert tuner.size > 4096  # fast fake tasks: chunks grow
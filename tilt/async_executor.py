@@ -1,5 +1,18 @@
 import asyncio
+import concurrent.futures
 import threading
+from typing import Any, Awaitable, Callable, Coroutine, Iterable, Optional, TypeVar
+
+from tilt.log import TiltLog
+from tilt.loop_monitor import LoopMetrics, LoopMonitor
+
+try:
+    import uvloop as _uvloop
+except ImportError:  # the default asyncio loop is used instead
+    _uvloop = None
+
+T = TypeVar("T")
+R = TypeVar("R")
 
 
 class AsyncExecutor:
@@ -10,20 +23,53 @@ class AsyncExecutor:
     blocking the main thread's flow or requiring the user to manage loops.
     """
 
-    def __init__(self):
-        """Initializes the event loop and starts it in a background daemon thread."""
-        self._loop = asyncio.new_event_loop()
+    def __init__(self, use_uvloop: bool = False, monitor: bool = False):
+        """
+        Initializes the event loop and starts it in a background daemon thread.
+
+        Args:
+            use_uvloop: Run the loop on uvloop if it is installed.
+            monitor: Sample loop lag and task counts and capture the stack of
+                anything that blocks the loop (see metrics()).
+        """
+        self._loop = self._new_loop(use_uvloop)
         self._thread = threading.Thread(
             target=self._run_loop,
+            name="tilt-loop",
             daemon=True,
         )
         self._thread.start()
+        self._monitor: Optional[LoopMonitor] = None
+        if monitor:
+            self._monitor = LoopMonitor(self._loop, self._thread)
+            self._monitor.start()
+
+    @staticmethod
+    def _new_loop(use_uvloop: bool) -> asyncio.AbstractEventLoop:
+        if use_uvloop:
+            if _uvloop is not None:
+                return _uvloop.new_event_loop()
+            TiltLog.warning(
+                "uvloop is not installed (pip install tilt_py[uvloop]), "
+                "using the default event loop"
+            )
+        return asyncio.new_event_loop()
 
     def _run_loop(self):
         """The entry point for the background thread; keeps the event loop running forever."""
         asyncio.set_event_loop(self._loop)
         self._loop.run_forever()
 
+    def submit(self, coro: Coroutine[Any, Any, T]) -> "concurrent.futures.Future[T]":
+        """
+        Schedules a coroutine on the background loop without waiting for it.
+
+        Returns:
+            A concurrent.futures.Future for the coroutine's result, so callers
+            can keep several requests in flight from one thread.
+        """
+        return asyncio.run_coroutine_threadsafe(coro, self._loop)
+
     def run(self, coro):
         """
         Executes a coroutine in the background loop and waits for the result.
@@ -34,14 +80,68 @@ class AsyncExecutor:
         Returns:
             The result of the coroutine execution.
         """
-        future = asyncio.run_coroutine_threadsafe(coro, self._loop)
-        return future.result()
+        return self.submit(coro).result()
+
+    def run_many(
+        self,
+        coros: Iterable[Coroutine[Any, Any, T]],
+        return_exceptions: bool = False,
+    ) -> list:
+        """
+        Runs a batch of coroutines concurrently with a single cross-thread
+        handoff and waits for all of them.
+
+        Returns:
+            The results in submission order. With return_exceptions=True a
+            failed coroutine's exception takes its place instead of being raised.
+        """
+        coros = list(coros)
+
+        async def gather():
+            return await asyncio.gather(*coros, return_exceptions=return_exceptions)
+
+        return self.run(gather())
+
+    def map(
+        self,
+        fn: Callable[[T], Awaitable[R]],
+        items: Iterable[T],
+        limit: Optional[int] = None,
+        return_exceptions: bool = False,
+    ) -> list:
+        """
+        Applies an async function to every item concurrently, at most `limit`
+        at a time, in one handoff. Results keep the order of items.
+        """
+        items = list(items)
+
+        async def run_all():
+            semaphore = asyncio.Semaphore(limit or len(items) or 1)
+
+            async def bounded(item):
+                async with semaphore:
+                    return await fn(item)
+
+            return await asyncio.gather(
+                *(bounded(item) for item in items),
+                return_exceptions=return_exceptions,
+            )
+
+        return self.run(run_all())
+
+    def metrics(self) -> LoopMetrics:
+        """Loop health as seen by the monitor; empty if monitoring is off."""
+        if self._monitor is None:
+            return LoopMetrics()
+        return self._monitor.metrics()
 
     def close(self):
         """
         Safely stops the background event loop and joins the thread.
         Ensures all pending tasks are handled before shutdown.
         """
+        if self._monitor is not None:
+            self._monitor.stop()
         if self._loop.is_running():
             self._loop.call_soon_threadsafe(self._loop.stop)
 
@@ -0,0 +1,117 @@
+import struct
+import zlib
+from typing import Iterable, Iterator, Optional, Protocol, Union
+
+from tilt.sectioner import ChunkData, FileRegion
+
+# Binary container for multi-chunk results: MAGIC, then one record per chunk,
+# each a fixed header (index u32, length u64, crc32 u32, little-endian)
+# followed by `length` raw bytes. Records need not be in index order.
+MAGIC = b"TILTCHK\x01"
+HEADER = struct.Struct("<IQI")
+CONTENT_TYPE = "application/x-tilt-chunks"
+
+
+class ChunkSink(Protocol):
+    """Receives decoded chunks piece by piece."""
+
+    def begin(self, index: int) -> None: ...
+
+    def write(self, data: Union[bytes, memoryview]) -> None: ...
+
+    def end(self) -> None: ...
+
+
+def _crc32(data: ChunkData) -> int:
+    if isinstance(data, FileRegion):
+        crc = 0
+        for block in data.iter_blocks():
+            crc = zlib.crc32(block, crc)
+        return crc
+    return zlib.crc32(data)
+
+
+def encoded_size(chunks: Iterable[tuple[int, ChunkData]]) -> int:
+    """Length of the container encode_chunks yields for the same chunks."""
+    return len(MAGIC) + sum(HEADER.size + len(data) for _, data in chunks)
+
+
+def encode_chunks(
+    chunks: Iterable[tuple[int, ChunkData]],
+) -> Iterator[Union[bytes, memoryview]]:
+    """
+    Yields the container for (index, data) pairs as a sequence of byte blocks.
+    FileRegions are read twice (checksum, then body) but never held whole.
+    """
+    yield MAGIC
+    for index, data in chunks:
+        yield HEADER.pack(index, len(data), _crc32(data))
+        if isinstance(data, FileRegion):
+            yield from data.iter_blocks()
+        else:
+            yield data
+
+
+class ChunkStreamDecoder:
+    """
+    Incremental decoder for the container. Blocks can be split anywhere;
+    payload bytes are handed to the sink as views of the fed block, without
+    copying.
+    """
+
+    def __init__(self):
+        self.__pending = bytearray()
+        self.__magic_seen = False
+        self.__index = 0
+        self.__remaining: Optional[int] = None
+        self.__crc = 0
+        self.__expected_crc = 0
+
+    def feed(self, block: Union[bytes, memoryview], sink: ChunkSink) -> None:
+        view = memoryview(block)
+        while view:
+            if not self.__magic_seen:
+                view = self.__fill(view, len(MAGIC))
+                if len(self.__pending) < len(MAGIC):
+                    return
+                if self.__pending != MAGIC:
+                    raise ValueError("Not a Tilt chunk container")
+                self.__magic_seen = True
+                self.__pending.clear()
+            elif self.__remaining is None:
+                view = self.__fill(view, HEADER.size)
+                if len(self.__pending) < HEADER.size:
+                    return
+                self.__index, length, self.__expected_crc = HEADER.unpack(
+                    self.__pending
+                )
+                self.__pending.clear()
+                self.__remaining = length
+                self.__crc = 0
+                sink.begin(self.__index)
+                if length == 0:
+                    self.__finish(sink)
+            else:
+                piece = view[: self.__remaining]
+                view = view[len(piece) :]
+                self.__crc = zlib.crc32(piece, self.__crc)
+                sink.write(piece)
+                self.__remaining -= len(piece)
+                if self.__remaining == 0:
+                    self.__finish(sink)
+
+    def close(self, sink: ChunkSink) -> None:
+        """Checks the stream ended on a record boundary."""
+        if not self.__magic_seen or self.__remaining is not None or self.__pending:
+            raise ValueError("Truncated chunk container")
+
+    def __fill(self, view: memoryview, size: int) -> memoryview:
+        need = size - len(self.__pending)
+        self.__pending += view[:need]
+        return view[need:]
+
+    def __finish(self, sink: ChunkSink) -> None:
+        if self.__crc != self.__expected_crc:
+            raise ValueError(f"Checksum mismatch in chunk {self.__index}")
+        sink.end()
+        self.__remaining = None
@@ -0,0 +1,35 @@
+import gzip
+from typing import BinaryIO
+
+try:
+    import zstandard as _zstd
+except ImportError:  # .zst inputs need the optional "zstd" extra
+    _zstd = None
+
+GZIP_SUFFIXES = (".gz", ".gzip")
+ZSTD_SUFFIXES = (".zst", ".zstd")
+
+
+def is_compressed(filepath: str) -> bool:
+    return filepath.endswith(GZIP_SUFFIXES + ZSTD_SUFFIXES)
+
+
+def open_decompressed(filepath: str) -> BinaryIO:
+    """
+    Opens filepath for binary reading, decompressing gzip and zstd files
+    (by extension) as they are read. Other files are opened as-is.
+    """
+    if filepath.endswith(GZIP_SUFFIXES):
+        return gzip.open(filepath, "rb")  # type: ignore[return-value]
+    if filepath.endswith(ZSTD_SUFFIXES):
+        if _zstd is None:
+            raise ImportError(
+                f"Reading {filepath} requires zstandard: pip install tilt_py[zstd]"
+            )
+        raw = open(filepath, "rb")
+        try:
+            return _zstd.ZstdDecompressor().stream_reader(raw, closefd=True)
+        except Exception:
+            raw.close()
+            raise
+    return open(filepath, "rb")
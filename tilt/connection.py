@@ -1,10 +1,21 @@
+import asyncio
 import json
 from pathlib import Path
+from typing import Any, Iterable, Optional
 from uuid import UUID
 
 import aiohttp
-
+from aiohttp.payload import Payload
+
+from tilt.chunk_format import (
+    CONTENT_TYPE,
+    ChunkSink,
+    ChunkStreamDecoder,
+    encode_chunks,
+    encoded_size,
+)
 from tilt.endpoints import (
+    job_endpoint,
     jobs_endpoint,
     programs_endpoint,
     run_task_endpoint,
@@ -16,6 +27,8 @@ from tilt.entities.job import Job
 from tilt.entities.task import Task
 from tilt.log import TiltLog
 from tilt.options import Options
+from tilt.program_index import ProgramIndex, file_digest
+from tilt.sectioner import REGION_BLOCK_SIZE, ChunkData, FileRegion
 from tilt.types import (
     CustomJSONEncoder,
     Err,
@@ -23,6 +36,8 @@ from tilt.types import (
     Ok,
     Option,
     Result,
+    Some,
+    is_some,
     unwrap,
 )
 
@@ -30,10 +45,90 @@ from tilt.types import (
 def custom_json_serializer(obj):
     """Serializes an object to JSON string and logs the output."""
     json_str = json.dumps(obj, cls=CustomJSONEncoder)
-    TiltLog.info(f"Sending JSON: {json_str}")
+    TiltLog.debug("Sending JSON: %s", json_str)
     return json_str
 
 
+class FileRegionPayload(Payload):
+    """
+    Request body that streams a FileRegion from disk block by block, so an
+    upload holds at most one block of the region in memory.
+    """
+
+    _default_content_type = "application/octet-stream"
+
+    def __init__(self, value: FileRegion, *args: Any, **kwargs: Any):
+        super().__init__(value, *args, **kwargs)
+        self._size = value.length
+
+    async def write(self, writer) -> None:
+        loop = asyncio.get_running_loop()
+        region: FileRegion = self._value
+        with open(region.path, "rb") as f:
+            await loop.run_in_executor(None, f.seek, region.offset)
+            remaining = region.length
+            while remaining > 0:
+                block = await loop.run_in_executor(
+                    None, f.read, min(REGION_BLOCK_SIZE, remaining)
+                )
+                if not block:
+                    raise EOFError(
+                        f"{region.path} ended {remaining} bytes before the region end"
+                    )
+                remaining -= len(block)
+                await writer.write(block)
+
+    def decode(self, encoding: str = "utf-8", errors: str = "strict") -> str:
+        return self._value.read().decode(encoding, errors)
+
+
+class ChunkContainerPayload(Payload):
+    """
+    Request body that streams (index, data) pairs as a chunk container.
+
+    Chunks are pulled from the iterable and encoded in a worker thread, a
+    few blocks at a time, so a lazy source is read as the upload proceeds
+    and FileRegions are never held whole. A list of chunks is sent with a
+    Content-Length (presigned storage URLs require one); any other iterable
+    is sent with chunked transfer encoding.
+    """
+
+    _default_content_type = CONTENT_TYPE
+
+    def __init__(
+        self, value: Iterable[tuple[int, ChunkData]], *args: Any, **kwargs: Any
+    ):
+        super().__init__(value, *args, **kwargs)
+        self._size = encoded_size(value) if isinstance(value, list) else None
+
+    async def write(self, writer) -> None:
+        blocks = encode_chunks(self._value)
+
+        def take() -> list:
+            # Coalesce small chunks into one thread hop
+            taken, size = [], 0
+            for block in blocks:
+                taken.append(block)
+                size += len(block)
+                if size >= REGION_BLOCK_SIZE:
+                    break
+            return taken
+
+        while taken := await asyncio.to_thread(take):
+            for block in taken:
+                await writer.write(block)
+
+    def decode(self, encoding: str = "utf-8", errors: str = "strict") -> str:
+        return b"".join(encode_chunks(self._value)).decode(encoding, errors)
+
+
+def as_payload(data: ChunkData):
+    """Adapts chunk data to something aiohttp can send without copying it."""
+    if isinstance(data, FileRegion):
+        return FileRegionPayload(data)
+    return data
+
+
 class Connection:
     """Handles HTTP connections and API interactions for the Tilt service."""
 
@@ -41,6 +136,7 @@ class Connection:
         """Initializes the Connection with the given options."""
         self.__options = options
         self._session: aiohttp.ClientSession | None = None
+        self._program_index = ProgramIndex()
 
     async def _get_session(self) -> aiohttp.ClientSession:
         """Gets or creates an aiohttp ClientSession."""
@@ -58,7 +154,10 @@ class Connection:
         if resp.status != expected_status:
             body = await resp.text()
             return Err(
-                Error(f"{context} Invalid response status {resp.status}: {body}")
+                Error(
+                    f"{context} Invalid response status {resp.status}: {body}",
+                    status=resp.status,
+                )
             )
 
         try:
@@ -81,7 +180,7 @@ class Connection:
                     res = from_json_func(data)
                     return Ok(res)
                 except TypeError as e:
-                    TiltLog.error(f"{context} Failed to parse response: {e}")
+                    TiltLog.error("%s Failed to parse response: %s", context, e)
                     return Err(Error(f"{context} Invalid response format: {e}"))
             case Err(error):
                 return Err(error)
@@ -105,37 +204,91 @@ class Connection:
         filepath: str,
         name: Option[str] = None,
         description: Option[str] = None,
-    ):
-        """Uploads a program file to the Tilt platform."""
+        force: bool = False,
+        retries: int = 3,
+    ) -> Result[UUID, Error]:
+        """
+        Uploads a program file to the Tilt platform and returns its id.
+
+        The file is streamed from disk. Binaries whose content hash is already
+        in the local program index are not uploaded again unless force is set.
+        Connection errors and 5xx responses are retried with exponential
+        backoff; each attempt re-streams the file from disk.
+        """
         url = programs_endpoint(self.__options.base_url)
         headers = {"Authorization": f"Bearer {unwrap(self.__options.auth_token)}"}
-
-        file_data = Path(filepath).read_bytes()
-
-        form = aiohttp.FormData()
-        form.add_field(
-            "program",
-            file_data,
-            filename=Path(filepath).name,
-            content_type="application/octet-stream",
-        )
-        form.add_field("organization_id", self.__options.organization_id)
-        form.add_field("name", name)
-        form.add_field("description", description)
-
+        organization_id = unwrap(self.__options.organization_id)
+
+        digest = await asyncio.to_thread(file_digest, filepath)
+        key = ProgramIndex.key(self.__options.base_url, organization_id, digest)
+        if not force:
+            match self._program_index.get(key):
+                case Some(program_id):
+                    TiltLog.info(
+                        "Program %s already uploaded: %s", digest[:12], program_id
+                    )
+                    return Ok(program_id)
+
+        region = FileRegion(filepath, 0, Path(filepath).stat().st_size)
         session = await self._get_session()
-        async with session.post(url, data=form, headers=headers) as resp:
-            match await self._handle_response(resp, 200, "(upload_program)"):
-                case Ok(data):
-                    return data
-                case Err(error):
-                    TiltLog.error(f"Upload program failed: {error.message}")
-                    raise RuntimeError(error.message)
+        attempt = 0
+        while True:
+            form = aiohttp.FormData()
+            form.add_field(
+                "program",
+                FileRegionPayload(region),
+                filename=Path(filepath).name,
+                content_type="application/octet-stream",
+            )
+            form.add_field("organization_id", str(organization_id))
+            if is_some(name):
+                form.add_field("name", name.value)
+            if is_some(description):
+                form.add_field("description", description.value)
+
+            try:
+                async with session.post(url, data=form, headers=headers) as resp:
+                    if resp.status < 500 or attempt >= retries:
+                        result = await self._handle_response(
+                            resp, 200, "(upload_program)"
+                        )
+                        break
+                    TiltLog.warning("Upload program got %s, retrying", resp.status)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                if attempt >= retries:
+                    result = Err(Error(f"(upload_program) {e}"))
+                    break
+                TiltLog.warning("Upload program failed (%s), retrying", e)
+
+            attempt += 1
+            await asyncio.sleep(0.5 * 2**attempt)
+
+        match result:
+            case Ok(data):
+                try:
+                    program_id = UUID(data["id"])
+                except (KeyError, TypeError, ValueError) as e:
+                    return Err(Error(f"(upload_program) Invalid response format: {e}"))
+                self._program_index.put(key, program_id)
+                return Ok(program_id)
+            case Err(error):
+                TiltLog.error("Upload program failed: %s", error.message)
+                return Err(error)
 
     async def create_job(
-        self, name: Option[str] = None, status: str = "pending"
+        self,
+        name: Option[str] = None,
+        status: str = "pending",
+        total_tasks: Optional[int] = None,
+        bulk: bool = False,
     ) -> Result[Job, Error]:
-        """Creates a new job on the Tilt platform."""
+        """
+        Creates a new job on the Tilt platform.
+
+        With bulk, asks for a job whose whole input is uploaded once to its
+        input_url and split into tasks server side. Servers without bulk
+        support return a job without an input_url.
+        """
         url = jobs_endpoint(self.__options.base_url)
 
         headers = {
@@ -150,6 +303,10 @@ class Connection:
             "total_tokens": 0,
             "program_id": self.__options.program_id,
         }
+        if total_tasks is not None:
+            payload["total_tasks"] = total_tasks
+        if bulk:
+            payload["mode"] = "bulk"
 
         session = await self._get_session()
         async with session.post(url, json=payload, headers=headers) as resp:
@@ -157,6 +314,76 @@ class Connection:
                 resp, 201, Job.from_json, "(create_job)"
             )
 
+    async def get_job(self, job_id: UUID) -> Result[Job, Error]:
+        """Fetches a job, e.g. to follow its status."""
+        url = job_endpoint(self.__options.base_url, job_id)
+        headers = {"Authorization": f"Bearer {unwrap(self.__options.auth_token)}"}
+
+        session = await self._get_session()
+        async with session.get(url, headers=headers) as resp:
+            return await self._handle_parsed_response(
+                resp, 200, Job.from_json, "(get_job)"
+            )
+
+    def _headers_for(self, url: str) -> dict[str, str]:
+        # input/output URLs may be presigned storage URLs, which reject
+        # (and must not receive) the API token
+        if url.startswith(self.__options.base_url):
+            return {"Authorization": f"Bearer {unwrap(self.__options.auth_token)}"}
+        return {}
+
+    async def upload_job_input(
+        self, input_url: str, chunks: Iterable[tuple[int, ChunkData]]
+    ) -> Result[None, Error]:
+        """
+        Uploads all of a bulk job's chunks to its input_url in one streamed
+        request, as a chunk container. Pass a list to send a Content-Length
+        instead of chunked encoding.
+        """
+        context = "(upload_job_input)"
+        headers = self._headers_for(input_url)
+        headers["Content-Type"] = CONTENT_TYPE
+
+        session = await self._get_session()
+        async with session.put(
+            input_url, data=ChunkContainerPayload(chunks), headers=headers
+        ) as resp:
+            if resp.status not in (200, 201, 204):
+                body = await resp.text()
+                return Err(
+                    Error(f"{context} Invalid response status {resp.status}: {body}")
+                )
+            return Ok(None)
+
+    async def download_job_output(
+        self, output_url: str, sink: ChunkSink, block_size: int = REGION_BLOCK_SIZE
+    ) -> Result[int, Error]:
+        """
+        Streams a bulk job's combined output from its output_url, decoding
+        the chunk container into sink as it arrives. Returns the bytes read.
+        """
+        context = "(download_job_output)"
+        headers = self._headers_for(output_url)
+        headers["Accept"] = CONTENT_TYPE
+
+        session = await self._get_session()
+        async with session.get(output_url, headers=headers) as resp:
+            if resp.status != 200:
+                body = await resp.text()
+                return Err(
+                    Error(f"{context} Invalid response status {resp.status}: {body}")
+                )
+            decoder = ChunkStreamDecoder()
+            received = 0
+            try:
+                async for block in resp.content.iter_chunked(block_size):
+                    received += len(block)
+                    decoder.feed(block, sink)
+                decoder.close(sink)
+            except ValueError as e:
+                return Err(Error(f"{context} {e}"))
+            return Ok(received)
+
     async def create_task(
         self, job_id: UUID, index: int, status: str = "pending"
     ) -> Result[Task, Error]:
@@ -176,15 +403,18 @@ class Connection:
                 resp, 201, Task.from_json, "(create_task)"
             )
 
-    async def run_task(self, task_id: UUID, data: bytes) -> Result[Task, Error]:
-        """Runs a task with the provided data on the Tilt platform."""
+    async def run_task(self, task_id: UUID, data: ChunkData) -> Result[Task, Error]:
+        """
+        Runs a task with the provided data on the Tilt platform.
+        FileRegion data is streamed from disk rather than loaded into memory.
+        """
         url = run_task_endpoint(self.__options.base_url)
 
         headers = {"Authorization": f"Bearer {unwrap(self.__options.auth_token)}"}
 
         form = aiohttp.FormData()
         form.add_field("task_id", str(task_id))
-        form.add_field("data", data, filename="data.dat")
+        form.add_field("data", as_payload(data), filename="data.dat")
 
         session = await self._get_session()
         async with session.post(url, data=form, headers=headers) as resp:
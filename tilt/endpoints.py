@@ -25,6 +25,10 @@ def jobs_endpoint(base_url):
     return f"{base_url}/jobs"
 
 
+def job_endpoint(base_url, job_id: UUID):
+    return f"{base_url}/jobs/{job_id}"
+
+
 def tasks_endpoint(base_url):
     return f"{base_url}/tasks"
 
@@ -0,0 +1,171 @@
+import math
+import threading
+import time
+from array import array
+from enum import IntEnum
+from typing import Optional, Sequence
+from uuid import UUID
+
+try:
+    import numpy as _np
+except ImportError:  # durations fall back to pure Python
+    _np = None
+
+
+class ChunkStatus(IntEnum):
+    PENDING = 0
+    RUNNING = 1
+    FINISHED = 2
+    FAILED = 3
+
+
+class Phase(IntEnum):
+    """Points in a chunk's life whose wall-clock time is recorded."""
+
+    QUEUED = 0  # handed to a worker
+    SUBMITTED = 1  # task created and its data uploaded
+    DONE = 2  # result downloaded, or the chunk failed
+
+
+# Status changes that also stamp a phase
+_STATUS_PHASE = {
+    ChunkStatus.RUNNING: Phase.QUEUED,
+    ChunkStatus.FINISHED: Phase.DONE,
+    ChunkStatus.FAILED: Phase.DONE,
+}
+
+_UUID_BYTES = 16
+_NO_TIME = math.nan
+
+
+class JobStateTable:
+    """
+    Per-chunk state of a job in flat arrays, indexed by chunk index.
+
+    Each chunk costs 1 status byte, 2 attempt-count bytes, 16 task id bytes,
+    8 bytes per Phase timestamp and 8 bytes each for payload size, result
+    size and tokens used, with no per-chunk Python objects, so a
+    million-chunk job needs a few tens of MB. Payloads are not stored here;
+    callers keep referencing the source's own buffers.
+
+    Single-element updates are safe from several threads. The table grows on
+    append() for sources whose length is not known up front.
+    """
+
+    def __init__(self, size: int = 0):
+        self.__lock = threading.Lock()
+        self.__status = bytearray(size)
+        self.__attempts = array("H", bytes(2 * size))
+        self.__task_ids = bytearray(_UUID_BYTES * size)
+        self.__times = array("d", [_NO_TIME]) * (len(Phase) * size)
+        # -1 where not known (yet)
+        self.__payload_sizes = array("q", [-1]) * size
+        self.__result_sizes = array("q", [-1]) * size
+        self.__tokens = array("q", [-1]) * size
+
+    def __len__(self) -> int:
+        return len(self.__status)
+
+    def append(self) -> int:
+        """Adds a pending chunk and returns its index."""
+        with self.__lock:
+            self.__status.append(ChunkStatus.PENDING)
+            self.__attempts.append(0)
+            self.__task_ids.extend(bytes(_UUID_BYTES))
+            self.__times.extend([_NO_TIME] * len(Phase))
+            self.__payload_sizes.append(-1)
+            self.__result_sizes.append(-1)
+            self.__tokens.append(-1)
+            return len(self.__status) - 1
+
+    def status(self, index: int) -> ChunkStatus:
+        return ChunkStatus(self.__status[index])
+
+    def set_status(self, index: int, status: ChunkStatus) -> None:
+        self.__status[index] = status
+        if status == ChunkStatus.RUNNING:
+            self.__attempts[index] += 1
+            if self.__attempts[index] > 1:
+                return  # a chunk's age counts from its first attempt
+        if (phase := _STATUS_PHASE.get(status)) is not None:
+            self.mark(index, phase)
+
+    def mark(self, index: int, phase: Phase, at: Optional[float] = None) -> None:
+        self.__times[index * len(Phase) + phase] = time.time() if at is None else at
+
+    def timestamp(self, index: int, phase: Phase) -> Optional[float]:
+        value = self.__times[index * len(Phase) + phase]
+        return None if math.isnan(value) else value
+
+    def attempts(self, index: int) -> int:
+        return self.__attempts[index]
+
+    def set_task_id(self, index: int, task_id: UUID) -> None:
+        start = index * _UUID_BYTES
+        self.__task_ids[start : start + _UUID_BYTES] = task_id.bytes
+
+    def task_id(self, index: int) -> Optional[UUID]:
+        start = index * _UUID_BYTES
+        raw = bytes(self.__task_ids[start : start + _UUID_BYTES])
+        return UUID(bytes=raw) if any(raw) else None
+
+    def set_payload_size(self, index: int, size: int) -> None:
+        self.__payload_sizes[index] = size
+
+    def set_result_size(self, index: int, size: int) -> None:
+        self.__result_sizes[index] = size
+
+    def set_tokens(self, index: int, tokens: int) -> None:
+        self.__tokens[index] = tokens
+
+    def payload_size(self, index: int) -> Optional[int]:
+        return _known(self.__payload_sizes[index])
+
+    def result_size(self, index: int) -> Optional[int]:
+        return _known(self.__result_sizes[index])
+
+    def tokens(self, index: int) -> Optional[int]:
+        return _known(self.__tokens[index])
+
+    def counts(self) -> dict[ChunkStatus, int]:
+        """Number of chunks in each status, counted in C over the status bytes."""
+        return {status: self.__status.count(status) for status in ChunkStatus}
+
+    def statuses(self, start: int = 0, stop: Optional[int] = None) -> bytes:
+        """Status codes of a range of chunks."""
+        return bytes(self.__status[start:stop])
+
+    def durations(
+        self, start: Phase, end: Phase, status: Optional[ChunkStatus] = None
+    ) -> Sequence[float]:
+        """
+        Seconds from `start` to `end` for every chunk that reached both
+        phases, optionally only those now in `status`. A NumPy array when
+        NumPy is installed.
+        """
+        width = len(Phase)
+        if _np is not None:
+            # Under the lock: append() cannot resize while NumPy views the arrays
+            with self.__lock:
+                times = _np.frombuffer(self.__times, dtype=_np.float64)
+                times = times.reshape(-1, width)
+                spans = times[:, end] - times[:, start]
+                keep = ~_np.isnan(spans)
+                if status is not None:
+                    codes = _np.frombuffer(self.__status, dtype=_np.uint8)
+                    keep &= codes == status
+                    del codes
+                del times
+            return spans[keep]
+        return [
+            span
+            for i in range(len(self))
+            if status is None or self.__status[i] == status
+            if not math.isnan(
+                span := self.__times[i * width + end] - self.__times[i * width + start]
+            )
+        ]
+
+
+def _known(value: int) -> Optional[int]:
+    return None if value < 0 else value
@@ -1,25 +1,241 @@
+import atexit
+import logging
+import logging.handlers
 import os
+import queue
 import sys
+import threading
+import time
+from typing import Any, Iterable, Optional
+
+SUCCESS = 25
+logging.addLevelName(SUCCESS, "SUCCESS")
+
+# Structured fields callers may attach to a record, rendered as key=value
+FIELDS = ("job_id", "task_id", "index", "phase", "latency")
+
+_MARKS = {
+    logging.DEBUG: "-",
+    logging.INFO: "-",
+    SUCCESS: "✓",
+    logging.WARNING: "!",
+    logging.ERROR: "x",
+}
+
+
+class TiltFormatter(logging.Formatter):
+    """Formats records as "[mark] message key=value ..."."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        text = f"[{_MARKS.get(record.levelno, '-')}] {record.getMessage()}"
+        fields = getattr(record, "tilt_fields", None)
+        if fields:
+            ordered = sorted(fields.items(), key=lambda kv: _field_rank(kv[0]))
+            text += " " + " ".join(f"{k}={_field(v)}" for k, v in ordered)
+        suppressed = getattr(record, "suppressed", 0)
+        if suppressed:
+            text += f" ({suppressed} similar messages suppressed)"
+        if record.exc_info:
+            text += "\n" + self.formatException(record.exc_info)
+        return text
+
+
+def _field_rank(name: str) -> int:
+    return FIELDS.index(name) if name in FIELDS else len(FIELDS)
+
+
+def _field(value: Any) -> str:
+    return f"{value:.3f}" if isinstance(value, float) else str(value)
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Lets at most `burst` records with the same level and message template
+    through per `period` seconds. The next record let through after a quiet
+    period carries the number that were dropped in between.
+
+    Records below `min_level` are never limited.
+    """
+
+    def __init__(
+        self, burst: int = 10, period: float = 10.0, min_level: int = logging.WARNING
+    ):
+        super().__init__()
+        self.burst = burst
+        self.period = period
+        self.min_level = min_level
+        self.__lock = threading.Lock()
+        # (level, template) -> [window start, records in window, suppressed]
+        self.__windows: dict[tuple[int, str], list] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno < self.min_level:
+            return True
+        key = (record.levelno, str(record.msg))
+        now = time.monotonic()
+        with self.__lock:
+            window = self.__windows.get(key)
+            if window is None or now - window[0] >= self.period:
+                suppressed = window[2] if window else 0
+                self.__windows[key] = [now, 1, 0]
+                record.suppressed = suppressed
+                return True
+            if window[1] < self.burst:
+                window[1] += 1
+                return True
+            window[2] += 1
+            return False
+
+
+class _MaxLevelFilter(logging.Filter):
+    def __init__(self, below: int):
+        super().__init__()
+        self.below = below
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return record.levelno < self.below
+
+
+def _default_handlers() -> list[logging.Handler]:
+    out = logging.StreamHandler(sys.stdout)
+    out.addFilter(_MaxLevelFilter(logging.ERROR))
+    err = logging.StreamHandler(sys.stderr)
+    err.setLevel(logging.ERROR)
+    for handler in (out, err):
+        handler.setFormatter(TiltFormatter())
+    return [out, err]
 
 
 class TiltLog:
+    """
+    The client's logger, a thin front for the stdlib "tilt" logger.
+
+    Messages are %-style templates formatted only if the record is emitted,
+    e.g. TiltLog.error("Chunk %d failed: %s", idx, e, job_id=job_id), and
+    keyword arguments in FIELDS are attached as structured fields. Records
+    are handed to a background thread through a queue, so callers on worker
+    threads or the event loop never block on terminal I/O, and repeated
+    warnings and errors are rate limited.
+
+    Nothing is set up at import. Records propagate to the application's own
+    logging configuration; only if it has none when the first record is
+    logged are the default handlers installed behind the queue, showing only
+    errors (everything with DEBUG=1).
+    """
+
     debug_mode = os.environ.get("DEBUG") == "1"
+    logger = logging.getLogger("tilt")
+    rate_limit = RateLimitFilter()
+
+    _listener: Optional[logging.handlers.QueueListener] = None
+    _queue_handler: Optional[logging.handlers.QueueHandler] = None
+    _configured = False
+    _lock = threading.RLock()
+
+    @classmethod
+    def configure(
+        cls,
+        level: Optional[int] = None,
+        handlers: Optional[Iterable[logging.Handler]] = None,
+    ) -> None:
+        """
+        (Re)installs the queue handler. `handlers` receive records on the
+        listener thread, and records then no longer propagate to the root
+        logger; by default info goes to stdout and errors to stderr.
+        """
+        with cls._lock:
+            cls.shutdown()
+            cls._configured = True
+            if level is None:
+                level = logging.DEBUG if cls.debug_mode else logging.ERROR
+            cls.logger.setLevel(level)
+            cls.logger.propagate = handlers is None
+            cls._install_rate_limit()
+
+            record_queue: queue.SimpleQueue = queue.SimpleQueue()
+            cls._queue_handler = logging.handlers.QueueHandler(record_queue)
+            cls.logger.addHandler(cls._queue_handler)
+            cls._listener = logging.handlers.QueueListener(
+                record_queue,
+                *(handlers if handlers is not None else _default_handlers()),
+                respect_handler_level=True,
+            )
+            cls._listener.start()
+
+    @classmethod
+    def reset(cls) -> None:
+        """Removes what configure() installed; the next record sets up again."""
+        with cls._lock:
+            cls.shutdown()
+            cls.logger.setLevel(logging.NOTSET)
+            cls.logger.propagate = True
+            cls._configured = False
+
+    @classmethod
+    def _install_rate_limit(cls) -> None:
+        # On the logger, so it also applies to records the app's handlers get
+        for existing in list(cls.logger.filters):
+            if isinstance(existing, RateLimitFilter):
+                cls.logger.removeFilter(existing)
+        cls.logger.addFilter(cls.rate_limit)
+
+    @classmethod
+    def _configure_lazily(cls) -> None:
+        with cls._lock:
+            if cls._configured:
+                return
+            if cls.logger.hasHandlers():
+                # The application configured logging: leave routing to it
+                cls._configured = True
+                cls._install_rate_limit()
+                if cls.debug_mode:
+                    cls.logger.setLevel(logging.DEBUG)
+                return
+            cls.configure()
+
+    @classmethod
+    def shutdown(cls) -> None:
+        """Flushes queued records and stops the listener thread."""
+        if cls._listener is not None:
+            cls._listener.stop()
+            cls._listener = None
+        if cls._queue_handler is not None:
+            cls.logger.removeHandler(cls._queue_handler)
+            cls._queue_handler = None
+
+    @classmethod
+    def _log(cls, level: int, msg: str, args: tuple, fields: dict) -> None:
+        if not cls._configured:
+            cls._configure_lazily()
+        if cls.logger.isEnabledFor(level):
+            cls.logger.log(
+                level,
+                msg,
+                *args,
+                exc_info=fields.pop("exc_info", None),
+                extra={"tilt_fields": fields},
+                stacklevel=3,
+            )
 
     @staticmethod
-    def success(msg: str):
-        if TiltLog.debug_mode:
-            print(f"[✓] {msg}", file=sys.stdout)
+    def debug(msg: str, *args: Any, **fields: Any):
+        TiltLog._log(logging.DEBUG, msg, args, fields)
 
     @staticmethod
-    def warning(msg: str):
-        if TiltLog.debug_mode:
-            print(f"[!] {msg}", file=sys.stdout)
+    def success(msg: str, *args: Any, **fields: Any):
+        TiltLog._log(SUCCESS, msg, args, fields)
 
     @staticmethod
-    def info(msg: str):
-        if TiltLog.debug_mode:
-            print(f"[-] {msg}", file=sys.stdout)
+    def warning(msg: str, *args: Any, **fields: Any):
+        TiltLog._log(logging.WARNING, msg, args, fields)
 
     @staticmethod
-    def error(msg: str):
-        print(f"[x] {msg}", file=sys.stderr)
+    def info(msg: str, *args: Any, **fields: Any):
+        TiltLog._log(logging.INFO, msg, args, fields)
+
+    @staticmethod
+    def error(msg: str, *args: Any, **fields: Any):
+        TiltLog._log(logging.ERROR, msg, args, fields)
+
+
+atexit.register(TiltLog.shutdown)
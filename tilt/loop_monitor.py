@@ -0,0 +1,162 @@
+import asyncio
+import collections
+import sys
+import threading
+import time
+import traceback
+from dataclasses import dataclass, field
+from typing import Optional
+
+from tilt.log import TiltLog
+
+
+@dataclass(frozen=True)
+class Stall:
+    """A period during which the loop did not get back to its scheduler."""
+
+    started_at: float  # wall clock (time.time()), like job timings
+    duration: float
+    stack: str  # the loop thread's stack when the stall was noticed
+
+
+@dataclass(frozen=True)
+class LoopMetrics:
+    """Snapshot of the background event loop's health."""
+
+    lag_last: float = 0.0
+    lag_max: float = 0.0
+    lag_mean: float = 0.0
+    samples: int = 0
+    slow_callbacks: int = 0
+    tasks: int = 0
+    tasks_peak: int = 0
+    stalls: list[Stall] = field(default_factory=list)
+
+
+class LoopMonitor:
+    """
+    Watches an event loop running in another thread.
+
+    A sampler coroutine on the loop wakes every `interval` seconds and records
+    how late it woke up (loop lag) and how many tasks exist. A watchdog
+    thread checks the sampler's heartbeat; once it is more than
+    `slow_threshold` overdue, whatever is running on the loop is blocking it,
+    so the loop thread's stack is captured to show what.
+    """
+
+    def __init__(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        thread: threading.Thread,
+        interval: float = 0.1,
+        slow_threshold: float = 0.25,
+        max_stalls: int = 20,
+    ):
+        self.__loop = loop
+        self.__thread = thread
+        self.__interval = interval
+        self.__slow_threshold = slow_threshold
+        self.__lock = threading.Lock()
+        self.__stop = threading.Event()
+        self.__stalls: collections.deque[Stall] = collections.deque(
+            maxlen=max_stalls
+        )
+        self.__heartbeat = time.monotonic()
+        self.__lag_last = 0.0
+        self.__lag_max = 0.0
+        self.__lag_total = 0.0
+        self.__samples = 0
+        self.__slow_callbacks = 0
+        self.__tasks = 0
+        self.__tasks_peak = 0
+        self.__sampler: Optional[asyncio.Task] = None
+        self.__watchdog: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self.__heartbeat = time.monotonic()
+
+        async def create():
+            return asyncio.ensure_future(self.__sample())
+
+        future = asyncio.run_coroutine_threadsafe(create(), self.__loop)
+        self.__sampler = future.result()
+        self.__watchdog = threading.Thread(
+            target=self.__watch, name="tilt-loop-watchdog", daemon=True
+        )
+        self.__watchdog.start()
+
+    def stop(self) -> None:
+        self.__stop.set()
+        if self.__sampler is not None and self.__loop.is_running():
+            sampler = self.__sampler
+
+            async def cancel():
+                # Awaited so the task is gone before the loop is stopped
+                sampler.cancel()
+                await asyncio.gather(sampler, return_exceptions=True)
+
+            asyncio.run_coroutine_threadsafe(cancel(), self.__loop).result(timeout=2)
+        if self.__watchdog is not None and self.__watchdog.is_alive():
+            self.__watchdog.join(timeout=2)
+
+    def metrics(self) -> LoopMetrics:
+        with self.__lock:
+            samples = self.__samples
+            return LoopMetrics(
+                lag_last=self.__lag_last,
+                lag_max=self.__lag_max,
+                lag_mean=self.__lag_total / samples if samples else 0.0,
+                samples=samples,
+                slow_callbacks=self.__slow_callbacks,
+                tasks=self.__tasks,
+                tasks_peak=self.__tasks_peak,
+                stalls=list(self.__stalls),
+            )
+
+    async def __sample(self) -> None:
+        while True:
+            before = time.monotonic()
+            await asyncio.sleep(self.__interval)
+            now = time.monotonic()
+            lag = max(0.0, now - before - self.__interval)
+            # The sampler itself is not counted
+            tasks = len(asyncio.all_tasks()) - 1
+            with self.__lock:
+                self.__heartbeat = now
+                self.__lag_last = lag
+                self.__lag_max = max(self.__lag_max, lag)
+                self.__lag_total += lag
+                self.__samples += 1
+                self.__tasks = tasks
+                self.__tasks_peak = max(self.__tasks_peak, tasks)
+
+    def __watch(self) -> None:
+        deadline = self.__interval + self.__slow_threshold
+        # Monotonic, to measure the stall; started_at is its wall-clock twin
+        stalled_since: Optional[float] = None
+        started_at = 0.0
+        stack = ""
+        while not self.__stop.wait(self.__interval / 2):
+            with self.__lock:
+                heartbeat = self.__heartbeat
+            overdue = time.monotonic() - heartbeat
+            if stalled_since is None and overdue > deadline:
+                stalled_since = heartbeat
+                started_at = time.time() - overdue
+                stack = self.__loop_stack()
+                with self.__lock:
+                    self.__slow_callbacks += 1
+                TiltLog.warning(
+                    "Event loop blocked for over %.2fs at:\n%s", overdue, stack
+                )
+            elif stalled_since is not None and heartbeat > stalled_since:
+                duration = heartbeat - stalled_since - self.__interval
+                with self.__lock:
+                    self.__stalls.append(Stall(started_at, duration, stack))
+                stalled_since = None
+
+    def __loop_stack(self) -> str:
+        frame = sys._current_frames().get(self.__thread.ident or -1)
+        if frame is None:
+            return ""
+        return "".join(traceback.format_stack(frame))
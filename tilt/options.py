@@ -1,5 +1,5 @@
 import os
-from typing import List
+from typing import List, Optional
 from uuid import UUID
 
 from tilt.source_handler import SourceHandler
@@ -14,6 +14,9 @@ class Options:
         program_id: Option[UUID] = None,
         secret_key: Option[str] = None,
         environment: Environment = Environment.PRODUCTION,
+        use_uvloop: bool = False,
+        monitor_loop: bool = True,
+        profile: Optional[str] = None,
         **kwargs,
     ):
         self.__data_src = data_src
@@ -23,6 +26,13 @@ class Options:
         self.__auth_token: Option[str] = None
         self.__organization_id: Option[UUID] = None
         self.environment = environment
+        # Run the client's background event loop on uvloop when installed
+        self.use_uvloop = use_uvloop
+        # Track background loop lag and stalls, reported by Tilt.metrics()
+        self.monitor_loop = monitor_loop
+        # Sample the client's threads during create_and_poll and write the
+        # stacks to this path in collapsed (flamegraph) format
+        self.profile = profile or os.getenv("TILT_PROFILE") or None
 
     @property
     def data_src(self) -> Option[SourceHandler]:
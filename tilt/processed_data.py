@@ -1,17 +1,214 @@
 import asyncio
+import base64
+import codecs
 import json
 import os
-from typing import Optional, cast
+import shutil
+import tempfile
+from typing import Any, AsyncIterator, BinaryIO, Callable, Optional, Union, cast
 from uuid import UUID
 
 import aiohttp
 
+from tilt.chunk_format import CONTENT_TYPE, MAGIC, ChunkStreamDecoder
 from tilt.endpoints import download_processed_data_endpoint
 from tilt.log import TiltLog
-from tilt.sectioner import Chunk
-from tilt.source_handler import BinarySourceHandler
+from tilt.sectioner import preallocate, pwrite_all
 from tilt.types import Option, Some
 
+# Retries per Range request before a parallel download gives up
+RANGE_RETRIES = 3
+# Range responses worth retrying, as the server may recover
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+class _JsonArrayParser:
+    """
+    Incremental parser for a JSON array of objects arriving in pieces.
+
+    Only the unparsed tail is kept in memory, so a response costs one network
+    block plus the element currently being received. A failed decode is only
+    retried once the buffer has doubled, which keeps large elements linear.
+    """
+
+    def __init__(self):
+        self.__decoder = json.JSONDecoder()
+        self.__text = codecs.getincrementaldecoder("utf-8")()
+        self.__buf = ""
+        self.__started = False
+        self.__finished = False
+        self.__retry_at = 0
+
+    def feed(self, data: bytes, final: bool = False) -> list[Any]:
+        self.__buf += self.__text.decode(data, final)
+        if len(self.__buf) < self.__retry_at and not final:
+            return []
+
+        items = []
+        buf = self.__buf
+        pos = 0
+        self.__retry_at = 0
+        while not self.__finished:
+            pos = self.__skip(buf, pos)
+            if pos == len(buf):
+                break
+            if not self.__started:
+                if buf[pos] != "[":
+                    raise ValueError("Expected a JSON array of chunks")
+                self.__started = True
+                pos += 1
+                continue
+            if buf[pos] == "]":
+                self.__finished = True
+                pos += 1
+                break
+            if buf[pos] == ",":
+                pos += 1
+                continue
+            try:
+                item, end = self.__decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                self.__retry_at = 2 * (len(buf) - pos)
+                break
+            items.append(item)
+            pos = end
+
+        self.__buf = buf[pos:]
+        return items
+
+    def close(self) -> list[Any]:
+        """Parses whatever is still buffered and checks the array was complete."""
+        items = self.feed(b"", final=True)
+        if not self.__finished or self.__buf.strip():
+            raise ValueError("Truncated or malformed chunk array")
+        return items
+
+    @staticmethod
+    def __skip(buf: str, pos: int) -> int:
+        while pos < len(buf) and buf[pos] in " \t\r\n":
+            pos += 1
+        return pos
+
+
+def _chunk_bytes(data: Any) -> bytes:
+    """Chunk data is sent either as a list of byte values or as base64 text."""
+    if isinstance(data, str):
+        return base64.b64decode(data)
+    return bytes(data)
+
+
+class _JsonChunkDecoder:
+    """Legacy JSON chunk array, decoded with the same interface as the container."""
+
+    def __init__(self):
+        self.__parser = _JsonArrayParser()
+
+    def feed(self, block: bytes, sink: "_OrderedChunkWriter") -> None:
+        self.__write_all(self.__parser.feed(block), sink)
+
+    def close(self, sink: "_OrderedChunkWriter") -> None:
+        self.__write_all(self.__parser.close(), sink)
+
+    @staticmethod
+    def __write_all(chunks: list[Any], sink: "_OrderedChunkWriter") -> None:
+        for chunk in chunks:
+            sink.write_chunk(chunk["index"], _chunk_bytes(chunk["data"]))
+
+
+class _OrderedChunkWriter:
+    """
+    Writes chunks to a file in index order as they arrive.
+
+    Chunks that arrive ahead of a missing index are spilled to temporary files
+    next to the destination instead of being held in memory, and are copied
+    into place once the gap is filled (or at close, in index order).
+    """
+
+    def __init__(self, dest_path: str):
+        self.__dest_path = dest_path
+        self.__part_path = dest_path + ".part"
+        self.__file = open(self.__part_path, "wb")
+        self.__spill_dir: Optional[tempfile.TemporaryDirectory] = None
+        self.__spilled: dict[int, str] = {}
+        self.__next_index = 0
+        self.__index = 0
+        self.__target: BinaryIO = self.__file
+
+    def write_chunk(self, index: int, data: bytes) -> None:
+        self.begin(index)
+        self.write(data)
+        self.end()
+
+    def begin(self, index: int) -> None:
+        self.__index = index
+        if index == self.__next_index:
+            self.__target = self.__file
+            return
+
+        if self.__spill_dir is None:
+            self.__spill_dir = tempfile.TemporaryDirectory(
+                dir=os.path.dirname(self.__dest_path) or "."
+            )
+        path = os.path.join(self.__spill_dir.name, f"{index}.chunk")
+        self.__target = open(path, "wb")
+        self.__spilled[index] = path
+
+    def write(self, data: Union[bytes, memoryview]) -> None:
+        self.__target.write(data)
+
+    def end(self) -> None:
+        if self.__target is self.__file:
+            self.__next_index += 1
+            self.__drain()
+        else:
+            self.__target.close()
+        self.__target = self.__file
+
+    def __drain(self) -> None:
+        while self.__next_index in self.__spilled:
+            self.__copy_spilled(self.__next_index)
+            self.__next_index += 1
+
+    def __copy_spilled(self, index: int) -> None:
+        path = self.__spilled.pop(index)
+        with open(path, "rb") as f:
+            shutil.copyfileobj(f, self.__file)
+        os.remove(path)
+
+    def commit(self) -> None:
+        for index in sorted(self.__spilled):
+            self.__copy_spilled(index)
+        self.__file.close()
+        os.replace(self.__part_path, self.__dest_path)
+        self.__cleanup()
+
+    def abort(self) -> None:
+        if self.__target is not self.__file:
+            self.__target.close()
+        self.__file.close()
+        if os.path.exists(self.__part_path):
+            os.remove(self.__part_path)
+        self.__cleanup()
+
+    def __cleanup(self) -> None:
+        if self.__spill_dir is not None:
+            self.__spill_dir.cleanup()
+            self.__spill_dir = None
+
+
+class _RangesUnsupported(Exception):
+    """The server ignored a Range request and sent the whole body (200)."""
+
+
+class _RetryableStatus(Exception):
+    """A Range request got a status in RETRY_STATUSES."""
+
+
+async def _iter_file_blocks(path: str, block_size: int) -> AsyncIterator[bytes]:
+    with open(path, "rb") as f:
+        while block := await asyncio.to_thread(f.read, block_size):
+            yield block
+
 
 class ProcessedData:
     def __init__(
@@ -23,7 +220,16 @@ class ProcessedData:
         chunk_size: int = 1024 * 1024,
         auth_token: str = "",
         base_url: str = "https://production.tilt.rest",
+        parallel_ranges: int = 1,
+        range_size: int = 8 * 1024 * 1024,
     ):
+        """
+        Args:
+            parallel_ranges: When greater than 1, download the result with
+                this many concurrent Range requests instead of one stream.
+                Falls back to a single stream if the server lacks range support.
+            range_size: Size of each Range request in parallel mode.
+        """
         self.__organization_id = organization_id
         self.__job_id = job_id
         self.__task_id = task_id
@@ -31,6 +237,8 @@ class ProcessedData:
         self.__dest_path = dest_path
         self.__auth_token = auth_token
         self.__base_url = base_url
+        self.__parallel_ranges = parallel_ranges
+        self.__range_size = range_size
 
     def download(self):
         try:
@@ -44,53 +252,275 @@ class ProcessedData:
             return await self.__download_to_file()
         return await self.__fetch_bytes()
 
+    @property
+    def __url(self) -> str:
+        return download_processed_data_endpoint(
+            self.__base_url,
+            self.__organization_id,
+            self.__job_id,
+            self.__task_id,
+        )
+
+    @property
+    def __headers(self) -> dict[str, str]:
+        headers = {"Authorization": f"Bearer {self.__auth_token}"}
+        if self.__dest_path:
+            # Chunked results: prefer the binary container over JSON
+            headers["Accept"] = f"{CONTENT_TYPE}, application/json;q=0.5"
+        return headers
+
     async def __fetch_bytes(self) -> bytes:
         async with aiohttp.ClientSession() as session:
-            async with session.get(
-                download_processed_data_endpoint(
-                    self.__base_url,
-                    self.__organization_id,
-                    self.__job_id,
-                    self.__task_id,
-                ),
-                headers={"Authorization": f"Bearer {self.__auth_token}"},
-            ) as resp:
+            if self.__parallel_ranges > 1:
+                probe = await self.__probe_ranges(session)
+                if probe is not None:
+                    length, _ = probe
+                    buf = bytearray(length)
+                    view = memoryview(buf)
+
+                    def write(offset: int, block: bytes) -> None:
+                        view[offset : offset + len(block)] = block
+
+                    try:
+                        await self.__download_ranges(
+                            session, length, set(), write, lambda _: None
+                        )
+                    except _RangesUnsupported:
+                        pass
+                    else:
+                        TiltLog.success(
+                            "Downloaded %d bytes", length, task_id=self.__task_id
+                        )
+                        return bytes(buf)
+
+            async with session.get(self.__url, headers=self.__headers) as resp:
                 if resp.status != 200:
                     raise Exception(f"Download failed: {resp.status}")
                 data = await resp.read()
-                TiltLog.success(f"Downloaded {len(data)} bytes")
+                TiltLog.success(
+                    "Downloaded %d bytes", len(data), task_id=self.__task_id
+                )
                 return data
 
     async def __download_to_file(self) -> Option[str]:
+        """
+        Streams the chunk array to dest_path as it arrives, so memory stays
+        around chunk_size no matter how large the result is.
+        """
         dest_path = cast(str, self.__dest_path)
-        os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+        os.makedirs(os.path.dirname(dest_path) or ".", exist_ok=True)
 
         async with aiohttp.ClientSession() as session:
-            async with session.get(
-                download_processed_data_endpoint(
-                    self.__base_url,
-                    self.__organization_id,
-                    self.__job_id,
-                    self.__task_id,
-                ),
-                headers={"Authorization": f"Bearer {self.__auth_token}"},
-            ) as resp:
+            if self.__parallel_ranges > 1:
+                raw_path = await self.__download_raw_ranges(session, dest_path)
+                if raw_path is not None:
+                    await self.__write_chunks(
+                        _iter_file_blocks(raw_path, self.__chunk_size), dest_path
+                    )
+                    os.remove(raw_path)
+                    TiltLog.success(
+                        "Download complete: %s", dest_path, task_id=self.__task_id
+                    )
+                    return Some(dest_path)
+
+            async with session.get(self.__url, headers=self.__headers) as resp:
                 if resp.status != 200:
                     raise Exception(f"Download failed: {resp.status}")
+                await self.__write_chunks(
+                    resp.content.iter_chunked(self.__chunk_size), dest_path
+                )
 
-                data = await resp.read()
-        chunk_dicts = json.loads(data)
-        chunks = [
-            Chunk(
-                index=chunk["index"],
-                data=chunk["data"],
-                filename=chunk.get("filename", os.path.basename(dest_path)),
-            )
-            for chunk in chunk_dicts
+        TiltLog.success("Download complete: %s", dest_path, task_id=self.__task_id)
+        return Some(dest_path)
+
+    async def __write_chunks(
+        self, blocks: AsyncIterator[bytes], dest_path: str
+    ) -> None:
+        """
+        Decodes a result body into dest_path. Bodies starting with the chunk
+        container magic are streamed to disk zero-copy; anything else is
+        treated as the legacy JSON chunk array.
+        """
+        writer = _OrderedChunkWriter(dest_path)
+        decoder: Union[ChunkStreamDecoder, _JsonChunkDecoder, None] = None
+        head = b""
+        try:
+            async for block in blocks:
+                if decoder is None:
+                    head += block
+                    if len(head) < len(MAGIC):
+                        continue
+                    decoder = (
+                        ChunkStreamDecoder()
+                        if head.startswith(MAGIC)
+                        else _JsonChunkDecoder()
+                    )
+                    block, head = head, b""
+                decoder.feed(block, writer)
+            if decoder is None:
+                decoder = _JsonChunkDecoder()
+                decoder.feed(head, writer)
+            decoder.close(writer)
+        except BaseException:
+            writer.abort()
+            raise
+        writer.commit()
+
+    async def __probe_ranges(
+        self, session: aiohttp.ClientSession
+    ) -> Optional[tuple[int, str]]:
+        """Returns (length, etag) if the result can be fetched in ranges."""
+        async with session.head(self.__url, headers=self.__headers) as resp:
+            if resp.status != 200:
+                return None
+            if resp.headers.get("Accept-Ranges", "").lower() != "bytes":
+                return None
+            if not resp.content_length:
+                return None
+            return resp.content_length, resp.headers.get("ETag", "")
+
+    async def __download_raw_ranges(
+        self, session: aiohttp.ClientSession, dest_path: str
+    ) -> Optional[str]:
+        """
+        Downloads the raw body into a preallocated <dest>.raw file.
+
+        Completed ranges are recorded in <dest>.raw.json, so a later call for
+        the same result (same length and ETag) resumes where this one stopped;
+        both files are kept when the download fails. Returns None when the
+        server does not support ranges.
+        """
+        probe = await self.__probe_ranges(session)
+        if probe is None:
+            return None
+        length, etag = probe
+
+        raw_path = dest_path + ".raw"
+        state_path = raw_path + ".json"
+        try:
+            with open(state_path) as f:
+                state = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            state = {}
+        resuming = (
+            state.get("length") == length
+            and state.get("etag") == etag
+            and os.path.exists(raw_path)
+        )
+        done: set[int] = set(state.get("done", [])) if resuming else set()
+
+        # A .raw left by another result (e.g. a larger one) must not keep
+        # its tail: preallocate() only ever grows the file
+        flags = os.O_RDWR | os.O_CREAT | (0 if resuming else os.O_TRUNC)
+        fd = os.open(raw_path, flags)
+        try:
+            if not resuming:
+                preallocate(fd, length)
+            else:
+                TiltLog.info("Resuming download with %d ranges done", len(done))
+
+            def save_done(index: int) -> None:
+                done.add(index)
+                with open(state_path, "w") as f:
+                    json.dump(
+                        {"length": length, "etag": etag, "done": sorted(done)}, f
+                    )
+
+            try:
+                await self.__download_ranges(
+                    session,
+                    length,
+                    done,
+                    lambda offset, block: pwrite_all(fd, block, offset),
+                    save_done,
+                )
+            except _RangesUnsupported:
+                supported = False
+            else:
+                supported = True
+        finally:
+            os.close(fd)
+
+        # Only reached once every range is in, or ranges turned out to be
+        # unsupported; on failure the exception keeps both files for resuming
+        if os.path.exists(state_path):
+            os.remove(state_path)
+        if not supported:
+            os.remove(raw_path)
+            return None
+        return raw_path
+
+    async def __download_ranges(
+        self,
+        session: aiohttp.ClientSession,
+        length: int,
+        done: set[int],
+        write: Callable[[int, bytes], None],
+        on_done: Callable[[int], None],
+    ) -> None:
+        pending: asyncio.Queue[tuple[int, int, int]] = asyncio.Queue()
+        for index, start in enumerate(range(0, length, self.__range_size)):
+            if index not in done:
+                pending.put_nowait(
+                    (index, start, min(start + self.__range_size, length))
+                )
+
+        async def worker():
+            while True:
+                try:
+                    index, start, end = pending.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                await self.__fetch_range(session, start, end, write)
+                on_done(index)
+
+        workers = [
+            asyncio.ensure_future(worker())
+            for _ in range(min(self.__parallel_ranges, pending.qsize()))
         ]
+        try:
+            await asyncio.gather(*workers)
+        except BaseException:
+            for w in workers:
+                w.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            raise
 
-        handler = BinarySourceHandler(filename=dest_path, chunk_size=self.__chunk_size)
-        await handler.write(chunks, dest_path)
+    async def __fetch_range(
+        self,
+        session: aiohttp.ClientSession,
+        start: int,
+        end: int,
+        write: Callable[[int, bytes], None],
+    ) -> None:
+        """Fetches [start, end), continuing from the last byte received on retry."""
+        pos = start
+        for attempt in range(RANGE_RETRIES + 1):
+            headers = {**self.__headers, "Range": f"bytes={pos}-{end - 1}"}
+            try:
+                async with session.get(self.__url, headers=headers) as resp:
+                    if resp.status == 200:
+                        raise _RangesUnsupported(resp.status)
+                    if resp.status in RETRY_STATUSES:
+                        raise _RetryableStatus(resp.status)
+                    if resp.status != 206:
+                        raise Exception(f"Download failed: {resp.status}")
+                    async for block in resp.content.iter_chunked(self.__chunk_size):
+                        block = block[: end - pos]
+                        write(pos, block)
+                        pos += len(block)
+                if pos >= end:
+                    return
+            except (
+                aiohttp.ClientError,
+                asyncio.TimeoutError,
+                _RetryableStatus,
+            ) as e:
+                if attempt == RANGE_RETRIES:
+                    raise Exception(
+                        f"Download failed: range {pos}-{end - 1} ({e!r})"
+                    ) from e
+                TiltLog.warning("Range %d-%d failed (%s), retrying", pos, end - 1, e)
+            await asyncio.sleep(0.5 * 2**attempt)
 
-        TiltLog.success(f"Download complete: {dest_path}")
-        return Some(dest_path)
+        raise Exception(f"Download failed: range {start}-{end - 1} incomplete")
@@ -0,0 +1,144 @@
+import collections
+import re
+import sys
+import threading
+from types import FrameType
+from typing import Optional
+
+from tilt.log import TiltLog
+
+# Client phases, matched against frame module names from the innermost frame
+# out; the first match wins
+PHASES = (
+    ("render", ("rich",)),
+    ("json", ("json",)),
+    ("parse", ("tilt.entities",)),
+    ("network", ("aiohttp", "yarl", "multidict")),
+    ("handoff", ("asyncio", "concurrent.futures", "queue")),
+)
+# Innermost modules of a thread that is blocked rather than using CPU
+IDLE_MODULES = ("threading", "selectors")
+
+_THREAD_NUMBER = re.compile(r"-\d+$")
+
+
+def _module(frame: FrameType) -> str:
+    return frame.f_globals.get("__name__", "") or "?"
+
+
+def _matches(module: str, prefixes: tuple[str, ...]) -> bool:
+    return any(module == p or module.startswith(p + ".") for p in prefixes)
+
+
+def phase_of(modules: list[str]) -> str:
+    """Client phase of a stack given its module names, innermost first."""
+    if modules and _matches(modules[0], IDLE_MODULES):
+        return "idle"
+    for module in modules:
+        for phase, prefixes in PHASES:
+            if _matches(module, prefixes):
+                return phase
+    return "other"
+
+
+class Profiler:
+    """
+    Sampling profiler for the client's own threads.
+
+    A daemon thread wakes every `interval` seconds and records the stack of
+    every other thread via sys._current_frames(). Threads are grouped by
+    role: "main" for the thread that started the profiler, otherwise the
+    thread name without its trailing number (e.g. "tilt-worker"). Each
+    sample is attributed to a client phase (see PHASES), and the stacks can
+    be written in the collapsed format read by flamegraph.pl and speedscope.
+    """
+
+    def __init__(self, interval: float = 0.01):
+        self.__interval = interval
+        self.__lock = threading.Lock()
+        self.__stop = threading.Event()
+        self.__stacks: collections.Counter[str] = collections.Counter()
+        self.__phases: collections.Counter[tuple[str, str]] = collections.Counter()
+        self.__samples = 0
+        self.__main: Optional[int] = None
+        self.__thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self.__main = threading.get_ident()
+        self.__stop.clear()
+        self.__thread = threading.Thread(
+            target=self.__run, name="tilt-profiler", daemon=True
+        )
+        self.__thread.start()
+
+    def stop(self) -> None:
+        self.__stop.set()
+        if self.__thread is not None:
+            self.__thread.join()
+            self.__thread = None
+
+    @property
+    def samples(self) -> int:
+        """Number of times the threads were sampled."""
+        with self.__lock:
+            return self.__samples
+
+    def stacks(self) -> dict[str, int]:
+        """Sample count per collapsed stack ("role;outer;...;inner")."""
+        with self.__lock:
+            return dict(self.__stacks)
+
+    def phases(self, role: Optional[str] = None) -> dict[str, float]:
+        """
+        Share of busy (non-idle) samples spent in each phase, over all
+        threads or those of `role`.
+        """
+        with self.__lock:
+            counts: collections.Counter[str] = collections.Counter()
+            for (r, phase), n in self.__phases.items():
+                if phase != "idle" and (role is None or r == role):
+                    counts[phase] += n
+        busy = sum(counts.values())
+        return {phase: n / busy for phase, n in counts.most_common()} if busy else {}
+
+    def write(self, path: str) -> None:
+        """Writes the stacks in collapsed format, one "stack count" per line."""
+        with open(path, "w") as f:
+            for stack, count in sorted(self.stacks().items()):
+                f.write(f"{stack} {count}\n")
+
+    def log_summary(self) -> None:
+        shares = ", ".join(f"{p} {s:.0%}" for p, s in self.phases().items())
+        TiltLog.info("Client profile: %s", shares or "no busy samples")
+
+    def __role(self, ident: int, names: dict[int, str]) -> str:
+        if ident == self.__main:
+            return "main"
+        return _THREAD_NUMBER.sub("", names.get(ident, "unknown"))
+
+    def __run(self) -> None:
+        own = threading.get_ident()
+        while not self.__stop.wait(self.__interval):
+            names = {t.ident: t.name for t in threading.enumerate() if t.ident}
+            frames = sys._current_frames()
+            sampled = []
+            for ident, frame in frames.items():
+                if ident == own:
+                    continue
+                role = self.__role(ident, names)
+                labels, modules = [], []
+                f: Optional[FrameType] = frame
+                while f is not None:
+                    module = _module(f)
+                    modules.append(module)
+                    labels.append(f"{module}:{f.f_code.co_name}")
+                    f = f.f_back
+                labels.append(role)
+                labels.reverse()
+                sampled.append((";".join(labels), role, phase_of(modules)))
+            del frames
+            with self.__lock:
+                self.__samples += 1
+                for stack, role, phase in sampled:
+                    self.__stacks[stack] += 1
+                    self.__phases[(role, phase)] += 1
@@ -0,0 +1,63 @@
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Optional
+from uuid import UUID
+
+from tilt.types import Option, Some
+
+
+def default_index_path() -> Path:
+    """Where the program index lives unless a path is given explicitly."""
+    if override := os.getenv("TILT_CACHE_DIR"):
+        return Path(override) / "programs.json"
+    return Path.home() / ".cache" / "tilt" / "programs.json"
+
+
+def file_digest(filepath: str, block_size: int = 1024 * 1024) -> str:
+    """SHA-256 of a file, read in blocks so large modules are never fully loaded."""
+    h = hashlib.sha256()
+    with open(filepath, "rb") as f:
+        while block := f.read(block_size):
+            h.update(block)
+    return h.hexdigest()
+
+
+class ProgramIndex:
+    """
+    Local map of program content hash -> program id.
+
+    Lets upload_program skip binaries the platform already has. Entries are
+    keyed by API base URL and organization as well, since the same binary has
+    a different id in each environment and organization.
+    """
+
+    def __init__(self, path: Optional[Path] = None):
+        self.__path = path or default_index_path()
+        self.__lock = threading.Lock()
+
+    @staticmethod
+    def key(base_url: str, organization_id: object, digest: str) -> str:
+        return f"{base_url}|{organization_id}|{digest}"
+
+    def get(self, key: str) -> Option[UUID]:
+        with self.__lock:
+            entry = self.__load().get(key)
+        return Some(UUID(entry)) if entry else None
+
+    def put(self, key: str, program_id: UUID) -> None:
+        with self.__lock:
+            entries = self.__load()
+            entries[key] = str(program_id)
+            self.__path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.__path.with_suffix(".tmp")
+            tmp.write_text(json.dumps(entries, indent=2))
+            os.replace(tmp, self.__path)
+
+    def __load(self) -> dict[str, str]:
+        try:
+            return json.loads(self.__path.read_text())
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
@@ -0,0 +1,164 @@
+import csv
+import json
+import math
+from dataclasses import asdict, dataclass, field, fields
+from typing import Any, Optional
+from uuid import UUID
+
+from tilt.job_state import JobStateTable, Phase
+
+PERCENTILES = (50, 90, 99)
+
+
+@dataclass
+class ChunkReport:
+    index: int
+    status: str
+    attempts: int
+    task_id: Optional[str] = None
+    queued_at: Optional[float] = None
+    submitted_at: Optional[float] = None
+    done_at: Optional[float] = None
+    payload_bytes: Optional[int] = None
+    result_bytes: Optional[int] = None
+    tokens: Optional[int] = None
+
+    @property
+    def upload_seconds(self) -> Optional[float]:
+        """From being handed to a worker to the task's data being uploaded."""
+        return _span(self.queued_at, self.submitted_at)
+
+    @property
+    def wait_seconds(self) -> Optional[float]:
+        """From upload to the result being downloaded."""
+        return _span(self.submitted_at, self.done_at)
+
+    @property
+    def total_seconds(self) -> Optional[float]:
+        return _span(self.queued_at, self.done_at)
+
+
+def _span(start: Optional[float], end: Optional[float]) -> Optional[float]:
+    return None if start is None or end is None else end - start
+
+
+def _percentile(values: list[float], p: float) -> float:
+    """Linear-interpolated percentile of non-empty values."""
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * p / 100
+    low = math.floor(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+@dataclass
+class JobReport:
+    """
+    What happened in one create_and_poll run: per-chunk phase timings,
+    attempts, sizes and tokens, plus the settings it ran with, so runs can
+    be compared over time and across configurations.
+    """
+
+    job_id: str
+    started_at: float
+    finished_at: float
+    chunks: list[ChunkReport]
+    settings: dict[str, Any] = field(default_factory=dict)
+
+    @classmethod
+    def from_state(
+        cls,
+        job_id: UUID,
+        state: JobStateTable,
+        started_at: float,
+        finished_at: float,
+        settings: Optional[dict[str, Any]] = None,
+    ) -> "JobReport":
+        chunks = []
+        for i in range(len(state)):
+            task_id = state.task_id(i)
+            chunks.append(
+                ChunkReport(
+                    index=i,
+                    status=state.status(i).name.lower(),
+                    attempts=state.attempts(i),
+                    task_id=str(task_id) if task_id else None,
+                    queued_at=state.timestamp(i, Phase.QUEUED),
+                    submitted_at=state.timestamp(i, Phase.SUBMITTED),
+                    done_at=state.timestamp(i, Phase.DONE),
+                    payload_bytes=state.payload_size(i),
+                    result_bytes=state.result_size(i),
+                    tokens=state.tokens(i),
+                )
+            )
+        return cls(str(job_id), started_at, finished_at, chunks, settings or {})
+
+    def summary(self) -> dict[str, Any]:
+        """Counts, throughput, token cost and latency percentiles."""
+        wall = max(self.finished_at - self.started_at, 1e-9)
+        finished = [c for c in self.chunks if c.status == "finished"]
+        bytes_in = sum(c.payload_bytes or 0 for c in finished)
+        bytes_out = sum(c.result_bytes or 0 for c in finished)
+        tokens = [c.tokens for c in self.chunks if c.tokens is not None]
+        summary: dict[str, Any] = {
+            "chunks": len(self.chunks),
+            "finished": len(finished),
+            "failed": sum(1 for c in self.chunks if c.status == "failed"),
+            "retried": sum(1 for c in self.chunks if c.attempts > 1),
+            "wall_seconds": wall,
+            "chunks_per_second": len(finished) / wall,
+            "bytes_in": bytes_in,
+            "bytes_out": bytes_out,
+            "bytes_in_per_second": bytes_in / wall,
+            "tokens": sum(tokens),
+            "tokens_per_chunk": sum(tokens) / len(tokens) if tokens else None,
+        }
+        for name in ("total", "upload", "wait"):
+            values = [
+                v
+                for c in finished
+                if (v := getattr(c, f"{name}_seconds")) is not None
+            ]
+            for p in PERCENTILES:
+                key = f"{name}_seconds_p{p}"
+                summary[key] = _percentile(values, p) if values else None
+        return summary
+
+    def __json__(self) -> dict:
+        return {
+            "job_id": self.job_id,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "settings": self.settings,
+            "summary": self.summary(),
+            "chunks": [asdict(c) for c in self.chunks],
+        }
+
+    @classmethod
+    def from_json(cls, data: dict) -> "JobReport":
+        return cls(
+            job_id=data["job_id"],
+            started_at=data["started_at"],
+            finished_at=data["finished_at"],
+            chunks=[ChunkReport(**c) for c in data["chunks"]],
+            settings=data.get("settings", {}),
+        )
+
+    def save(self, path: str) -> None:
+        """Writes JSON, or CSV with one row per chunk if path ends in .csv."""
+        if path.endswith(".csv"):
+            self.to_csv(path)
+            return
+        with open(path, "w") as f:
+            json.dump(self.__json__(), f, indent=2, default=str)
+
+    def to_csv(self, path: str) -> None:
+        columns = [f.name for f in fields(ChunkReport)]
+        columns += ["upload_seconds", "wait_seconds", "total_seconds"]
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(columns)
+            for chunk in self.chunks:
+                writer.writerow(
+                    ["" if (v := getattr(chunk, c)) is None else v for c in columns]
+                )
@@ -0,0 +1,216 @@
+import heapq
+import threading
+from abc import ABC, abstractmethod
+from typing import Callable, Hashable, Optional, Sequence
+
+from tilt.sectioner import ChunkData
+
+
+class DispatchPolicy(ABC):
+    """
+    Decides which chunk create_and_poll hands to the next free worker.
+
+    Policies only change the dispatch order; every chunk keeps its source
+    index, so results are reported exactly as with FIFO. They need the full
+    list of payloads up front and so do not apply to streaming sources.
+    """
+
+    @abstractmethod
+    def start(self, payloads: Sequence[ChunkData]) -> None:
+        """Called once per job with all of its payloads."""
+
+    @abstractmethod
+    def next(self) -> Optional[int]:
+        """Index of the next chunk to dispatch, or None when all are."""
+
+    def observe(self, index: int, seconds: float) -> None:
+        """Called when chunk `index` finished after `seconds`."""
+
+
+class Fifo(DispatchPolicy):
+    """Chunks in index order (the default)."""
+
+    def __init__(self):
+        self.__count = 0
+        self.__next = 0
+
+    def start(self, payloads: Sequence[ChunkData]) -> None:
+        self.__count = len(payloads)
+        self.__next = 0
+
+    def next(self) -> Optional[int]:
+        if self.__next >= self.__count:
+            return None
+        self.__next += 1
+        return self.__next - 1
+
+
+class LargestFirst(DispatchPolicy):
+    """
+    Longest-processing-time-first by payload size: big chunks start early,
+    so none of them is left to run alone at the end of the job. Ties keep
+    index order.
+    """
+
+    def __init__(self):
+        self.__order: list[int] = []
+
+    def start(self, payloads: Sequence[ChunkData]) -> None:
+        sizes = [len(p) for p in payloads]
+        self.__order = sorted(range(len(sizes)), key=lambda i: -sizes[i])
+        self.__order.reverse()
+
+    def next(self) -> Optional[int]:
+        return self.__order.pop() if self.__order else None
+
+
+class CostModel:
+    """
+    Running fit of seconds = overhead + bytes * seconds_per_byte, with
+    exponentially decaying weights so it follows drifting device speeds.
+    Not thread-safe; callers serialize access.
+    """
+
+    def __init__(self, alpha: float):
+        self.__alpha = alpha
+        self.__n = 0
+        self.__x = self.__y = self.__xx = self.__xy = 0.0
+
+    def add(self, size: float, seconds: float) -> None:
+        a = self.__alpha if self.__n else 1.0
+        self.__n += 1
+        self.__x += a * (size - self.__x)
+        self.__y += a * (seconds - self.__y)
+        self.__xx += a * (size * size - self.__xx)
+        self.__xy += a * (size * seconds - self.__xy)
+
+    @property
+    def observations(self) -> int:
+        return self.__n
+
+    def fit(self) -> tuple[float, float]:
+        """(overhead seconds, seconds per byte) of the current fit."""
+        var = self.__xx - self.__x * self.__x
+        if var <= 1e-9 * max(1.0, self.__xx):
+            # All sizes alike so far: overhead and throughput can't be told
+            # apart, so the whole cost is attributed to size
+            if self.__x:
+                return 0.0, self.__y / self.__x
+            return self.__y, 0.0
+        per_byte = max(0.0, (self.__xy - self.__x * self.__y) / var)
+        overhead = max(0.0, self.__y - per_byte * self.__x)
+        return overhead, per_byte
+
+    def predict(self, size: float) -> float:
+        overhead, per_byte = self.fit()
+        return overhead + per_byte * size
+
+
+class CostAware(DispatchPolicy):
+    """
+    Dispatches the chunk with the largest predicted runtime first.
+
+    Runtime is predicted as overhead + size * cost-per-byte, fitted from the
+    chunks finished so far. With `kind`, payloads are grouped (e.g. by file
+    type) and each group gets its own fit, so a small but expensive kind of
+    chunk is still started early. Groups not observed yet are dispatched
+    first, largest first, so their cost is learned early.
+    """
+
+    def __init__(
+        self,
+        kind: Optional[Callable[[ChunkData], Hashable]] = None,
+        alpha: float = 0.2,
+    ):
+        self.__kind = kind
+        self.__alpha = alpha
+        self.__lock = threading.Lock()
+        self.__sizes: list[int] = []
+        self.__kinds: list[Hashable] = []
+        self.__queues: dict[Hashable, list[tuple[int, int]]] = {}
+        self.__models: dict[Hashable, CostModel] = {}
+
+    def start(self, payloads: Sequence[ChunkData]) -> None:
+        self.__sizes = [len(p) for p in payloads]
+        self.__kinds = [self.__kind(p) if self.__kind else None for p in payloads]
+        self.__queues = {}
+        for index, (size, kind) in enumerate(zip(self.__sizes, self.__kinds)):
+            self.__queues.setdefault(kind, []).append((-size, index))
+        for queue in self.__queues.values():
+            heapq.heapify(queue)
+
+    def next(self) -> Optional[int]:
+        with self.__lock:
+            best, best_rank = None, (-1, -1.0)
+            for kind, queue in self.__queues.items():
+                if not queue:
+                    continue
+                size = -queue[0][0]
+                model = self.__models.get(kind)
+                # Unobserved kinds go first (largest first) so they get a fit
+                rank = (0, model.predict(size)) if model else (1, float(size))
+                if rank > best_rank:
+                    best, best_rank = kind, rank
+            if best is None:
+                return None
+            return heapq.heappop(self.__queues[best])[1]
+
+    def observe(self, index: int, seconds: float) -> None:
+        with self.__lock:
+            kind = self.__kinds[index]
+            model = self.__models.setdefault(kind, CostModel(self.__alpha))
+            model.add(self.__sizes[index], seconds)
+
+    def predict(self, size: int, kind: Hashable = None) -> Optional[float]:
+        """Predicted runtime in seconds of a chunk, if its kind was observed."""
+        with self.__lock:
+            model = self.__models.get(kind)
+            return model.predict(size) if model else None
+
+
+class ByteBudget:
+    """
+    Caps the bytes held by chunks in flight, from reading the payload until
+    its result has been handed to the caller.
+
+    acquire() blocks while the budget is exhausted. A chunk larger than the
+    whole budget is still let through once nothing else is in flight, so
+    one oversized chunk cannot stall a job forever.
+    """
+
+    def __init__(self, limit: int):
+        if limit <= 0:
+            raise ValueError("limit must be positive")
+        self.__limit = limit
+        self.__used = 0
+        self.__changed = threading.Condition()
+
+    @property
+    def limit(self) -> int:
+        return self.__limit
+
+    @property
+    def used(self) -> int:
+        with self.__changed:
+            return self.__used
+
+    def acquire(self, size: int, timeout: Optional[float] = None) -> bool:
+        """Waits until `size` bytes fit; False if `timeout` ran out first."""
+        with self.__changed:
+            fits = self.__changed.wait_for(
+                lambda: self.__used == 0 or self.__used + size <= self.__limit,
+                timeout,
+            )
+            if fits:
+                self.__used += size
+            return fits
+
+    def charge(self, size: int) -> None:
+        """Counts bytes already held, e.g. a downloaded result, without waiting."""
+        with self.__changed:
+            self.__used += size
+
+    def release(self, size: int) -> None:
+        with self.__changed:
+            self.__used = max(0, self.__used - size)
+            self.__changed.notify_all()
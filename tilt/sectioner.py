@@ -1,33 +1,185 @@
 from __future__ import annotations
 import os
 import asyncio
+import bisect
+import hashlib
+import json
+import math
+import mmap
+import struct
+import threading
+from array import array
 from dataclasses import dataclass
-from typing import AsyncGenerator, List
+from enum import Enum
+from typing import AsyncGenerator, BinaryIO, Iterator, List, Optional, Union
 import aiofiles
 
+try:
+    import numpy as _np
+except ImportError:  # vectorized paths fall back to pure Python
+    _np = None
+
+# Block size used when streaming a FileRegion instead of reading it whole
+REGION_BLOCK_SIZE = 256 * 1024
+
+
+@dataclass(frozen=True)
+class FileRegion:
+    """
+    A byte range of a file on disk: (path, offset, length).
+    Nothing is read until the region is consumed, so a chunk described this
+    way costs a few bytes of memory no matter how large it is.
+    """
+
+    path: str
+    offset: int
+    length: int
+
+    def __len__(self) -> int:
+        return self.length
+
+    def iter_blocks(self, block_size: int = REGION_BLOCK_SIZE) -> Iterator[bytes]:
+        """Yield the region's content in blocks of at most block_size bytes."""
+        with open(self.path, "rb") as f:
+            f.seek(self.offset)
+            remaining = self.length
+            while remaining > 0:
+                block = f.read(min(block_size, remaining))
+                if not block:
+                    raise EOFError(
+                        f"{self.path} ended {remaining} bytes before the region end"
+                    )
+                remaining -= len(block)
+                yield block
+
+    def read(self) -> bytes:
+        """Read the whole region into memory."""
+        return b"".join(self.iter_blocks())
+
+
+# What a chunk can carry: owned bytes, a view over someone else's buffer,
+# or a description of where the bytes live on disk.
+ChunkData = Union[bytes, memoryview, FileRegion]
+
+
+class ChunkBacking(Enum):
+    """How deconstruct_file materializes each chunk's data."""
+
+    BYTES = "bytes"  # read every chunk into a fresh bytes object
+    FILE = "file"  # describe every chunk as a FileRegion, read nothing
+    MMAP = "mmap"  # memoryview slices of a read-only mapping of the file
+
 
 @dataclass
 class Chunk:
     index: int
-    data: bytes
+    data: ChunkData
     filename: str
 
     # original filename
     total_chunks: int = 0
 
-    def __post_init__(self):
-        if isinstance(self.data, memoryview):
-            self.data = bytes(self.data)
+
+def write_chunk_data(f: BinaryIO, data: ChunkData) -> None:
+    """Write chunk data to an open binary file without materializing regions."""
+    if isinstance(data, FileRegion):
+        for block in data.iter_blocks():
+            f.write(block)
+    else:
+        f.write(data)
+
+
+def preallocate(fd: int, size: int) -> None:
+    """Reserve size bytes for an open file, falling back to a sparse truncate."""
+    if hasattr(os, "posix_fallocate") and size > 0:
+        try:
+            os.posix_fallocate(fd, 0, size)
+            return
+        except OSError:
+            pass  # e.g. filesystems without fallocate support
+    os.ftruncate(fd, size)
+
+
+def pwrite_all(fd: int, data: Union[bytes, memoryview], offset: int) -> None:
+    """Write all of data at offset without moving the file position."""
+    view = memoryview(data)
+    while view:
+        written = os.pwrite(fd, view, offset)
+        view = view[written:]
+        offset += written
+
+
+def file_regions(filepath: str, chunk_size: int = 1024 * 1024) -> List[FileRegion]:
+    """
+    Describe a file as consecutive FileRegions of chunk_size bytes.
+    Only stats the file; no data is read.
+    """
+    size = os.path.getsize(filepath)
+    return [
+        FileRegion(filepath, offset, min(chunk_size, size - offset))
+        for offset in range(0, size, chunk_size)
+    ]
+
+
+def _madvise(mm: mmap.mmap, option_name: str, start: int = 0, length: int = 0):
+    """Best-effort madvise; a no-op where the platform lacks the option."""
+    option = getattr(mmap, option_name, None)
+    if option is None or not hasattr(mm, "madvise"):
+        return
+    aligned = start - start % mmap.PAGESIZE
+    try:
+        mm.madvise(option, aligned, length + (start - aligned) if length else 0)
+    except (OSError, ValueError):
+        pass
 
 
 async def deconstruct_file(
-    filepath: str, chunk_size: int = 1024 * 1024
+    filepath: str,
+    chunk_size: int = 1024 * 1024,
+    backing: ChunkBacking = ChunkBacking.BYTES,
 ) -> AsyncGenerator[Chunk]:
     """
     Split a file into chunks asynchronously.
-    Yields Chunk(index, data, filename)
+    Yields Chunk(index, data, filename, total_chunks)
+
+    With ChunkBacking.FILE the chunks hold FileRegions and the file is never
+    read here; consumers stream each region when they need it.
+    With ChunkBacking.MMAP the chunks hold memoryview slices of a read-only
+    mapping of the file, so splitting costs only page-cache traffic.
     """
     filename = os.path.basename(filepath)
+    size = os.path.getsize(filepath)
+    total_chunks = -(-size // chunk_size)
+
+    if backing is ChunkBacking.FILE:
+        for index, region in enumerate(file_regions(filepath, chunk_size)):
+            yield Chunk(index, region, filename, total_chunks)
+        return
+
+    if backing is ChunkBacking.MMAP:
+        if size == 0:
+            return
+        with open(filepath, "rb") as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            _madvise(mm, "MADV_SEQUENTIAL")
+            view = memoryview(mm)
+            for index, offset in enumerate(range(0, size, chunk_size)):
+                # Ask the kernel to start reading the next chunk while this
+                # one is being consumed
+                _madvise(mm, "MADV_WILLNEED", offset + chunk_size, chunk_size)
+                yield Chunk(
+                    index, view[offset : offset + chunk_size], filename, total_chunks
+                )
+            view.release()
+        finally:
+            try:
+                mm.close()
+            except BufferError:
+                # Yielded chunks still reference the mapping; it is unmapped
+                # once the last of them is released.
+                pass
+        return
 
     async with aiofiles.open(filepath, "rb") as f:
         index = 0
@@ -35,7 +187,7 @@ async def deconstruct_file(
             data = await f.read(chunk_size)
             if not data:
                 break
-            yield Chunk(index=index, data=data, filename=filename)
+            yield Chunk(index, data, filename, total_chunks)
             index += 1
 
 
@@ -49,7 +201,443 @@ def reconstruct_file(chunks: List[Chunk], output_path: str) -> None:
 
     with open(output_path, "wb") as f:
         for chunk in chunks:
-            f.write(chunk.data)
+            write_chunk_data(f, chunk.data)
+
+
+# === Content-defined chunking (FastCDC-style Gear hash) ===
+
+_MASK64 = (1 << 64) - 1
+# Fixed, platform-independent Gear table so boundaries are reproducible
+_GEAR = [
+    int.from_bytes(hashlib.sha256(bytes([i])).digest()[:8], "little")
+    for i in range(256)
+]
+# Bytes hashed per pass; bounds the temporary arrays of the vectorized path
+_CDC_WINDOW = 1024 * 1024
+
+
+@dataclass
+class ManifestEntry:
+    index: int
+    offset: int
+    length: int
+    # SHA-256 of the chunk; empty when only the layout is known
+    digest: str = ""
+
+    @classmethod
+    def from_json(cls, data: dict) -> "ManifestEntry":
+        return cls(
+            index=data["index"],
+            offset=data["offset"],
+            length=data["length"],
+            digest=data.get("digest", ""),
+        )
+
+
+@dataclass
+class ChunkManifest:
+    """Chunk boundaries and content hashes of a split file."""
+
+    filename: str
+    total_size: int
+    entries: List[ManifestEntry]
+
+    @classmethod
+    def from_json(cls, data: dict) -> "ChunkManifest":
+        return cls(
+            filename=data["filename"],
+            total_size=data["total_size"],
+            entries=[ManifestEntry.from_json(e) for e in data["entries"]],
+        )
+
+    def __json__(self) -> dict:
+        return {
+            "filename": self.filename,
+            "total_size": self.total_size,
+            "entries": [vars(e) for e in self.entries],
+        }
+
+    @classmethod
+    def from_lengths(cls, filename: str, lengths: List[int]) -> "ChunkManifest":
+        """Layout-only manifest for chunks of the given lengths, in index order."""
+        entries = []
+        offset = 0
+        for index, length in enumerate(lengths):
+            entries.append(ManifestEntry(index, offset, length))
+            offset += length
+        return cls(filename, offset, entries)
+
+    def save(self, path: str) -> None:
+        with open(path, "w") as f:
+            json.dump(self.__json__(), f)
+
+    @classmethod
+    def load(cls, path: str) -> "ChunkManifest":
+        with open(path) as f:
+            return cls.from_json(json.load(f))
+
+    def changed_since(self, previous: "ChunkManifest") -> List[ManifestEntry]:
+        """Entries whose content does not appear anywhere in previous."""
+        known = {e.digest for e in previous.entries}
+        return [e for e in self.entries if e.digest not in known]
+
+    def chunks(self, filepath: str) -> List[Chunk]:
+        """File-backed chunks for the manifest's entries of filepath."""
+        filename = os.path.basename(filepath)
+        return [
+            Chunk(e.index, FileRegion(filepath, e.offset, e.length), filename,
+                  len(self.entries))
+            for e in self.entries
+        ]
+
+
+def _gear_candidates_py(buf, start: int, end: int, mask_s: int, mask_l: int):
+    h = 0
+    cand_s: List[int] = []
+    cand_l: List[int] = []
+    gear = _GEAR
+    # Warm the rolling hash with the 63 bytes before the window
+    for byte in buf[max(0, start - 63) : start]:
+        h = ((h << 1) + gear[byte]) & _MASK64
+    for i in range(start, end):
+        h = ((h << 1) + gear[buf[i]]) & _MASK64
+        if not h & mask_l:
+            cand_l.append(i)
+            if not h & mask_s:
+                cand_s.append(i)
+    return cand_s, cand_l
+
+
+def _gear_candidates_np(buf, start: int, end: int, mask_s: int, mask_l: int):
+    # The Gear hash at i only depends on the last 64 bytes:
+    #   h[i] = sum(G[b[i - k]] << k for k in 0..63)  (mod 2**64)
+    # so it is computed for a whole window with six shift-and-add doublings.
+    ctx = max(0, start - 63)
+    data = _np.frombuffer(buf, dtype=_np.uint8, count=end - ctx, offset=ctx)
+    h = _GEAR_NP[data]
+    shift = 1
+    while shift < 64:
+        h[shift:] += h[:-shift] << _np.uint64(shift)
+        shift *= 2
+    h = h[start - ctx :]
+    loose = _np.flatnonzero((h & _np.uint64(mask_l)) == 0)
+    strict = loose[(h[loose] & _np.uint64(mask_s)) == 0]
+    return (strict + start).tolist(), (loose + start).tolist()
+
+
+if _np is not None:
+    _GEAR_NP = _np.array(_GEAR, dtype=_np.uint64)
+    _gear_candidates = _gear_candidates_np
+else:
+    _gear_candidates = _gear_candidates_py
+
+
+def _high_mask(bits: int) -> int:
+    # High bits depend on all 64 bytes of the window, low bits on only a few
+    return ((1 << bits) - 1) << (64 - bits)
+
+
+def _select_cuts(
+    size: int,
+    cand_s: List[int],
+    cand_l: List[int],
+    min_size: int,
+    avg_size: int,
+    max_size: int,
+) -> List[int]:
+    """
+    Chunk end offsets: below avg_size a cut needs the stricter mask, above it
+    the looser one, and max_size forces a cut (FastCDC normalized chunking).
+    """
+    ends = []
+    start = 0
+    while start < size:
+        end = min(start + max_size, size)
+        if size - start > min_size:
+            lo, mid = start + min_size - 1, start + avg_size - 1
+            j = bisect.bisect_left(cand_s, lo)
+            if j < len(cand_s) and cand_s[j] < min(mid, end - 1):
+                end = cand_s[j] + 1
+            else:
+                j = bisect.bisect_left(cand_l, mid)
+                if j < len(cand_l) and cand_l[j] < end - 1:
+                    end = cand_l[j] + 1
+        ends.append(end)
+        start = end
+    return ends
+
+
+def content_defined_manifest(
+    filepath: str,
+    min_size: int = 256 * 1024,
+    avg_size: int = 1024 * 1024,
+    max_size: int = 4 * 1024 * 1024,
+) -> ChunkManifest:
+    """
+    Split a file at content-defined boundaries (FastCDC with a Gear rolling
+    hash) and return the chunk offsets and SHA-256 digests.
+
+    An insertion or deletion only moves the boundaries next to it, so a file
+    that changed slightly keeps most chunk digests and only the changed
+    regions need to be resubmitted (see ChunkManifest.changed_since).
+    The hash loop is vectorized with NumPy when it is installed.
+    """
+    if not 64 <= min_size <= avg_size <= max_size:
+        raise ValueError("Expected 64 <= min_size <= avg_size <= max_size")
+
+    filename = os.path.basename(filepath)
+    size = os.path.getsize(filepath)
+    if size == 0:
+        return ChunkManifest(filename, 0, [])
+
+    bits = max(2, round(math.log2(avg_size)))
+    mask_s, mask_l = _high_mask(bits + 1), _high_mask(bits - 1)
+
+    with open(filepath, "rb") as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    try:
+        _madvise(mm, "MADV_SEQUENTIAL")
+        cand_s: List[int] = []
+        cand_l: List[int] = []
+        for start in range(0, size, _CDC_WINDOW):
+            s_, l_ = _gear_candidates(
+                mm, start, min(start + _CDC_WINDOW, size), mask_s, mask_l
+            )
+            cand_s += s_
+            cand_l += l_
+
+        entries = []
+        offset = 0
+        for index, end in enumerate(
+            _select_cuts(size, cand_s, cand_l, min_size, avg_size, max_size)
+        ):
+            with memoryview(mm)[offset:end] as view:
+                digest = hashlib.sha256(view).hexdigest()
+            entries.append(ManifestEntry(index, offset, end - offset, digest))
+            offset = end
+    finally:
+        mm.close()
+
+    return ChunkManifest(filename, size, entries)
+
+
+class IncrementalReconstructor:
+    """
+    Reassembles a file from chunks that arrive in any order.
+
+    The output is preallocated from the manifest and every chunk is written
+    at its offset with pwrite as soon as it is available, so reassembly
+    overlaps with processing and never holds more than one chunk in memory.
+    Completion is tracked in a bitmap; the file is fsynced once, in finish().
+    Safe to call write() from several threads.
+    """
+
+    def __init__(self, output_path: str, manifest: ChunkManifest):
+        self.__entries = {e.index: e for e in manifest.entries}
+        self.__slots = {
+            index: slot for slot, index in enumerate(sorted(self.__entries))
+        }
+        self.__done = bytearray((len(self.__slots) + 7) // 8)
+        self.__remaining = len(self.__slots)
+        self.__lock = threading.Lock()
+        flags = os.O_RDWR | os.O_CREAT | os.O_TRUNC
+        self.__fd = os.open(output_path, flags, 0o644)
+        preallocate(self.__fd, manifest.total_size)
+
+    def write(self, index: int, data: ChunkData) -> bool:
+        """
+        Writes chunk index at its offset. Returns False (and writes nothing)
+        if the chunk was already written, e.g. by a duplicate task.
+        """
+        entry = self.__entries.get(index)
+        if entry is None:
+            raise KeyError(f"Chunk {index} is not in the manifest")
+        if len(data) != entry.length:
+            raise ValueError(
+                f"Chunk {index} has {len(data)} bytes, manifest expects {entry.length}"
+            )
+        if self.is_done(index):
+            return False
+
+        if isinstance(data, FileRegion):
+            offset = entry.offset
+            for block in data.iter_blocks():
+                pwrite_all(self.__fd, block, offset)
+                offset += len(block)
+        else:
+            pwrite_all(self.__fd, data, entry.offset)
+
+        slot = self.__slots[index]
+        with self.__lock:
+            if self.__done[slot >> 3] & (1 << (slot & 7)):
+                return False
+            self.__done[slot >> 3] |= 1 << (slot & 7)
+            self.__remaining -= 1
+        return True
+
+    def is_done(self, index: int) -> bool:
+        slot = self.__slots[index]
+        return bool(self.__done[slot >> 3] & (1 << (slot & 7)))
+
+    @property
+    def complete(self) -> bool:
+        return self.__remaining == 0
+
+    def missing(self) -> List[int]:
+        return [index for index in self.__slots if not self.is_done(index)]
+
+    def finish(self) -> None:
+        """Checks every chunk arrived, then fsyncs and closes the output."""
+        if not self.complete:
+            raise ValueError(f"{self.__remaining} chunks missing")
+        os.fsync(self.__fd)
+        self.close()
+
+    def close(self) -> None:
+        if self.__fd >= 0:
+            os.close(self.__fd)
+            self.__fd = -1
+
+    def __enter__(self) -> "IncrementalReconstructor":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.finish()
+        else:
+            self.close()
+
+
+# === Record-aligned splitting of line-delimited files (JSONL) ===
+
+LINE_INDEX_SUFFIX = ".lines.idx"
+_LINE_INDEX_MAGIC = b"TILTIDX2"
+# magic, file size, mtime_ns, number of offsets
+_LINE_INDEX_HEADER = struct.Struct("<8sQQQ")
+_LINE_SCAN_WINDOW = 16 * 1024 * 1024
+
+
+def _line_index_path(filepath: str) -> str:
+    return filepath + LINE_INDEX_SUFFIX
+
+
+def _scan_line_starts(filepath: str, size: int) -> array:
+    starts = array("Q", [0])
+    with open(filepath, "rb") as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    try:
+        _madvise(mm, "MADV_SEQUENTIAL")
+        for start in range(0, size, _LINE_SCAN_WINDOW):
+            end = min(start + _LINE_SCAN_WINDOW, size)
+            if _np is not None:
+                window = _np.frombuffer(mm, _np.uint8, end - start, start)
+                newlines = _np.flatnonzero(window == 10)
+                starts.frombytes((newlines + (start + 1)).astype(_np.uint64).tobytes())
+                del window
+            else:
+                pos = mm.find(b"\n", start, end)
+                while pos != -1:
+                    starts.append(pos + 1)
+                    pos = mm.find(b"\n", pos + 1, end)
+    finally:
+        mm.close()
+    # A trailing newline does not start another record
+    if starts[-1] == size:
+        starts.pop()
+    return starts
+
+
+def index_lines(filepath: str, use_cache: bool = True) -> array:
+    """
+    Start offsets of every line in a file, as an array of uint64.
+
+    The file is scanned once (vectorized with NumPy when installed) and the
+    result is cached in a <file>.lines.idx sidecar, which later calls reuse
+    as long as the file's size and mtime are unchanged. The sidecar is
+    replaced atomically and records its entry count, so a partial or
+    damaged one is rescanned rather than trusted.
+    """
+    stat = os.stat(filepath)
+    if stat.st_size == 0:
+        return array("Q")
+    idx_path = _line_index_path(filepath)
+
+    if use_cache:
+        try:
+            with open(idx_path, "rb") as f:
+                magic, size, mtime_ns, count = _LINE_INDEX_HEADER.unpack(
+                    f.read(_LINE_INDEX_HEADER.size)
+                )
+                if (magic, size, mtime_ns) == (
+                    _LINE_INDEX_MAGIC,
+                    stat.st_size,
+                    stat.st_mtime_ns,
+                ):
+                    starts = array("Q")
+                    starts.frombytes(f.read())
+                    if (
+                        len(starts) != count
+                        or not starts
+                        or starts[0] != 0
+                        or starts[-1] >= size
+                    ):
+                        raise ValueError("Corrupt line index")
+                    return starts
+        except (OSError, struct.error, ValueError):
+            pass  # missing or damaged: rescan and rewrite it
+
+    starts = _scan_line_starts(filepath, stat.st_size)
+    if use_cache:
+        # Written aside and renamed into place, so concurrent readers never
+        # see a partial index. Hidden, so shard globs don't pick it up.
+        head, tail = os.path.split(idx_path)
+        tmp = os.path.join(head, f".{tail}.{os.getpid()}.{threading.get_ident()}")
+        try:
+            with open(tmp, "wb") as f:
+                f.write(
+                    _LINE_INDEX_HEADER.pack(
+                        _LINE_INDEX_MAGIC,
+                        stat.st_size,
+                        stat.st_mtime_ns,
+                        len(starts),
+                    )
+                )
+                starts.tofile(f)
+            os.replace(tmp, idx_path)
+        except OSError:
+            # e.g. read-only input directory; the index is only a cache
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+    return starts
+
+
+def record_ranges(
+    filepath: str, target_size: int, line_starts: Optional[array] = None
+) -> List[FileRegion]:
+    """
+    Split a line-delimited file into consecutive FileRegions of roughly
+    target_size bytes that never cut a record in half. The regions are
+    disjoint, so separate readers or processes can ingest them in parallel.
+    """
+    if line_starts is None:
+        line_starts = index_lines(filepath)
+    size = os.path.getsize(filepath)
+    regions = []
+    i = 0
+    while i < len(line_starts):
+        start = line_starts[i]
+        j = max(i + 1, bisect.bisect_left(line_starts, start + target_size))
+        end = line_starts[j] if j < len(line_starts) else size
+        regions.append(FileRegion(filepath, start, end - start))
+        i = j
+    return regions
+
+
+def read_records(region: FileRegion) -> List[bytes]:
+    """The non-empty lines of a record-aligned region, without newlines."""
+    return [line for line in region.read().split(b"\n") if line.strip()]
 
 
 # === Video handling using ffmpeg ===
@@ -59,9 +647,111 @@ async def _run_ffmpeg(cmd: List[str]) -> None:
     proc = await asyncio.create_subprocess_exec(
         *cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
     )
-    await proc.communicate()
+    try:
+        _, stderr = await proc.communicate()
+    except asyncio.CancelledError:
+        proc.kill()
+        await proc.wait()
+        raise
     if proc.returncode != 0:
-        raise RuntimeError(f"ffmpeg failed: {cmd}")
+        tail = stderr.decode(errors="replace")[-2000:]
+        raise RuntimeError(f"ffmpeg failed: {cmd}\n{tail}")
+
+
+async def _probe_bit_rate(input_path: str) -> int:
+    """Overall bit rate of a media file in bits per second, via ffprobe."""
+    proc = await asyncio.create_subprocess_exec(
+        "ffprobe",
+        "-v",
+        "error",
+        "-show_entries",
+        "format=bit_rate",
+        "-of",
+        "default=noprint_wrappers=1:nokey=1",
+        input_path,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    stdout, _ = await proc.communicate()
+    try:
+        return int(stdout.decode().strip())
+    except ValueError:
+        raise RuntimeError(f"ffprobe could not read the bit rate of {input_path}")
+
+
+async def stream_video_segments(
+    input_path: str,
+    output_dir: str,
+    segment_time: Optional[float] = 10,
+    target_bytes: Optional[int] = None,
+    poll_interval: float = 0.2,
+) -> AsyncGenerator[str]:
+    """
+    Split a video with ffmpeg and yield each segment path as soon as ffmpeg
+    has finished writing it, while the rest is still being split.
+
+    Segments are followed through the segment list ffmpeg appends to after
+    closing each one. With target_bytes, segment_time is derived from the
+    input's bit rate so segments come out at roughly that size (cuts still
+    land on keyframes).
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    if target_bytes is not None:
+        bit_rate = await _probe_bit_rate(input_path)
+        segment_time = max(1.0, target_bytes * 8 / bit_rate)
+
+    list_path = os.path.join(output_dir, "segments.txt")
+    if os.path.exists(list_path):
+        os.remove(list_path)
+    cmd = [
+        "ffmpeg",
+        "-y",
+        "-i",
+        input_path,
+        "-f",
+        "segment",
+        "-segment_time",
+        str(segment_time or 10),
+        "-segment_list",
+        list_path,
+        "-segment_list_type",
+        "flat",
+        "-c",
+        "copy",
+        "-map",
+        "0",
+        "-reset_timestamps",
+        "1",
+        f"{output_dir}/part_%04d.mp4",
+    ]
+    ffmpeg = asyncio.ensure_future(_run_ffmpeg(cmd))
+    seen = 0
+
+    def new_segments() -> List[str]:
+        nonlocal seen
+        try:
+            with open(list_path) as f:
+                content = f.read()
+        except FileNotFoundError:
+            return []
+        # The last line may still be being written
+        lines = [line for line in content.split("\n")[:-1] if line.strip()]
+        fresh = lines[seen:]
+        seen = len(lines)
+        return [os.path.join(output_dir, os.path.basename(p)) for p in fresh]
+
+    try:
+        while not ffmpeg.done():
+            for path in new_segments():
+                yield path
+            await asyncio.wait({ffmpeg}, timeout=poll_interval)
+        await ffmpeg  # raises if ffmpeg failed
+        for path in new_segments():
+            yield path
+    finally:
+        if not ffmpeg.done():
+            ffmpeg.cancel()
+            await asyncio.gather(ffmpeg, return_exceptions=True)
 
 
 def split_video(input_path: str, output_dir: str, segment_time: int | None = 10):
@@ -93,6 +783,143 @@ def split_video(input_path: str, output_dir: str, segment_time: int | None = 10)
     subprocess.run(cmd, check=True, capture_output=True)
 
 
+async def _probe_duration(path: str) -> float:
+    """Duration of a media file in seconds, via ffprobe."""
+    proc = await asyncio.create_subprocess_exec(
+        "ffprobe",
+        "-v",
+        "error",
+        "-show_entries",
+        "format=duration",
+        "-of",
+        "default=noprint_wrappers=1:nokey=1",
+        path,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    stdout, _ = await proc.communicate()
+    try:
+        return float(stdout.decode().strip())
+    except ValueError:
+        raise RuntimeError(f"ffprobe could not read the duration of {path}")
+
+
+class VideoReassembler:
+    """
+    Reassembles processed video segments into one file while they arrive.
+
+    A single ffmpeg muxer runs for the whole job and reads an MPEG-TS stream
+    on stdin. Whenever the next segment in index order is available it is
+    remuxed to TS (shifted by the duration of everything before it) and
+    piped in, then deleted, so only segments waiting for an earlier one stay
+    on disk. After the last segment only the muxer's trailer remains to be
+    written. With fragmented=True the output is a fragmented MP4 that is
+    playable while it grows.
+    """
+
+    def __init__(
+        self,
+        output_path: str,
+        delete_segments: bool = True,
+        fragmented: bool = False,
+        block_size: int = REGION_BLOCK_SIZE,
+    ):
+        self.__output_path = output_path
+        self.__delete_segments = delete_segments
+        self.__fragmented = fragmented
+        self.__block_size = block_size
+        self.__pending: dict[int, str] = {}
+        self.__next_index = 0
+        self.__offset = 0.0
+        self.__muxer: Optional[asyncio.subprocess.Process] = None
+        self.__lock = asyncio.Lock()
+
+    async def add(self, index: int, segment_path: str) -> None:
+        """Registers a processed segment and appends every segment now in order."""
+        self.__pending[index] = segment_path
+        async with self.__lock:
+            while self.__next_index in self.__pending:
+                await self.__append(self.__pending.pop(self.__next_index))
+                self.__next_index += 1
+
+    async def finish(self) -> None:
+        """Closes the stream and waits for the muxer to finalize the output."""
+        if self.__pending:
+            raise ValueError(
+                f"Segment {self.__next_index} missing; "
+                f"{len(self.__pending)} later segments were never appended"
+            )
+        if self.__muxer is None:
+            raise ValueError("No video segments were added")
+        assert self.__muxer.stdin is not None
+        self.__muxer.stdin.close()
+        if await self.__muxer.wait() != 0:
+            raise RuntimeError(f"ffmpeg failed writing {self.__output_path}")
+
+    async def abort(self) -> None:
+        if self.__muxer is not None and self.__muxer.returncode is None:
+            self.__muxer.kill()
+            await self.__muxer.wait()
+
+    async def __aenter__(self) -> "VideoReassembler":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            await self.finish()
+        else:
+            await self.abort()
+
+    async def __start_muxer(self) -> asyncio.subprocess.Process:
+        cmd = ["ffmpeg", "-y", "-f", "mpegts", "-i", "pipe:0"]
+        cmd += ["-c", "copy", "-map", "0"]
+        if self.__fragmented:
+            cmd += ["-movflags", "frag_keyframe+empty_moov"]
+        cmd.append(self.__output_path)
+        # stderr is not read while the job runs, so it must not be a pipe
+        # that could fill up and stall the muxer
+        return await asyncio.create_subprocess_exec(
+            *cmd,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.DEVNULL,
+        )
+
+    async def __append(self, segment_path: str) -> None:
+        if self.__muxer is None:
+            self.__muxer = await self.__start_muxer()
+        muxer_in = self.__muxer.stdin
+        assert muxer_in is not None
+
+        duration = await _probe_duration(segment_path)
+        remux = await asyncio.create_subprocess_exec(
+            "ffmpeg",
+            "-i",
+            segment_path,
+            "-c",
+            "copy",
+            "-map",
+            "0",
+            "-output_ts_offset",
+            f"{self.__offset:.6f}",
+            "-f",
+            "mpegts",
+            "pipe:1",
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL,
+        )
+        assert remux.stdout is not None
+        while block := await remux.stdout.read(self.__block_size):
+            muxer_in.write(block)
+            await muxer_in.drain()
+        if await remux.wait() != 0:
+            raise RuntimeError(f"ffmpeg failed remuxing {segment_path}")
+
+        self.__offset += duration
+        if self.__delete_segments:
+            os.remove(segment_path)
+
+
 def reconstruct_video(input_dir: str, output_path: str) -> None:
     """
     Recombine segmented .mp4 files back into one video.
@@ -129,8 +956,25 @@ def reconstruct_video(input_dir: str, output_path: str) -> None:
 
 __all__ = [
     "Chunk",
+    "ChunkBacking",
+    "ChunkData",
+    "FileRegion",
+    "file_regions",
+    "preallocate",
+    "pwrite_all",
+    "write_chunk_data",
     "deconstruct_file",
     "reconstruct_file",
+    "ChunkManifest",
+    "ManifestEntry",
+    "IncrementalReconstructor",
+    "content_defined_manifest",
+    "LINE_INDEX_SUFFIX",
+    "index_lines",
+    "record_ranges",
+    "read_records",
     "split_video",
+    "stream_video_segments",
     "reconstruct_video",
+    "VideoReassembler",
 ]
@@ -1,15 +1,37 @@
 import asyncio
+import glob
+import io
+import os
 from abc import ABC, abstractmethod
-from typing import Any, AsyncGenerator, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncGenerator, Callable, Optional, Sequence
 
 import aiofiles
 
-from tilt.sectioner import Chunk, deconstruct_file, reconstruct_file
+from tilt.compression import is_compressed, open_decompressed
+from tilt.sectioner import (
+    Chunk,
+    ChunkBacking,
+    ChunkManifest,
+    ChunkData,
+    LINE_INDEX_SUFFIX,
+    FileRegion,
+    deconstruct_file,
+    file_regions,
+    reconstruct_file,
+    record_ranges,
+)
 from tilt.sectioner import reconstruct_video as sectioner_reconstruct_video
 from tilt.sectioner import split_video as sectioner_split_video
+from tilt.sectioner import VideoReassembler, stream_video_segments
+from tilt.tuning import ChunkSizeTuner
 
 
 class SourceHandler(ABC):
+    # Streaming sources have no fixed size: Tilt.create_and_poll pulls items
+    # from read() as workers free up instead of calling payloads() up front.
+    streaming = False
+
     def __init__(self, filepath: str):
         self.__filepath = filepath
 
@@ -22,26 +44,177 @@ class SourceHandler(ABC):
     def jsonl_to_bytes_list(self) -> list[bytes]:
         pass
 
+    def payloads(self) -> Sequence[ChunkData]:
+        """The per-task payloads submitted by Tilt.create_and_poll."""
+        return self.jsonl_to_bytes_list()
 
-class TextSourceHandler(SourceHandler):
-    def __init__(self, filepath: str, batch_size: int = 1):
-        self.__filepath = filepath
+    def observe(self, index: int, seconds: float) -> None:
+        """Called by Tilt.create_and_poll when item `index` finished after `seconds`."""
+
+    def to_payload(self, item: Any) -> ChunkData:
+        """Turns one item yielded by read() into a task payload."""
+        if isinstance(item, Chunk):
+            return item.data
+        if len(item) == 1 and isinstance(item[0], bytes):
+            return item[0]
+        if item and isinstance(item[0], bytes):
+            return b"\n".join(item)
+        return "\n".join(item).encode("utf-8")
+
+
+async def read_text_lines(
+    path: str, block_size: int = 4 * 1024 * 1024
+) -> AsyncGenerator[list[str], None]:
+    """
+    Reads a text file (plain, .gz or .zst) in large blocks and yields the
+    complete lines of each, split in bulk. A line cut by a block boundary is
+    carried over to the next block. Newlines are normalized like text-mode
+    reads.
+    """
+    carry = b""
+    async for block in _read_blocks(path, block_size):
+        block = carry + block if carry else block
+        cut = block.rfind(b"\n") + 1
+        carry = block[cut:]
+        if cut:
+            yield _split_lines(block[:cut].decode("utf-8"))[:-1]
+    if carry:
+        lines = _split_lines(carry.decode("utf-8"))
+        if not lines[-1]:
+            lines.pop()  # the file ended with a lone "\r"
+        yield lines
+
+
+async def _read_blocks(path: str, block_size: int) -> AsyncGenerator[bytes, None]:
+    if not is_compressed(path):
+        async with aiofiles.open(path, "rb") as f:
+            while block := await f.read(block_size):
+                yield block
+        return
+
+    f = await asyncio.to_thread(open_decompressed, path)
+    try:
+        while block := await asyncio.to_thread(f.read, block_size):
+            yield block
+    finally:
+        f.close()
+
+
+def _split_lines(text: str) -> list[str]:
+    if "\r" in text:
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+    return text.split("\n")
+
+
+class _LineBatcher:
+    """Groups the line blocks of a text source into read() batches."""
+
+    def __init__(
+        self,
+        read_lines: Callable[[], AsyncGenerator[list[str], None]],
+        batch_size: int,
+        batch_bytes: Optional[int],
+    ):
+        self.__read_lines = read_lines
         self.__batch_size = batch_size
+        self.__batch_bytes = batch_bytes
 
-    def jsonl_to_bytes_list(self) -> list[bytes]:
-        with open(self.__filepath, "r", encoding="utf-8") as f:
-            return [line.rstrip("\n").encode("utf-8") for line in f if line.strip()]
+    async def batches(self) -> AsyncGenerator[list[str], None]:
+        if self.__batch_bytes is None:
+            async for batch in self.__batches_by_count():
+                yield batch
+            return
 
-    async def read(self) -> AsyncGenerator[list[str], None]:  # type: ignore[override]
-        async with aiofiles.open(self.__filepath, "r", encoding="utf-8") as f:
-            batch = []
-            async for line in f:
-                batch.append(line.rstrip("\n"))
-                if len(batch) == self.__batch_size:
+        batch: list[str] = []
+        size = 0
+        async for lines in self.__read_lines():
+            for line in lines:
+                batch.append(line)
+                # UTF-8 size; isascii() is a flag check, so ASCII stays cheap
+                size += len(line) if line.isascii() else len(line.encode("utf-8"))
+                if len(batch) == self.__batch_size or size >= self.__batch_bytes:
                     yield batch
                     batch = []
+                    size = 0
+        if batch:
+            yield batch
+
+    async def __batches_by_count(self) -> AsyncGenerator[list[str], None]:
+        n = self.__batch_size
+        batch: list[str] = []
+        async for lines in self.__read_lines():
+            start = 0
             if batch:
+                start = n - len(batch)
+                batch += lines[:start]
+                if len(batch) < n:
+                    continue
                 yield batch
+            end = start + (len(lines) - start) // n * n
+            for i in range(start, end, n):
+                yield lines[i : i + n]
+            batch = lines[end:]
+        if batch:
+            yield batch
+
+    async def records(self) -> AsyncGenerator[tuple[int, str], None]:
+        index = 0
+        async for lines in self.__read_lines():
+            for line in lines:
+                yield index, line
+                index += 1
+
+
+class TextSourceHandler(SourceHandler):
+    def __init__(
+        self,
+        filepath: str,
+        batch_size: int = 1,
+        batch_bytes: Optional[int] = None,
+        block_size: int = 4 * 1024 * 1024,
+    ):
+        """
+        Args:
+            filepath: Text file to read; .gz and .zst files are decompressed
+                as they are read.
+            batch_size: Lines per batch yielded by read().
+            batch_bytes: If set, a batch is also closed once its lines add up
+                to this many bytes (UTF-8 encoded), whichever limit is hit
+                first.
+            block_size: Bytes read from the file per thread-pool hop.
+        """
+        self.__filepath = filepath
+        self.__block_size = block_size
+        self.__batcher = _LineBatcher(self.read_lines, batch_size, batch_bytes)
+
+    def jsonl_to_bytes_list(self) -> list[bytes]:
+        with io.TextIOWrapper(
+            open_decompressed(self.__filepath), encoding="utf-8"
+        ) as f:
+            return [line.rstrip("\n").encode("utf-8") for line in f if line.strip()]
+
+    def record_ranges(self, target_size: int) -> list[FileRegion]:
+        """
+        Record-aligned byte ranges of about target_size bytes, for ingesting
+        the file with several readers or processes (see sectioner.read_records).
+        The line index behind them is cached next to the file.
+        """
+        if is_compressed(self.__filepath):
+            raise ValueError("record_ranges needs an uncompressed file")
+        return record_ranges(self.__filepath, target_size)
+
+    async def read(self) -> AsyncGenerator[list[str], None]:  # type: ignore[override]
+        async for batch in self.__batcher.batches():
+            yield batch
+
+    async def read_records(self) -> AsyncGenerator[tuple[int, str], None]:
+        """Yields (index, line) pairs, index being the line's position in the input."""
+        async for record in self.__batcher.records():
+            yield record
+
+    def read_lines(self) -> AsyncGenerator[list[str], None]:
+        """The file's lines, block by block (see read_text_lines)."""
+        return read_text_lines(self.__filepath, self.__block_size)
 
     async def write(self, batches: list[list[str]]):
         async with aiofiles.open(self.__filepath, "w", encoding="utf-8") as f:
@@ -50,18 +223,191 @@ class TextSourceHandler(SourceHandler):
                     await f.write(line + "\n")
 
 
+class ShardedTextSourceHandler(SourceHandler):
+    """
+    Reads lines from a set of shard files, given as a glob ("data/*.jsonl.gz")
+    or a directory. Shards may be plain, gzip or zstd compressed.
+
+    Up to `readers` shards are read and decompressed concurrently, both by
+    read() and by jsonl_to_bytes_list(), but lines are emitted shard by shard
+    in sorted path order, so a record's global index (its position across
+    all shards) is the same on every run.
+    """
+
+    def __init__(
+        self,
+        source: str,
+        batch_size: int = 1,
+        batch_bytes: Optional[int] = None,
+        block_size: int = 4 * 1024 * 1024,
+        readers: int = 4,
+        prefetch_blocks: int = 4,
+    ):
+        """
+        Args:
+            readers: Shards read ahead concurrently.
+            prefetch_blocks: Blocks of lines buffered per shard being read
+                ahead; with block_size this bounds memory use.
+        """
+        self.__shards = self.__resolve(source)
+        if not self.__shards:
+            raise FileNotFoundError(f"No shards found for {source}")
+        self.__block_size = block_size
+        self.__readers = max(1, readers)
+        self.__prefetch_blocks = prefetch_blocks
+        self.__batcher = _LineBatcher(self.read_lines, batch_size, batch_bytes)
+
+    @property
+    def shards(self) -> list[str]:
+        return list(self.__shards)
+
+    @staticmethod
+    def __resolve(source: str) -> list[str]:
+        if os.path.isdir(source):
+            paths = [
+                os.path.join(source, name)
+                for name in os.listdir(source)
+                if not name.startswith(".")
+            ]
+        else:
+            paths = glob.glob(source)
+        return sorted(
+            path
+            for path in paths
+            if os.path.isfile(path) and not path.endswith(LINE_INDEX_SUFFIX)
+        )
+
+    async def read(self) -> AsyncGenerator[list[str], None]:  # type: ignore[override]
+        async for batch in self.__batcher.batches():
+            yield batch
+
+    async def read_records(self) -> AsyncGenerator[tuple[int, str], None]:
+        """Yields (index, line) pairs, index being the line's position across shards."""
+        async for record in self.__batcher.records():
+            yield record
+
+    async def read_lines(self) -> AsyncGenerator[list[str], None]:
+        queues: dict[int, asyncio.Queue] = {}
+        readers: list[asyncio.Task] = []
+
+        def start(i: int) -> None:
+            queues[i] = asyncio.Queue(self.__prefetch_blocks)
+            readers.append(
+                asyncio.ensure_future(self.__read_shard(self.__shards[i], queues[i]))
+            )
+
+        try:
+            for i in range(min(self.__readers, len(self.__shards))):
+                start(i)
+            for i in range(len(self.__shards)):
+                queue = queues.pop(i)
+                while (lines := await queue.get()) is not None:
+                    if isinstance(lines, Exception):
+                        raise lines
+                    yield lines
+                if i + self.__readers < len(self.__shards):
+                    start(i + self.__readers)
+        finally:
+            for reader in readers:
+                reader.cancel()
+            await asyncio.gather(*readers, return_exceptions=True)
+
+    async def __read_shard(self, shard: str, queue: asyncio.Queue) -> None:
+        try:
+            async for lines in read_text_lines(shard, self.__block_size):
+                await queue.put(lines)
+        except Exception as e:
+            await queue.put(e)
+            return
+        await queue.put(None)
+
+    def jsonl_to_bytes_list(self) -> list[bytes]:
+        # One shard per worker; decompression and reads release the GIL
+        with ThreadPoolExecutor(
+            min(self.__readers, len(self.__shards)),
+            thread_name_prefix="tilt-shard-reader",
+        ) as pool:
+            per_shard = pool.map(
+                lambda shard: TextSourceHandler(shard).jsonl_to_bytes_list(),
+                self.__shards,
+            )
+            return [line for lines in per_shard for line in lines]
+
+
 class BinarySourceHandler(SourceHandler):
-    def __init__(self, filename: str, chunk_size: int = 1024, batch_size: int = 1):
+    def __init__(
+        self,
+        filename: str,
+        chunk_size: int = 1024,
+        batch_size: int = 1,
+        backing: ChunkBacking = ChunkBacking.BYTES,
+        tuner: Optional[ChunkSizeTuner] = None,
+        manifest_path: Optional[str] = None,
+    ):
+        """
+        Args:
+            tuner: Size chunks adaptively toward a target task duration
+                instead of using chunk_size. Chunks are then produced as the
+                job runs (the handler becomes a streaming source) and are
+                always file-backed.
+            manifest_path: With a tuner, where to save the ChunkManifest of
+                the chosen boundaries once the whole file has been read.
+        """
         self.__filepath = filename
         self.__chunk_size = chunk_size
         self.__batch_size = batch_size
+        self.__backing = backing
+        self.__tuner = tuner
+        self.__manifest_path = manifest_path
+        self.__lengths: list[int] = []
+
+    @property
+    def streaming(self) -> bool:  # type: ignore[override]
+        return self.__tuner is not None
 
     async def read(self) -> AsyncGenerator[Chunk, None]:  # type: ignore[override]
-        async for chunk in deconstruct_file(self.__filepath, self.__chunk_size):
+        if self.__tuner is not None:
+            async for chunk in self.__read_tuned(self.__tuner):
+                yield chunk
+            return
+        async for chunk in deconstruct_file(
+            self.__filepath, self.__chunk_size, self.__backing
+        ):
             yield chunk
 
+    async def __read_tuned(self, tuner: ChunkSizeTuner) -> AsyncGenerator[Chunk, None]:
+        self.__lengths = []
+        total = os.path.getsize(self.__filepath)
+        filename = os.path.basename(self.__filepath)
+        offset = 0
+        while offset < total:
+            # Sized only when the consumer asks, so later chunks benefit from
+            # what earlier ones measured
+            length = min(tuner.next_size(), total - offset)
+            index = len(self.__lengths)
+            self.__lengths.append(length)
+            yield Chunk(index, FileRegion(self.__filepath, offset, length), filename)
+            offset += length
+        if self.__manifest_path:
+            await asyncio.to_thread(self.manifest().save, self.__manifest_path)
+
+    def manifest(self) -> ChunkManifest:
+        """Boundaries of the chunks read so far with the tuner."""
+        filename = os.path.basename(self.__filepath)
+        return ChunkManifest.from_lengths(filename, list(self.__lengths))
+
+    def observe(self, index: int, seconds: float) -> None:
+        if self.__tuner is not None and index < len(self.__lengths):
+            self.__tuner.observe(self.__lengths[index], seconds)
+
+    def payloads(self) -> Sequence[ChunkData]:
+        # Regions are streamed from disk at upload time, so a job never holds
+        # more than the in-flight upload buffers in memory.
+        return file_regions(self.__filepath, self.__chunk_size)
+
     async def write(self, chunks: list[Chunk], output_file):
-        reconstruct_file(chunks, output_file)
+        # File I/O off the loop, so other transfers are not stalled meanwhile
+        await asyncio.to_thread(reconstruct_file, chunks, output_file)
 
     def jsonl_to_bytes_list(self) -> list[bytes]:
         raise NotImplementedError(
@@ -70,49 +416,178 @@ class BinarySourceHandler(SourceHandler):
 
 
 class TcpHandler(SourceHandler):
-    def __init__(self, host: str, port: int, batch_size: int = 1, encoding="utf-8"):
+    """
+    Reads records from a TCP feed.
+
+    Records are newline-terminated (framing="line") or prefixed with a 4-byte
+    big-endian length (framing="length"). With encoding=None records are
+    yielded as bytes. With reconnect=True a dropped connection is re-opened
+    with exponential backoff, so a live feed can run indefinitely; the
+    stream only fails after max_reconnects consecutive failed attempts.
+
+    Records are only read when the consumer asks for the next batch, and the
+    stream reader pauses the socket once read_buffer bytes are buffered, so a
+    job's in-flight window propagates back to the sender as TCP backpressure.
+    """
+
+    streaming = True
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        batch_size: int = 1,
+        encoding: Optional[str] = "utf-8",
+        framing: str = "line",
+        read_buffer: int = 4 * 1024 * 1024,
+        reconnect: bool = False,
+        max_reconnects: Optional[int] = None,
+        backoff_initial: float = 0.5,
+        backoff_max: float = 30.0,
+        flush_interval: Optional[float] = None,
+    ):
+        """
+        Args:
+            flush_interval: Yield a partial batch if no record arrives for
+                this many seconds, so slow feeds are not held back.
+        """
+        if framing not in ("line", "length"):
+            raise ValueError("framing must be 'line' or 'length'")
         self.__host = host
         self.__port = port
         self.__batch_size = batch_size
         self.__encoding = encoding
+        self.__framing = framing
+        self.__read_buffer = read_buffer
+        self.__reconnect = reconnect
+        self.__max_reconnects = max_reconnects
+        self.__backoff_initial = backoff_initial
+        self.__backoff_max = backoff_max
+        self.__flush_interval = flush_interval
 
-    async def read(self) -> AsyncGenerator[list[str], None]:  # type: ignore[override]
-        reader, writer = await asyncio.open_connection(self.__host, self.__port)
-        batch = []
+    async def read(self) -> AsyncGenerator[list, None]:  # type: ignore[override]
+        batch: list = []
+        failures = 0
+        while True:
+            try:
+                reader, writer = await asyncio.open_connection(
+                    self.__host, self.__port, limit=self.__read_buffer
+                )
+            except OSError:
+                failures += 1
+                if not self.__reconnect or self.__exhausted(failures):
+                    if batch:
+                        yield batch
+                    raise
+                await asyncio.sleep(self.__backoff(failures))
+                continue
+
+            failures = 0
+            frame: Optional[asyncio.Future] = None
+            try:
+                while True:
+                    if frame is None:
+                        frame = asyncio.ensure_future(self.__read_frame(reader))
+                    if batch and self.__flush_interval is not None:
+                        # The read is left running (not cancelled) so a frame
+                        # that is half received is never lost
+                        done, _ = await asyncio.wait(
+                            {frame}, timeout=self.__flush_interval
+                        )
+                        if not done:
+                            yield batch
+                            batch = []
+                            continue
+                    raw = await frame
+                    frame = None
+                    if raw is None:
+                        break
+                    record = raw.decode(self.__encoding) if self.__encoding else raw
+                    batch.append(record)
+                    if len(batch) == self.__batch_size:
+                        yield batch
+                        batch = []
+            except (ConnectionError, asyncio.IncompleteReadError):
+                if not self.__reconnect:
+                    raise
+            finally:
+                if frame is not None and not frame.done():
+                    frame.cancel()
+                writer.close()
+                try:
+                    await writer.wait_closed()
+                except ConnectionError:
+                    pass
+
+            if not self.__reconnect:
+                break
+            failures += 1
+            if self.__exhausted(failures):
+                break
+            await asyncio.sleep(self.__backoff(failures))
+
+        if batch:
+            yield batch
+
+    async def __read_frame(self, reader: asyncio.StreamReader) -> Optional[bytes]:
+        if self.__framing == "line":
+            line = await reader.readline()
+            return line.rstrip(b"\n") if line else None
         try:
-            while True:
-                line = await reader.readline()
-                if not line:
-                    break
-                batch.append(line.decode(self.__encoding).rstrip("\n"))
-                if len(batch) == self.__batch_size:
-                    yield batch
-                    batch = []
-            if batch:
-                yield batch
-        finally:
-            writer.close()
-            await writer.wait_closed()
+            header = await reader.readexactly(4)
+        except asyncio.IncompleteReadError as e:
+            if not e.partial:
+                return None
+            raise
+        return await reader.readexactly(int.from_bytes(header, "big"))
+
+    def __exhausted(self, failures: int) -> bool:
+        return self.__max_reconnects is not None and failures > self.__max_reconnects
+
+    def __backoff(self, failures: int) -> float:
+        return min(self.__backoff_max, self.__backoff_initial * 2 ** (failures - 1))
 
     def jsonl_to_bytes_list(self) -> list[bytes]:
         raise NotImplementedError("TcpHandler does not support jsonl_to_bytes_list")
 
 
 class VideoHandler(SourceHandler):
+    streaming = True
+
     def __init__(
         self,
         filename: Optional[str] = None,
         output_dir: Optional[str] = None,
         input_dir: Optional[str] = None,
         target_filename: Optional[str] = None,
+        segment_time: Optional[float] = 10,
+        target_segment_bytes: Optional[int] = None,
     ):
         self.__filename = filename
         self.__output_dir = output_dir
         self.__input_dir = input_dir
         self.__target_filename = target_filename
+        self.__segment_time = segment_time
+        self.__target_segment_bytes = target_segment_bytes
 
-    async def read(self) -> AsyncGenerator[Any, None]:  # type: ignore[override]
-        raise NotImplementedError("VideoHandler does not support read")
+    async def read(self) -> AsyncGenerator[Chunk, None]:  # type: ignore[override]
+        """
+        Yields each segment as a file-backed Chunk as soon as ffmpeg has
+        written it, so uploading can start while the video is still being
+        split.
+        """
+        if self.__filename is None or self.__output_dir is None:
+            raise ValueError("filename and output_dir must be provided")
+        index = 0
+        async for path in stream_video_segments(
+            self.__filename,
+            self.__output_dir,
+            self.__segment_time,
+            self.__target_segment_bytes,
+        ):
+            region = FileRegion(path, 0, os.path.getsize(path))
+            yield Chunk(index, region, os.path.basename(path))
+            index += 1
 
     def jsonl_to_bytes_list(self) -> list[bytes]:
         raise NotImplementedError("VideoHandler does not support jsonl_to_bytes_list")
@@ -124,7 +599,7 @@ class VideoHandler(SourceHandler):
         output_dir = output_dir or self.__output_dir
         if filename is None or output_dir is None:
             raise ValueError("filename and output_dir must be provided")
-        sectioner_split_video(filename, output_dir, None)
+        sectioner_split_video(filename, output_dir, self.__segment_time)
 
     def reconstruct_video(
         self, input_dir: Optional[str] = None, target_filename: Optional[str] = None
@@ -134,3 +609,15 @@ class VideoHandler(SourceHandler):
         if input_dir is None or target_filename is None:
             raise ValueError("input_dir and target_filename must be provided")
         sectioner_reconstruct_video(input_dir, target_filename)
+
+    def reassembler(
+        self, target_filename: Optional[str] = None, fragmented: bool = False
+    ) -> VideoReassembler:
+        """
+        An incremental reassembler for processed segments: add() each one as
+        it completes and the output grows in index order.
+        """
+        target_filename = target_filename or self.__target_filename
+        if target_filename is None:
+            raise ValueError("target_filename must be provided")
+        return VideoReassembler(target_filename, fragmented=fragmented)
@@ -0,0 +1,97 @@
+import time
+from dataclasses import dataclass
+from typing import Iterable, Optional
+
+from tilt.job_state import ChunkStatus, JobStateTable, Phase
+
+try:
+    import numpy as _np
+except ImportError:  # quantiles fall back to sorting
+    _np = None
+
+
+@dataclass
+class Speculation:
+    """
+    Settings for speculative re-execution of straggling chunks.
+
+    Once `min_done` of the job's chunks have finished, a chunk that has been
+    running for longer than `multiplier` times the `quantile` of finished
+    chunk durations gets a duplicate task. Whichever copy returns first is
+    used and the other is abandoned. At most `max_duplicates` duplicates are
+    launched per job.
+    """
+
+    quantile: float = 0.9
+    multiplier: float = 1.5
+    min_done: float = 0.75
+    max_duplicates: int = 16
+    min_samples: int = 5
+
+
+def _quantile(values, q: float) -> float:
+    k = min(len(values) - 1, int(q * len(values)))
+    if _np is not None:
+        # Selection instead of a full sort
+        return float(_np.partition(_np.asarray(values, dtype=_np.float64), k)[k])
+    return sorted(values)[k]
+
+
+class Speculator:
+    """Decides which running chunks get a duplicate, within the budget."""
+
+    def __init__(self, settings: Speculation, state: JobStateTable):
+        self.__settings = settings
+        self.__state = state
+        self.__launched = 0
+        # (finished count, threshold) of the last computation
+        self.__cached: tuple[int, Optional[float]] = (-1, None)
+
+    @property
+    def launched(self) -> int:
+        return self.__launched
+
+    def threshold(self) -> Optional[float]:
+        """
+        Age in seconds past which a chunk counts as a straggler, if known yet.
+        Only recomputed when the number of finished chunks has changed.
+        """
+        done = self.__state.counts()[ChunkStatus.FINISHED]
+        if done < self.__settings.min_samples:
+            return None
+        if done < self.__settings.min_done * len(self.__state):
+            return None
+        if self.__cached[0] == done:
+            return self.__cached[1]
+        # Failed chunks have a DONE time too, but say nothing about runtimes
+        durations = self.__state.durations(
+            Phase.QUEUED, Phase.DONE, ChunkStatus.FINISHED
+        )
+        threshold = None
+        if len(durations):
+            typical = _quantile(durations, self.__settings.quantile)
+            threshold = typical * self.__settings.multiplier
+        self.__cached = (done, threshold)
+        return threshold
+
+    def pick(
+        self, running: Iterable[int], now: Optional[float] = None
+    ) -> Optional[int]:
+        """
+        The longest-running chunk among `running` (chunks without a duplicate
+        yet) that is past the threshold, counting it against the budget.
+        """
+        if self.__launched >= self.__settings.max_duplicates:
+            return None
+        threshold = self.threshold()
+        if threshold is None:
+            return None
+        now = time.time() if now is None else now
+        oldest, oldest_start = None, now - threshold
+        for index in running:
+            started = self.__state.timestamp(index, Phase.QUEUED)
+            if started is not None and started < oldest_start:
+                oldest, oldest_start = index, started
+        if oldest is not None:
+            self.__launched += 1
+        return oldest
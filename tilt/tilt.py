@@ -1,8 +1,9 @@
-import asyncio
 import atexit
 import queue
 import threading
 import time
+from dataclasses import asdict
+from typing import Callable, Iterable, Iterator, Optional, Union
 from uuid import UUID, uuid4
 
 from rich.console import Console, Group
@@ -21,11 +22,19 @@ from tilt.async_executor import AsyncExecutor
 from tilt.connection import Connection
 from tilt.console import ChunkSpeedColumn
 from tilt.entities.auth import SkSignInResponse
-from tilt.entities.job import Job
+from tilt.entities.job import Job, JobStatus
 from tilt.entities.task import Task
+from tilt.job_state import ChunkStatus, JobStateTable, Phase
 from tilt.log import TiltLog
+from tilt.loop_monitor import LoopMetrics
 from tilt.options import Options
 from tilt.processed_data import ProcessedData
+from tilt.profiling import Profiler
+from tilt.report import JobReport
+from tilt.sectioner import ChunkData
+from tilt.scheduling import ByteBudget, DispatchPolicy, Fifo
+from tilt.source_handler import SourceHandler
+from tilt.speculation import Speculation, Speculator
 from tilt.types import (
     Err,
     Error,
@@ -41,12 +50,45 @@ from tilt.utils import _is_jupyter
 console = Console(stderr=True)
 
 
+class _ResultSink:
+    """Collects the chunks of a bulk job's output and hands each one on."""
+
+    def __init__(
+        self, state: JobStateTable, done: Callable[[int, Option[bytes]], None]
+    ):
+        self.__state = state
+        self.__done = done
+        self.__index = 0
+        self.__buf = bytearray()
+
+    def begin(self, index: int) -> None:
+        self.__index = index
+        self.__buf = bytearray()
+
+    def write(self, data) -> None:
+        self.__buf += data
+
+    def end(self) -> None:
+        index = self.__index
+        if index >= len(self.__state):
+            TiltLog.warning("Ignoring output for unknown chunk %d", index)
+            return
+        self.__state.set_result_size(index, len(self.__buf))
+        self.__state.set_status(index, ChunkStatus.FINISHED)
+        self.__done(index, Some(bytes(self.__buf)))
+
+
 class Tilt:
     """
     Main client for the Tilt API, providing tools for batch processing data
     using remote WASM programs.
     """
 
+    # Seconds between attempts to fetch a task's result
+    poll_interval = 2.0
+    # Status checks of a bulk job, poll_interval apart, before giving up
+    job_poll_limit = 300
+
     def __init__(self, options: Options):
         """
         Initializes the Tilt client, performs authentication, and registers
@@ -58,8 +100,14 @@ class Tilt:
         Raises:
             ValueError: If mandatory credentials or program IDs are missing.
         """
-        self._executor = AsyncExecutor()
         self.__options = options
+        # Per-chunk state of the latest create_and_poll run
+        self.job_state: Optional[JobStateTable] = None
+        # Profiler of the latest create_and_poll run, if profiling
+        self.profiler: Optional[Profiler] = None
+        self._executor = AsyncExecutor(
+            use_uvloop=options.use_uvloop, monitor=options.monitor_loop
+        )
         self.__conn = Connection(self.__options)
 
         atexit.register(self.close)
@@ -102,43 +150,63 @@ class Tilt:
             self._executor.close()
             atexit.unregister(self.close)
 
+    def metrics(self) -> LoopMetrics:
+        """
+        Health of the background event loop that carries all network I/O:
+        wake-up lag, task counts and recent stalls with the stack that caused
+        them.
+        """
+        return self._executor.metrics()
+
     def upload_program(
         self,
         filepath: str,
         name: Option[str] = None,
         description: Option[str] = None,
-    ):
+        force: bool = False,
+    ) -> Result[UUID, Error]:
         """
         Uploads a program (WASM) file to the Tilt platform.
 
+        Unchanged binaries are recognized by content hash and not re-uploaded.
+
         Args:
             filepath: Path to the local file.
             name: Optional display name for the program.
             description: Optional description of the program's functionality.
+            force: Upload even if the same binary was uploaded before.
+
+        Returns:
+            A Result containing the program id or an Error.
         """
 
         async def run():
-            await self.__conn.upload_program(filepath, name, description)
+            return await self.__conn.upload_program(
+                filepath, name, description, force
+            )
 
-        try:
-            loop = asyncio.get_running_loop()
-        except RuntimeError:
-            asyncio.run(run())
-        else:
-            loop.create_task(run())
+        return self._run_async_blocking(run)
 
     def create_job(
-        self, name: Option[str] = None, status: str = "pending"
+        self,
+        name: Option[str] = None,
+        status: str = "pending",
+        total_tasks: Optional[int] = None,
+        bulk: bool = False,
     ) -> Result[Job, Error]:
         """
         Creates a new Job entity to group multiple processing tasks.
 
+        Args:
+            bulk: Ask for a bulk job (see Connection.create_job); the job
+                has an input_url only if the server supports it.
+
         Returns:
             A Result containing the created Job or an Error.
         """
 
         async def run():
-            return await self.__conn.create_job(name, status)
+            return await self.__conn.create_job(name, status, total_tasks, bulk)
 
         return self._run_async_blocking(run)
 
@@ -158,9 +226,10 @@ class Tilt:
 
         return self._run_async_blocking(run)
 
-    def run_task(self, task_id: UUID, data: bytes) -> Result[Task, Error]:
+    def run_task(self, task_id: UUID, data: ChunkData) -> Result[Task, Error]:
         """
         Triggers the execution of a task with the provided binary data.
+        A FileRegion is streamed from disk instead of being read up front.
         """
 
         async def run():
@@ -168,6 +237,28 @@ class Tilt:
 
         return self._run_async_blocking(run)
 
+    def create_tasks(
+        self, job_id: UUID, indices: Iterable[int], status: str = "pending"
+    ) -> list[Result[Task, Error]]:
+        """
+        Creates several tasks concurrently in a single call to the background
+        loop. Results are in the order of indices.
+        """
+        return self._executor.run_many(
+            self.__conn.create_task(job_id, index, status) for index in indices
+        )
+
+    def run_tasks(
+        self, tasks: Iterable[tuple[UUID, ChunkData]]
+    ) -> list[Result[Task, Error]]:
+        """
+        Runs several (task_id, data) pairs concurrently in a single call to the
+        background loop. Results are in input order.
+        """
+        return self._executor.run_many(
+            self.__conn.run_task(task_id, data) for task_id, data in tasks
+        )
+
     def sk_sign_in(self, sk: str) -> Result[SkSignInResponse, Error]:
         """
         Authenticates the client using a secret key.
@@ -181,14 +272,23 @@ class Tilt:
     def _run_async_blocking(self, coro):
         return self._executor.run(coro())
 
-    def poll(self, job_id: UUID, task_id: UUID, segment_index: int):
+    def poll(
+        self,
+        job_id: UUID,
+        task_id: UUID,
+        segment_index: int,
+        cancelled: Optional[threading.Event] = None,
+    ):
         """
         Wait and retrieve the result of a processed task from storage.
 
         Uses a retry mechanism with a timeout.
 
+        Args:
+            cancelled: Stop waiting as soon as this event is set.
+
         Returns:
-            The processed data as bytes.
+            The processed data as bytes, or None if cancelled.
 
         Raises:
             TimeoutError: If the data is not available within the time limit.
@@ -199,6 +299,8 @@ class Tilt:
 
         while count < limit:
             count += 1
+            if cancelled is not None and cancelled.is_set():
+                return None
             try:
                 processed_data = ProcessedData(
                     unwrap_or(self.organization_id, uuid4()),
@@ -209,7 +311,10 @@ class Tilt:
                 )
                 return processed_data.download()
             except Exception:
-                time.sleep(2)
+                if cancelled is not None:
+                    cancelled.wait(self.poll_interval)
+                else:
+                    time.sleep(self.poll_interval)
 
         raise TimeoutError(f"Segment {segment_index} timeout")
 
@@ -217,35 +322,65 @@ class Tilt:
         self,
         job_id: UUID,
         index: int,
-        chunk: bytes,
-        statuses: list[str],
+        chunk: ChunkData,
+        state: JobStateTable,
+        cancelled: Optional[threading.Event] = None,
     ) -> Result[bytes, Error]:
         """
         Internal orchestrator for a single data chunk: creates the task,
-        runs it, and polls for the result.
+        runs it, and polls for the result. Returns early with an error once
+        `cancelled` is set, e.g. when a duplicate of the chunk won.
         """
 
-        statuses[index] = "running"
+        state.set_status(index, ChunkStatus.RUNNING)
+        state.set_payload_size(index, len(chunk))
 
-        task_info_result = self.create_task(job_id, index)
-        match task_info_result:
-            case Ok(task_info):
-                if is_some(task_info.id):
+        async def submit() -> Result[UUID, Error]:
+            # Create and run in one handoff to the loop instead of two
+            match await self.__conn.create_task(job_id, index):
+                case Ok(task_info):
+                    if not is_some(task_info.id):
+                        return Err(Error("(process_chunk) Task ID doesn't exist"))
                     task_id = task_info.id.value
-                else:
-                    return Err(Error("(process_chunk) Task ID doesn't exist"))
+                case Err(error):
+                    return Err(
+                        Error(f"(process_chunk) Failed to create task: {error}")
+                    )
+            match await self.__conn.run_task(task_id, chunk):
+                case Ok(task):
+                    if is_some(task.tokens_used):
+                        state.set_tokens(index, task.tokens_used.value)
+                case Err(error):
+                    return Err(Error(f"(process_chunk) Failed to run task: {error}"))
+            return Ok(task_id)
+
+        match self._run_async_blocking(submit):
+            case Ok(task_id):
+                state.set_task_id(index, task_id)
+                state.mark(index, Phase.SUBMITTED)
             case Err(error):
-                return Err(Error(f"(process_chunk) Failed to create task: {error}"))
+                return Err(error)
 
-        self.run_task(task_id, chunk)
-        result = self.poll(job_id, task_id, index)
+        result = self.poll(job_id, task_id, index, cancelled)
+        if result is None:
+            return Err(Error(f"(process_chunk) Chunk {index} cancelled"))
 
         assert isinstance(result, bytes), f"expected bytes, received {type(result)}"
-
-        statuses[index] = "finished"
+        state.set_result_size(index, len(result))
+
+        state.set_status(index, ChunkStatus.FINISHED)
+        TiltLog.info(
+            "Chunk %d finished",
+            index,
+            job_id=job_id,
+            task_id=task_id,
+            index=index,
+            phase="done",
+            latency=time.time() - (state.timestamp(index, Phase.QUEUED) or 0.0),
+        )
         return Ok(result)
 
-    def _create_progress(self, total: int) -> Progress:
+    def _create_progress(self, total: Optional[int]) -> Progress:
         return Progress(
             SpinnerColumn(),
             TextColumn("[bold]Processing tasks:[/]"),
@@ -260,11 +395,15 @@ class Tilt:
             expand=True,
         )
 
-    def _render_lines(self, statuses: list[str]) -> Text:
+    def _render_lines(self, state: JobStateTable) -> Text:
         width = console.size.width
         text = Text()
 
-        for i, status in enumerate(statuses):
+        # Only the most recent tasks fit on screen; a live stream would
+        # otherwise make every refresh walk its whole history.
+        start = max(0, len(state) - console.size.height)
+        for i, code in enumerate(state.statuses(start), start):
+            status = ChunkStatus(code).name.lower()
             label = f"Task {i:03d}"
             status_str = status.capitalize()
 
@@ -291,28 +430,155 @@ class Tilt:
 
         return text
 
+    def _task_source(
+        self, policy: Optional[DispatchPolicy]
+    ) -> tuple[Iterator[tuple[int, ChunkData]], Optional[int]]:
+        """
+        (index, payload) pairs in dispatch order and their count (None for
+        live streams, which are always dispatched in order).
+        """
+        if is_some(self.__options.data):
+            payloads = self.__options.data.value
+        elif is_some(self.__options.data_src):
+            handler = self.__options.data_src.value
+            if handler.streaming:
+                if policy is not None and not isinstance(policy, Fifo):
+                    raise ValueError("Streaming sources are dispatched in order")
+                return enumerate(self._stream_payloads(handler)), None
+            payloads = handler.payloads()
+        else:
+            raise ValueError("No data provided")
+
+        policy = policy or Fifo()
+        policy.start(payloads)
+
+        def dispatch():
+            while (index := policy.next()) is not None:
+                yield index, payloads[index]
+
+        return dispatch(), len(payloads)
+
+    def _stream_payloads(self, handler: SourceHandler) -> Iterator[ChunkData]:
+        """
+        Drives handler.read() on the background loop one item at a time, so
+        the source is only read as fast as workers take payloads.
+        """
+        agen = handler.read()
+        done = object()
+
+        async def next_item():
+            try:
+                return await agen.__anext__()
+            except StopAsyncIteration:
+                return done
+
+        try:
+            while (item := self._executor.run(next_item())) is not done:
+                yield handler.to_payload(item)
+        finally:
+            self._executor.run(agen.aclose())
+
     def create_and_poll(
-        self, job_name: str = "", max_workers: int = 16
-    ) -> list[tuple[int, Option[bytes]]]:
+        self,
+        job_name: str = "",
+        max_workers: int = 16,
+        on_result: Optional[Callable[[int, Option[bytes]], None]] = None,
+        speculation: Optional[Speculation] = None,
+        policy: Optional[DispatchPolicy] = None,
+        max_inflight_bytes: Optional[int] = None,
+        with_report: bool = False,
+        report_path: Optional[str] = None,
+        bulk: bool = False,
+    ) -> Union[
+        list[tuple[int, Option[bytes]]],
+        tuple[list[tuple[int, Option[bytes]]], JobReport],
+    ]:
         """
         High-level batch processor. Splits data, manages a thread pool for parallel
         execution, and displays a real-time progress UI.
 
+        Workers pull the next payload only when they are free, so at most
+        max_workers payloads are in flight. Streaming sources (e.g. TcpHandler)
+        are read lazily on that schedule and processed until the stream ends.
+
         Args:
             job_name: Name for the processing job.
             max_workers: Maximum number of concurrent worker threads.
+            on_result: Called with (index, processed_data) as each task
+                completes. Results are then not accumulated, which keeps memory
+                flat for long-running streams.
+            speculation: Enables speculative execution: once the source is
+                drained, idle workers launch duplicate tasks for straggling
+                chunks and the first result to arrive is used.
+            policy: Order in which chunks are dispatched (see
+                tilt.scheduling); FIFO by default. Results keep their source
+                index whatever the order.
+            max_inflight_bytes: Caps the payload and result bytes held by
+                chunks between reading the payload and handing the result
+                over. Reading from the source blocks while it is exhausted;
+                max_workers still caps the number of chunks.
+            with_report: Also return a JobReport with per-chunk timings,
+                attempts, sizes and tokens, and summary statistics.
+            report_path: Save the JobReport there (CSV if the path ends in
+                .csv, JSON otherwise).
+            bulk: Upload all payloads to the job's input_url in one streamed
+                request and download the combined output from its
+                output_url, instead of one create/run/download per chunk.
+                Falls back to per-task mode when the server does not offer
+                bulk jobs. speculation, policy and max_inflight_bytes do not
+                apply to bulk jobs.
+
+        With Options.profile (or TILT_PROFILE) set, the client's threads are
+        sampled for the duration of the call and their stacks written there
+        in collapsed format, with a per-phase breakdown logged at the end.
 
         Returns:
-            A sorted list of tuples containing (index, processed_data).
+            A sorted list of tuples containing (index, processed_data), empty
+            when on_result is given; with with_report, a (results, report)
+            tuple.
         """
 
-        if is_some(self.__options.data):
-            data = self.__options.data.value
-        elif is_some(self.__options.data_src):
-            data = self.__options.data_src.value.jsonl_to_bytes_list()
-        else:
-            raise ValueError("No data provided")
-        job_result = self.create_job(Some(job_name))
+        profiler = self.profiler = Profiler() if self.__options.profile else None
+        if profiler is not None:
+            profiler.start()
+        try:
+            return self._create_and_poll(
+                job_name,
+                max_workers,
+                on_result,
+                speculation,
+                policy,
+                max_inflight_bytes,
+                with_report,
+                report_path,
+                bulk,
+            )
+        finally:
+            if profiler is not None:
+                profiler.stop()
+                profiler.write(self.__options.profile)
+                profiler.log_summary()
+
+    def _create_and_poll(
+        self,
+        job_name: str = "",
+        max_workers: int = 16,
+        on_result: Optional[Callable[[int, Option[bytes]], None]] = None,
+        speculation: Optional[Speculation] = None,
+        policy: Optional[DispatchPolicy] = None,
+        max_inflight_bytes: Optional[int] = None,
+        with_report: bool = False,
+        report_path: Optional[str] = None,
+        bulk: bool = False,
+    ) -> Union[
+        list[tuple[int, Option[bytes]]],
+        tuple[list[tuple[int, Option[bytes]]], JobReport],
+    ]:
+        """create_and_poll without the profiling around it."""
+
+        started_at = time.time()
+        indexed, total = self._task_source(policy)
+        job_result = self.create_job(Some(job_name), total_tasks=total, bulk=bulk)
         match job_result:
             case Ok(job):
                 pass
@@ -325,62 +591,172 @@ class Tilt:
             case None:
                 raise
 
-        statuses = ["pending"] * len(data)
+        state = self.job_state = JobStateTable(total or 0)
         results: list[tuple[int, Option[bytes]]] = []
+        settings = {
+            "job_name": job_name,
+            "max_workers": max_workers,
+            "policy": type(policy).__name__ if policy else "Fifo",
+            "speculation": asdict(speculation) if speculation else None,
+            "max_inflight_bytes": max_inflight_bytes,
+            "bulk": False,
+        }
+
+        def deliver(idx: int, res: Option[bytes]) -> None:
+            if on_result is not None:
+                on_result(idx, res)
+            else:
+                results.append((idx, res))
+
+        if bulk:
+            match job.input_url:
+                case Some(input_url):
+                    settings["bulk"] = True
+                    self._run_bulk(job_id, input_url, indexed, total, state, deliver)
+                    return self._finish_job(
+                        job_id,
+                        state,
+                        results,
+                        started_at,
+                        settings,
+                        with_report,
+                        report_path,
+                    )
+                case None:
+                    TiltLog.warning(
+                        "Bulk jobs are not supported, using one task per chunk",
+                        job_id=job_id,
+                    )
 
-        work_queue: queue.Queue[tuple[int, bytes]] = queue.Queue()
+        source_lock = threading.Lock()
+        source_errors: list[BaseException] = []
         result_queue: queue.Queue[tuple[int, Option[bytes]]] = queue.Queue()
 
-        for idx, chunk in enumerate(data):
-            work_queue.put((idx, chunk))
+        # Chunks not settled yet: index -> (payload, attempts running). The
+        # event is set once the chunk settles, to stop any duplicate still
+        # polling (the API has no way to cancel a task server side).
+        in_flight: dict[int, list] = {}
+        settled: dict[int, threading.Event] = {}
+        in_flight_changed = threading.Condition()
+        speculator = Speculator(speculation, state) if speculation else None
+        # The source being read, told how long each of its chunks took
+        handler = (
+            self.__options.data_src.value
+            if not is_some(self.__options.data) and is_some(self.__options.data_src)
+            else None
+        )
+        budget = ByteBudget(max_inflight_bytes) if max_inflight_bytes else None
+        # Bytes charged to the budget per chunk, released on handoff
+        charged: dict[int, int] = {}
 
-        def worker():
-            while True:
+        def next_chunk() -> Optional[tuple[int, ChunkData]]:
+            with source_lock:
                 try:
-                    idx, chunk = work_queue.get_nowait()
-                except queue.Empty:
-                    return
+                    idx, chunk = next(indexed)
+                except StopIteration:
+                    return None
+                except Exception as e:
+                    TiltLog.error("Data source failed: %s", e, job_id=job_id)
+                    source_errors.append(e)
+                    return None
+                if total is None:
+                    state.append()
+                if budget is not None:
+                    # Still holding source_lock: no other worker reads ahead
+                    charged[idx] = len(chunk)
+                    budget.acquire(len(chunk))
+            with in_flight_changed:
+                in_flight[idx] = [chunk, 1]
+                settled[idx] = threading.Event()
+            return idx, chunk
+
+        def next_duplicate() -> Optional[tuple[int, ChunkData]]:
+            """Waits for a straggler to duplicate; None once nothing is left."""
+            if speculator is None:
+                return None
+            with in_flight_changed:
+                while in_flight:
+                    running = [i for i, entry in in_flight.items() if entry[1] == 1]
+                    idx = speculator.pick(running)
+                    if idx is not None:
+                        in_flight[idx][1] += 1
+                        TiltLog.info(
+                            "Launching a duplicate of chunk %d",
+                            idx,
+                            job_id=job_id,
+                            index=idx,
+                            phase="speculate",
+                        )
+                        return idx, in_flight[idx][0]
+                    in_flight_changed.wait(0.2)
+            return None
+
+        def settle(idx: int, res: Option[bytes], last_attempt_only: bool) -> None:
+            with in_flight_changed:
+                entry = in_flight.get(idx)
+                if entry is None:
+                    return  # a duplicate settled it already
+                entry[1] -= 1
+                if last_attempt_only and entry[1] > 0:
+                    return  # another attempt may still succeed
+                del in_flight[idx]
+                settled.pop(idx).set()
+                in_flight_changed.notify_all()
+            if res is None:
+                state.set_status(idx, ChunkStatus.FAILED)
+            elif budget is not None:
+                charged[idx] += len(res.value)
+                budget.charge(len(res.value))
+            result_queue.put((idx, res))
 
+        def worker():
+            while (item := next_chunk() or next_duplicate()) is not None:
+                idx, chunk = item
+                cancelled = settled.get(idx)
+                if cancelled is None:
+                    continue
                 try:
-                    res = self._process_chunk(job_id, idx, chunk, statuses)
-                    if res.is_ok():
-                        val = res.unwrap()
-                        result_queue.put((idx, Some(val)))
-                    else:
-                        result_queue.put((idx, None))
+                    res = self._process_chunk(job_id, idx, chunk, state, cancelled)
                 except Exception as e:
-                    TiltLog.error(f"Chunk {idx} failed: {e}")
-                    statuses[idx] = "failed"
-                    result_queue.put((idx, None))
-                finally:
-                    work_queue.task_done()
+                    TiltLog.error(
+                        "Chunk %d failed: %s", idx, e, job_id=job_id, index=idx
+                    )
+                    res = Err(Error(str(e)))
+                if res.is_ok():
+                    started = state.timestamp(idx, Phase.QUEUED)
+                    seconds = time.time() - (started or time.time())
+                    if policy is not None:
+                        policy.observe(idx, seconds)
+                    if handler is not None:
+                        handler.observe(idx, seconds)
+                    settle(idx, Some(res.unwrap()), last_attempt_only=False)
+                else:
+                    settle(idx, None, last_attempt_only=True)
 
         threads: list[threading.Thread] = []
 
-        progress = self._create_progress(total=len(data))
-        progress_task = progress.add_task("processing", total=len(data))
+        progress = self._create_progress(total=total)
+        progress_task = progress.add_task("processing", total=total)
 
         with Live(
             Group(
-                self._render_lines(statuses),
+                self._render_lines(state),
                 progress,
             ),
             console=console,
             refresh_per_second=10,
         ) as live:
-            for _ in range(max_workers):
-                t = threading.Thread(target=worker)
+            for i in range(max_workers):
+                t = threading.Thread(target=worker, name=f"tilt-worker-{i}")
                 t.start()
                 threads.append(t)
 
-            completed = 0
-            total = len(data)
-
-            while completed < total:
+            while any(t.is_alive() for t in threads) or not result_queue.empty():
                 try:
                     idx, res = result_queue.get(timeout=0.1)
-                    results.append((idx, res))
-                    completed += 1
+                    deliver(idx, res)
+                    if budget is not None:
+                        budget.release(charged.pop(idx))
 
                     progress.advance(progress_task, 1)
 
@@ -389,7 +765,7 @@ class Tilt:
 
                 live.update(
                     Group(
-                        self._render_lines(statuses),
+                        self._render_lines(state),
                         progress,
                     )
                 )
@@ -398,7 +774,7 @@ class Tilt:
                 time.sleep(0.5)
                 live.update(
                     Group(
-                        self._render_lines(statuses),
+                        self._render_lines(state),
                         progress,
                     )
                 )
@@ -407,4 +783,122 @@ class Tilt:
             for t in threads:
                 t.join()
 
-        return sorted(results, key=lambda x: x[0])
+        if source_errors:
+            raise source_errors[0]
+
+        return self._finish_job(
+            job_id, state, results, started_at, settings, with_report, report_path
+        )
+
+    def _finish_job(
+        self,
+        job_id: UUID,
+        state: JobStateTable,
+        results: list[tuple[int, Option[bytes]]],
+        started_at: float,
+        settings: dict,
+        with_report: bool,
+        report_path: Optional[str],
+    ):
+        """Sorts the results and builds, saves and returns the report if asked."""
+        results.sort(key=lambda x: x[0])
+        if not (with_report or report_path):
+            return results
+
+        report = JobReport.from_state(
+            job_id, state, started_at, time.time(), settings=settings
+        )
+        if report_path:
+            report.save(report_path)
+        return (results, report) if with_report else results
+
+    def _run_bulk(
+        self,
+        job_id: UUID,
+        input_url: str,
+        indexed: Iterator[tuple[int, ChunkData]],
+        total: Optional[int],
+        state: JobStateTable,
+        deliver: Callable[[int, Option[bytes]], None],
+    ) -> None:
+        """
+        Runs a bulk job: streams every payload to input_url as one chunk
+        container, waits for the job to finish server side, then streams
+        the combined output and delivers each chunk as it is decoded.
+        Chunks missing from the output are delivered as failed (None).
+        """
+
+        def tracked() -> Iterator[tuple[int, ChunkData]]:
+            for idx, chunk in indexed:
+                if total is None:
+                    state.append()
+                state.set_status(idx, ChunkStatus.RUNNING)
+                state.set_payload_size(idx, len(chunk))
+                yield idx, chunk
+
+        # A finite source is listed up front (its payloads are in memory or
+        # FileRegions already), so the upload can carry a Content-Length
+        chunks = tracked() if total is None else list(tracked())
+        TiltLog.info("Uploading job input in bulk", job_id=job_id)
+        match self._executor.run(self.__conn.upload_job_input(input_url, chunks)):
+            case Err(error):
+                raise RuntimeError(error.message)
+        submitted_at = time.time()
+        for idx in range(len(state)):
+            state.mark(idx, Phase.SUBMITTED, submitted_at)
+
+        output_url = self._wait_for_job(job_id)
+
+        ready: queue.Queue[tuple[int, Option[bytes]]] = queue.Queue()
+        sink = _ResultSink(state, lambda idx, res: ready.put((idx, res)))
+        future = self._executor.submit(
+            self.__conn.download_job_output(output_url, sink)
+        )
+        # Deliver from this thread, as in per-task mode, not from the loop
+        while not future.done() or not ready.empty():
+            try:
+                deliver(*ready.get(timeout=0.1))
+            except queue.Empty:
+                pass
+        match future.result():
+            case Ok(received):
+                TiltLog.success(
+                    "Downloaded %d bytes of bulk output", received, job_id=job_id
+                )
+            case Err(error):
+                raise RuntimeError(error.message)
+
+        for idx in range(len(state)):
+            if state.status(idx) != ChunkStatus.FINISHED:
+                TiltLog.error("Chunk %d missing from bulk output", idx, job_id=job_id)
+                state.set_status(idx, ChunkStatus.FAILED)
+                deliver(idx, None)
+
+    def _wait_for_job(self, job_id: UUID) -> str:
+        """
+        Polls a bulk job until it succeeds and returns its output_url.
+
+        Raises:
+            RuntimeError: If the job fails, or polling gets a 4xx response.
+            TimeoutError: If the job has no output after job_poll_limit checks.
+        """
+        for _ in range(self.job_poll_limit):
+            match self._executor.run(self.__conn.get_job(job_id)):
+                case Ok(job):
+                    match job.status, job.output_url:
+                        case Some(JobStatus.SUCCEEDED), Some(output_url):
+                            return output_url
+                        case Some(
+                            JobStatus.FAILED
+                            | JobStatus.EXPIRED
+                            | JobStatus.CANCELED as status
+                        ), _:
+                            raise RuntimeError(f"Bulk job {job_id} {status.value}")
+                case Err(error) if error.status is not None and error.status < 500:
+                    # Retrying won't help, e.g. the server has no GET /jobs/{id}
+                    raise RuntimeError(error.message)
+                case Err(error):
+                    TiltLog.warning("Polling job failed: %s", error.message)
+            time.sleep(self.poll_interval)
+
+        raise TimeoutError(f"Bulk job {job_id} has no output")
@@ -0,0 +1,76 @@
+import threading
+
+from tilt.scheduling import CostModel
+
+
+class ChunkSizeTuner:
+    """
+    Picks chunk sizes so each task takes about `target_seconds`.
+
+    The first `warmup_chunks` chunks alternate between `initial_size` and
+    half of it, so per-task overhead can be told apart from throughput.
+    From then on, each finished chunk refines a fit of
+    seconds = overhead + size / throughput, and new chunks are sized to
+    (target_seconds - overhead) * throughput. The size moves by at most
+    `max_growth` times per chunk and stays within [min_size, max_size].
+    When the overhead alone exceeds the target, chunks grow to max_size.
+    """
+
+    def __init__(
+        self,
+        target_seconds: float = 10.0,
+        initial_size: int = 1024 * 1024,
+        min_size: int = 64 * 1024,
+        max_size: int = 256 * 1024 * 1024,
+        warmup_chunks: int = 4,
+        max_growth: float = 4.0,
+        alpha: float = 0.3,
+    ):
+        if not 0 < min_size <= initial_size <= max_size:
+            raise ValueError("Expected 0 < min_size <= initial_size <= max_size")
+        self.__target = target_seconds
+        self.__min = min_size
+        self.__max = max_size
+        self.__warmup = warmup_chunks
+        self.__growth = max_growth
+        self.__lock = threading.Lock()
+        self.__model = CostModel(alpha)
+        self.__issued = 0
+        self.__initial = initial_size
+        self.__size = initial_size
+
+    def next_size(self) -> int:
+        """Size for the next chunk."""
+        with self.__lock:
+            self.__issued += 1
+            if self.__issued <= self.__warmup or not self.__model.observations:
+                if self.__issued % 2 == 0:
+                    return max(self.__min, self.__initial // 2)
+                return self.__initial
+            return self.__size
+
+    def observe(self, size: int, seconds: float) -> None:
+        """Records that a chunk of `size` bytes took `seconds` end to end."""
+        with self.__lock:
+            self.__model.add(size, seconds)
+            overhead, per_byte = self.__model.fit()
+            budget = self.__target - overhead
+            if per_byte <= 0 or budget <= 0:
+                ideal = float(self.__max)
+            else:
+                ideal = budget / per_byte
+            low, high = self.__size / self.__growth, self.__size * self.__growth
+            ideal = min(max(ideal, low), high)
+            self.__size = int(min(max(ideal, self.__min), self.__max))
+
+    @property
+    def size(self) -> int:
+        """The size currently chosen for chunks after the warm-up."""
+        with self.__lock:
+            return self.__size
+
+    def fit(self) -> tuple[float, float]:
+        """(overhead seconds, bytes per second) as currently estimated."""
+        with self.__lock:
+            overhead, per_byte = self.__model.fit()
+        return overhead, (1 / per_byte if per_byte else float("inf"))
@@ -5,6 +5,7 @@ from typing import (
     Any,
     Generic,
     NoReturn,
+    Optional,
     TypeGuard,
     TypeVar,
     Union,
@@ -111,6 +112,8 @@ class ErrorKind(Enum):
 class Error:
     # kind: ErrorKind
     message: str
+    # HTTP status of the response that caused it, if any
+    status: Optional[int] = None
 
 
 class Environment(Enum):